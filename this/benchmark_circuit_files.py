@@ -0,0 +1,35 @@
+import os
+import tempfile
+import cirq
+from benchmark_engines import best_time, random_qir_circuit
+from quantum_os.instruction_manager.qir_file import circuit_to_program, load_program, save_program
+from quantum_os.instruction_manager.qir_manager import QIRCompiler
+
+def run_benchmark():
+    compiler = QIRCompiler(cache_size=0)
+
+    print(f"{'gates':>7} {'json (KB)':>10} {'qirb (KB)':>10} {'read_json (s)':>14} "
+          f"{'map (s)':>9} {'map+compile (s)':>16} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'circuit.json')
+        qir_path = os.path.join(directory, 'circuit.qirb')
+        for num_gates in (1000, 10000, 100000):
+            circuit = random_qir_circuit(20, num_gates=num_gates, seed=num_gates)
+            cirq.to_json(circuit, json_path)
+            program, bounds = circuit_to_program(circuit)
+            save_program(qir_path, program, bounds)
+
+            loaded = compiler.compile(load_program(qir_path).program)
+            assert cirq.Circuit(loaded.all_operations()) == cirq.Circuit(circuit.all_operations()), \
+                "formats disagree"
+
+            repeats = 1 if num_gates > 10000 else 3
+            json_time = best_time(lambda: cirq.read_json(json_path), repeats)
+            map_time = best_time(lambda: load_program(qir_path), repeats)
+            compile_time = best_time(lambda: compiler.compile(load_program(qir_path).program), repeats)
+            print(f"{num_gates:>7} {os.path.getsize(json_path) / 1024:>10.0f} "
+                  f"{os.path.getsize(qir_path) / 1024:>10.0f} {json_time:>14.4f} "
+                  f"{map_time:>9.4f} {compile_time:>16.4f} {json_time / compile_time:>7.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
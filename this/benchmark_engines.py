@@ -0,0 +1,53 @@
+import time
+import cirq
+import numpy as np
+from quantum_os.kernel.statevector_engine import NumpyStateVectorEngine
+
+QIR_GATES = [cirq.H, cirq.X, cirq.Y, cirq.Z]
+QIR_TWO_QUBIT_GATES = [cirq.CNOT, cirq.CZ, cirq.SWAP]
+
+def random_qir_circuit(num_qubits: int, num_gates: int, seed: int = 0) -> cirq.Circuit:
+    """Build a random circuit over the QIR gate set (H, X, Y, Z, CNOT, CZ, SWAP)."""
+    rng = np.random.default_rng(seed)
+    qubits = cirq.LineQubit.range(num_qubits)
+    circuit = cirq.Circuit()
+    for _ in range(num_gates):
+        if rng.random() < 0.3:
+            a, b = rng.choice(num_qubits, size=2, replace=False)
+            gate = QIR_TWO_QUBIT_GATES[rng.integers(len(QIR_TWO_QUBIT_GATES))]
+            circuit.append(gate(qubits[a], qubits[b]))
+        else:
+            gate = QIR_GATES[rng.integers(len(QIR_GATES))]
+            circuit.append(gate(qubits[rng.integers(num_qubits)]))
+    return circuit
+
+def best_time(fn, repeats: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run_benchmark():
+    simulator = cirq.Simulator(dtype=np.complex128)
+    engine = NumpyStateVectorEngine()
+
+    print(f"{'qubits':>6} {'gates':>6} {'cirq (s)':>10} {'numpy (s)':>10} {'speedup':>8}")
+    for num_qubits in (8, 12, 16, 20):
+        circuit = random_qir_circuit(num_qubits, num_gates=200, seed=num_qubits)
+        qubits = cirq.LineQubit.range(num_qubits)
+
+        expected = simulator.simulate(circuit, qubit_order=qubits).final_state_vector
+        actual = engine.simulate(circuit, qubit_order=qubits)
+        assert np.allclose(expected, actual), "engines disagree"
+
+        cirq_time = best_time(
+            lambda: simulator.simulate(circuit, qubit_order=qubits).final_state_vector
+        )
+        numpy_time = best_time(lambda: engine.simulate(circuit, qubit_order=qubits))
+        print(f"{num_qubits:>6} {200:>6} {cirq_time:>10.4f} {numpy_time:>10.4f} "
+              f"{cirq_time / numpy_time:>7.1f}x")
+
+if __name__ == '__main__':
+    run_benchmark()
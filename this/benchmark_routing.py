@@ -0,0 +1,34 @@
+import time
+import cirq
+import networkx as nx
+from benchmark_engines import random_qir_circuit
+from quantum_os.device_manager.topology import Topology
+from quantum_os.instruction_manager.routing import RoutingPass
+
+def count_swaps(circuit: cirq.Circuit) -> int:
+    return sum(1 for op in circuit.all_operations() if op.gate == cirq.SWAP)
+
+def run_benchmark():
+    print(f"{'topology':>10} {'qubits':>7} {'gates':>6} {'depth':>6} {'router':>9} "
+          f"{'swaps':>6} {'routed depth':>13} {'time (s)':>9}")
+    for name in ('grid', 'heavy_hex'):
+        topology = Topology.from_name(name, 50)
+        graph = nx.Graph((cirq.LineQubit(a), cirq.LineQubit(b)) for a, b in topology.edges)
+        for num_gates in (1000, 5000):
+            circuit = random_qir_circuit(50, num_gates=num_gates, seed=num_gates)
+
+            start = time.perf_counter()
+            routed = RoutingPass(topology).run(circuit)
+            ours = (routed.swaps_inserted, routed.depth_after, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            reference, _, _ = cirq.RouteCQC(graph).route_circuit(circuit)
+            swaps = count_swaps(reference) - count_swaps(circuit)
+            theirs = (swaps, len(reference), time.perf_counter() - start)
+
+            for router, (swaps, depth, seconds) in (('sabre', ours), ('cirq', theirs)):
+                print(f"{name:>10} {topology.num_qubits:>7} {num_gates:>6} {len(circuit):>6} "
+                      f"{router:>9} {swaps:>6} {depth:>13} {seconds:>9.3f}")
+
+if __name__ == '__main__':
+    run_benchmark()
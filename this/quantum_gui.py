@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import json
 import os
+from quantum_os.kernel.quantum_kernel import QuantumKernel
 
 class QuantumGUI:
     def __init__(self):
@@ -14,6 +15,7 @@ class QuantumGUI:
         self.root.geometry("1000x800")
         
         self.simulator = cirq.Simulator()
+        self.kernel = QuantumKernel()
         self.current_circuit = []
         self.measurement_results = {}
         self.setup_gui()
@@ -327,7 +329,7 @@ Created for educational and research purposes.
             
             # Run simulation
             shots = int(self.shots_var.get())
-            results = self.simulator.run(circuit, repetitions=shots)
+            results = self.kernel.sample(circuit, repetitions=shots)
             self.measurement_results = results.histogram(key='result')
             
             # Display results
@@ -515,12 +517,9 @@ Expected outcome: State transferred from first to third qubit""")
             t2 = float(self.t2_var.get())
             error_rate = float(self.error_var.get()) / 100.0  # Convert percentage to decimal
             
-            # Create noisy simulator
-            noise_model = cirq.NoiseModel.from_noise_model_like(
-                cirq.depolarize(p=error_rate)
-            )
-            noisy_simulator = cirq.DensityMatrixSimulator(noise=noise_model)
-            
+            # Noise parameters for the kernel's trajectory engine
+            noise_model = {'T1': t1, 'T2': t2, 'gate_error': error_rate}
+
             # Create circuit for simulation
             num_qubits = max(t for _, t in self.current_circuit) + 1
             qubits = cirq.LineQubit.range(num_qubits)
@@ -537,10 +536,11 @@ Expected outcome: State transferred from first to third qubit""")
             # Add measurements
             circuit.append(cirq.measure(*qubits, key='result'))
             
-            # Run noisy simulation
+            # Run noisy simulation as quantum trajectories, one per shot
             shots = int(self.shots_var.get())
-            results = noisy_simulator.run(circuit, repetitions=shots)
-            self.measurement_results = results.histogram(key='result')
+            trajectories = self.kernel.simulate_noisy(circuit, noise_model, repetitions=shots)
+            self.measurement_results = trajectories.measurements.histogram(key='result')
+            low, high = trajectories.confidence_interval(0.95)
             
             # Display results
             self.notebook.select(1)  # Switch to Results tab
@@ -552,8 +552,12 @@ Expected outcome: State transferred from first to third qubit""")
             for bitstring, count in self.measurement_results.items():
                 binary = format(bitstring, f'0{num_qubits}b')
                 probability = count / total_shots
-                self.results_text.insert('end', f"|{binary}⟩: {count} times ({probability:.3f})\n")
-            
+                self.results_text.insert(
+                    'end',
+                    f"|{binary}⟩: {count} times ({probability:.3f}, "
+                    f"95% CI {low[bitstring]:.3f}-{high[bitstring]:.3f})\n"
+                )
+
             # Plot noisy results
             for widget in self.plot_frame.winfo_children():
                 widget.destroy()
@@ -0,0 +1,235 @@
+import heapq
+import itertools
+import threading
+import time
+import cirq
+from concurrent.futures import CancelledError, Future
+from typing import Dict, List, Optional, Sequence, Tuple
+from .qubit_allocator import QubitLease
+from ..kernel.scheduler import TaskHandle, TaskScheduler
+
+
+class DeviceWorker:
+    """A device's own task queue and worker threads, with throughput counters.
+
+    Tasks routed to the device run on its scheduler, so devices in one
+    process simulate in parallel instead of sharing the kernel's workers.
+    """
+
+    def __init__(self, name: str, device, kernel, num_workers: int = 1):
+        self.name = name
+        self.device = device
+        self.kernel = kernel
+        self.scheduler = TaskScheduler(kernel.execute_task, num_workers=num_workers)
+        self.groups: List["DeviceGroup"] = []
+        self.created_at = time.monotonic()
+        self.busy_time = 0.0  # Seconds spent running tasks, summed over workers
+        self.reserved = 0  # Tasks placed by a group and not yet on the scheduler
+        self._lock = threading.Lock()
+
+    @property
+    def queue_length(self) -> int:
+        """Tasks waiting for or running on this device, counting ones being submitted."""
+        stats = self.scheduler.stats()
+        with self._lock:
+            reserved = self.reserved
+        return stats['queue_depth'] + stats['running'] + reserved
+
+    def reserve(self):
+        """Count a task a group has placed here but not yet submitted."""
+        with self._lock:
+            self.reserved += 1
+
+    def unreserve(self):
+        with self._lock:
+            self.reserved -= 1
+
+    def load(self) -> Tuple[int, float]:
+        """Sort key of the dispatcher: queued tasks first, then leased qubits."""
+        return self.queue_length, self.device.allocator.utilization()
+
+    def submit(self, circuit: cirq.Circuit, lease: QubitLease, priority: int = 0,
+               noise_model: Optional[Dict] = None) -> TaskHandle:
+        handle = self.kernel.submit_on_device(circuit, priority=priority, noise_model=noise_model,
+                                              lease=lease, scheduler=self.scheduler)
+        # Runs after the kernel's callback has released the lease.
+        handle.add_done_callback(self._finished)
+        return handle
+
+    def _finished(self, handle: TaskHandle):
+        if handle.started_at is not None and handle.finished_at is not None:
+            with self._lock:
+                self.busy_time += handle.finished_at - handle.started_at
+        for group in list(self.groups):
+            group.dispatch()
+
+    def stats(self) -> Dict[str, float]:
+        """Utilization, queue length and throughput of the device."""
+        scheduler = self.scheduler.stats()
+        elapsed = max(time.monotonic() - self.created_at, 1e-9)
+        with self._lock:
+            busy = self.busy_time
+        return {
+            'utilization': self.device.allocator.utilization(),
+            'free_qubits': self.device.allocator.num_free,
+            'queue_length': scheduler['queue_depth'] + scheduler['running'],
+            'running': scheduler['running'],
+            'completed': scheduler['completed'],
+            'failed': scheduler['failed'] + scheduler['timed_out'],
+            'throughput': scheduler['completed'] / elapsed,  # Tasks per second
+            'busy_fraction': busy / (elapsed * self.scheduler.num_workers),
+            'mean_wait_time': scheduler['mean_wait_time'],
+        }
+
+    def shutdown(self, wait: bool = True):
+        self.scheduler.shutdown(wait=wait)
+
+
+class PoolHandle(Future):
+    """Handle of a task submitted to a DeviceGroup.
+
+    ``device`` and ``task_id`` are set once the task is dispatched; until
+    then it waits in the group's backlog for qubits to free up.
+    """
+
+    def __init__(self, group: "DeviceGroup", circuit: cirq.Circuit, priority: int,
+                 noise_model: Optional[Dict]):
+        super().__init__()
+        self.group = group
+        self.circuit = circuit
+        self.num_qubits = len(circuit.all_qubits())
+        self.priority = priority
+        self.noise_model = noise_model
+        self.device: Optional[str] = None
+        self.task_id: Optional[int] = None
+        self.inner: Optional[TaskHandle] = None
+
+    def cancel(self) -> bool:
+        """Cancel the task; a dispatched one is cancelled like its TaskHandle."""
+        inner = self.group._withdraw(self)
+        if inner is not None:
+            return inner.cancel()
+        return super().cancel()
+
+    def _resolve(self, inner: TaskHandle):
+        if self.done():
+            return
+        if inner.cancelled() or isinstance(inner.exception(), CancelledError):
+            Future.cancel(self)
+        elif inner.exception() is not None:
+            self.set_exception(inner.exception())
+        else:
+            self.set_result(inner.result())
+
+
+class DeviceGroup:
+    """Devices serving one queue of tasks, each task on the least-loaded device that fits.
+
+    A task is leased qubits on the device with the fewest queued tasks (then
+    the lowest utilization) among those with enough free qubits, and runs on
+    that device's worker. When no device has room it waits in a priority
+    backlog, dispatched in order as leases are released.
+    """
+
+    def __init__(self, name: str, workers: Sequence[DeviceWorker]):
+        if not workers:
+            raise ValueError(f"Device group '{name}' needs at least one device")
+        self.name = name
+        self.workers = list(workers)
+        self.max_qubits = max(worker.device.num_qubits for worker in self.workers)
+        self._backlog: List[Tuple[int, int, PoolHandle]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        for worker in self.workers:
+            worker.groups.append(self)
+
+    def submit(self, circuit: cirq.Circuit, priority: int = 0,
+               noise_model: Optional[Dict] = None) -> PoolHandle:
+        """Queue a circuit on the group; ``handle.result()`` is its state vector."""
+        handle = PoolHandle(self, circuit, priority, noise_model)
+        if handle.num_qubits > self.max_qubits:
+            raise ValueError(f"Circuit needs {handle.num_qubits} qubits; the largest device "
+                             f"in group '{self.name}' has {self.max_qubits}")
+        with self._lock:
+            heapq.heappush(self._backlog, (-priority, next(self._counter), handle))
+            self.submitted += 1
+        self.dispatch()
+        return handle
+
+    def dispatch(self):
+        """Place backlogged tasks in priority order until the first that does not fit.
+
+        Stopping there keeps a large task from being starved by smaller ones.
+        The device is picked and leased under the group lock, but the task is
+        submitted after releasing it: submission can run done callbacks that
+        dispatch other groups, which must never wait on this lock.
+        """
+        while True:
+            with self._lock:
+                placed = None
+                while self._backlog and placed is None:
+                    handle = self._backlog[0][2]
+                    if handle.done():
+                        heapq.heappop(self._backlog)
+                        continue
+                    placed = self._place(handle)
+                    if placed is None:
+                        return
+                    heapq.heappop(self._backlog)
+                if placed is None:
+                    return
+                worker, lease = placed
+                worker.reserve()
+            try:
+                inner = worker.submit(handle.circuit, lease, handle.priority, handle.noise_model)
+            except Exception as e:
+                # The kernel has released the lease already.
+                handle.set_exception(e)
+                continue
+            finally:
+                worker.unreserve()
+            with self._lock:
+                handle.device, handle.task_id, handle.inner = worker.name, inner.task_id, inner
+            inner.add_done_callback(handle._resolve)
+            if handle.cancelled():
+                # Cancelled between leaving the backlog and being submitted.
+                inner.cancel()
+
+    def _place(self, handle: PoolHandle) -> Optional[Tuple[DeviceWorker, QubitLease]]:
+        for worker in sorted(self.workers, key=DeviceWorker.load):
+            if worker.device.allocator.num_free < handle.num_qubits:
+                continue
+            lease = worker.device.allocator.try_allocate(handle.num_qubits, owner=handle)
+            if lease is not None:
+                return worker, lease
+        return None
+
+    def _withdraw(self, handle: PoolHandle) -> Optional[TaskHandle]:
+        # Drop a backlogged handle; return the TaskHandle of a dispatched one.
+        with self._lock:
+            if handle.inner is not None:
+                return handle.inner
+            for i, (_, _, queued) in enumerate(self._backlog):
+                if queued is handle:
+                    self._backlog[i] = self._backlog[-1]
+                    self._backlog.pop()
+                    heapq.heapify(self._backlog)
+                    break
+        return None
+
+    @property
+    def backlog(self) -> int:
+        """Tasks waiting for a device with enough free qubits."""
+        with self._lock:
+            return len(self._backlog)
+
+    def stats(self) -> Dict[str, object]:
+        """Per-device metrics plus the group's backlog and total throughput."""
+        devices = {worker.name: worker.stats() for worker in self.workers}
+        return {
+            'backlog': self.backlog,
+            'submitted': self.submitted,
+            'throughput': sum(stats['throughput'] for stats in devices.values()),
+            'devices': devices,
+        }
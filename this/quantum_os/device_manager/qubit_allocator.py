@@ -0,0 +1,209 @@
+import threading
+import cirq
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+
+
+@dataclass
+class QubitLease:
+    """Exclusive hold on a set of device qubits until released."""
+    qubits: List[cirq.Qid]
+    mask: int
+    owner: Optional[object] = None
+    allocator: Optional["QubitAllocator"] = field(default=None, repr=False)
+    released: bool = False
+
+    def release(self):
+        """Return the qubits to the allocator; releasing twice is a no-op."""
+        if not self.released and self.allocator is not None:
+            self.allocator.release(self)
+
+    def __len__(self) -> int:
+        return len(self.qubits)
+
+    def __iter__(self):
+        return iter(self.qubits)
+
+    def __enter__(self) -> "QubitLease":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class QubitAllocator:
+    """Bitmap allocator handing out disjoint qubit leases.
+
+    Bit i of the free mask is set while ``qubits[i]`` is available.
+    Allocation prefers the lowest contiguous run of free qubits, which keeps
+    a lease local on line-connected devices, and falls back to the lowest
+    free qubits when the free space is fragmented.
+    """
+
+    def __init__(self, qubits: Sequence[cirq.Qid]):
+        self.qubits = list(qubits)
+        self._all = (1 << len(self.qubits)) - 1
+        self._free = self._all
+        self._lock = threading.Lock()
+        self.leases_granted = 0
+        self.peak_in_use = 0
+
+    @property
+    def num_free(self) -> int:
+        return bin(self._free).count('1')
+
+    @property
+    def num_in_use(self) -> int:
+        return len(self.qubits) - self.num_free
+
+    def free_qubits(self) -> List[cirq.Qid]:
+        free = self._free
+        return [q for i, q in enumerate(self.qubits) if free >> i & 1]
+
+    def utilization(self) -> float:
+        """Fraction of qubits currently leased."""
+        return self.num_in_use / len(self.qubits) if self.qubits else 0.0
+
+    def allocate(self, num_qubits: int, owner: Optional[object] = None) -> QubitLease:
+        """Lease num_qubits free qubits, raising ValueError if they are not available."""
+        lease = self.try_allocate(num_qubits, owner)
+        if lease is None:
+            raise ValueError(
+                f"Not enough qubits available: requested {num_qubits}, {self.num_free} free"
+            )
+        return lease
+
+    def try_allocate(self, num_qubits: int, owner: Optional[object] = None) -> Optional[QubitLease]:
+        """Lease num_qubits free qubits, or return None if they are not available."""
+        if num_qubits < 0:
+            raise ValueError("Cannot allocate a negative number of qubits")
+        if num_qubits > len(self.qubits):
+            raise ValueError(
+                f"Not enough qubits available: requested {num_qubits}, device has {len(self.qubits)}"
+            )
+        with self._lock:
+            mask = self._find(num_qubits)
+            if mask is None:
+                return None
+            self._free &= ~mask
+            self.leases_granted += 1
+            self.peak_in_use = max(self.peak_in_use, len(self.qubits) - bin(self._free).count('1'))
+        qubits = [q for i, q in enumerate(self.qubits) if mask >> i & 1]
+        return QubitLease(qubits, mask, owner, self)
+
+    def allocate_qubits(self, qubits: Sequence[cirq.Qid], owner: Optional[object] = None) -> QubitLease:
+        """Lease exactly the given qubits, raising ValueError if any is missing or leased."""
+        index = {q: i for i, q in enumerate(self.qubits)}
+        missing = [q for q in qubits if q not in index]
+        if missing:
+            raise ValueError(f"Qubits {missing} are not on this device")
+        mask = 0
+        for q in qubits:
+            mask |= 1 << index[q]
+        with self._lock:
+            if mask & ~self._free:
+                busy = [q for q in qubits if not self._free >> index[q] & 1]
+                raise ValueError(f"Qubits {busy} are already leased")
+            self._free &= ~mask
+            self.leases_granted += 1
+            self.peak_in_use = max(self.peak_in_use, len(self.qubits) - bin(self._free).count('1'))
+        leased = [q for i, q in enumerate(self.qubits) if mask >> i & 1]
+        return QubitLease(leased, mask, owner, self)
+
+    def _find(self, num_qubits: int) -> Optional[int]:
+        if num_qubits == 0:
+            return 0
+        # Bit i of runs is set when qubits i..i+n-1 are all free.
+        runs = self._free
+        for shift in range(1, num_qubits):
+            runs &= self._free >> shift
+        if runs:
+            start = (runs & -runs).bit_length() - 1
+            return ((1 << num_qubits) - 1) << start
+        if bin(self._free).count('1') < num_qubits:
+            return None
+        mask, free = 0, self._free
+        for _ in range(num_qubits):
+            low = free & -free
+            mask |= low
+            free ^= low
+        return mask
+
+    def release(self, lease: QubitLease):
+        """Return a lease's qubits to the free pool."""
+        with self._lock:
+            if lease.released:
+                return
+            if lease.mask & self._free or lease.mask & ~self._all:
+                raise ValueError("Lease does not belong to this allocator")
+            self._free |= lease.mask
+            lease.released = True
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            in_use = len(self.qubits) - bin(self._free).count('1')
+            return {
+                'num_qubits': len(self.qubits),
+                'in_use': in_use,
+                'peak_in_use': self.peak_in_use,
+                'leases_granted': self.leases_granted,
+                'utilization': in_use / len(self.qubits) if self.qubits else 0.0,
+            }
+
+
+def remap_circuit(circuit: cirq.AbstractCircuit, lease: QubitLease) -> cirq.Circuit:
+    """Move a circuit onto leased qubits, preserving the sorted qubit order."""
+    source = sorted(circuit.all_qubits())
+    if len(source) > len(lease.qubits):
+        raise ValueError(f"Circuit needs {len(source)} qubits but the lease holds {len(lease.qubits)}")
+    mapping = dict(zip(source, lease.qubits))
+    return cirq.Circuit(circuit).transform_qubits(lambda q: mapping[q])
+
+
+@dataclass
+class MultiplexedBatch:
+    """Independent circuits packed onto disjoint qubits of one device."""
+    circuit: cirq.Circuit
+    leases: List[QubitLease]
+    key_maps: List[Dict[str, str]]
+
+    def split_result(self, result: cirq.Result) -> List[cirq.Result]:
+        """Split the combined result back into one result per packed circuit."""
+        return [
+            cirq.ResultDict(
+                params=result.params,
+                records={key: result.records[packed] for key, packed in key_map.items()}
+            )
+            for key_map in self.key_maps
+        ]
+
+    def release(self):
+        for lease in self.leases:
+            lease.release()
+
+
+def pack_circuits(circuits: Sequence[cirq.AbstractCircuit], allocator: QubitAllocator,
+                  start: int = 0) -> Tuple[Optional[MultiplexedBatch], int]:
+    """Greedily lease qubits for circuits[start:] until the device is full.
+
+    Returns the packed batch (None if nothing fits right now) and the index
+    of the first circuit left unpacked. Measurement keys are prefixed with
+    the circuit's position so packed results can be split apart again.
+    """
+    parts, leases, key_maps = [], [], []
+    index = start
+    while index < len(circuits):
+        circuit = circuits[index]
+        lease = allocator.try_allocate(len(circuit.all_qubits()), owner=index)
+        if lease is None:
+            break
+        keys = cirq.measurement_key_names(circuit)
+        key_map = {key: f"task{index}_{key}" for key in keys}
+        mapped = cirq.with_measurement_key_mapping(remap_circuit(circuit, lease), key_map)
+        parts.append(mapped)
+        leases.append(lease)
+        key_maps.append(key_map)
+        index += 1
+    if not parts:
+        return None, start
+    return MultiplexedBatch(cirq.Circuit.zip(*parts), leases, key_maps), index
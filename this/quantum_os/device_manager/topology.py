@@ -0,0 +1,153 @@
+import numpy as np
+from typing import Iterable, List, Tuple
+
+
+class Topology:
+    """Coupling graph of a device with a precomputed all-pairs distance index.
+
+    Qubits are numbered 0..num_qubits-1 (``VirtualQuantumDevice`` maps
+    number i to ``LineQubit(i)``). ``distances[a, b]`` is the number of
+    edges on a shortest path, so routing looks distances up instead of
+    searching the graph.
+    """
+
+    def __init__(self, num_qubits: int, edges: Iterable[Tuple[int, int]], name: str = 'custom'):
+        self.num_qubits = num_qubits
+        self.name = name
+        self.edges = sorted({tuple(sorted(edge)) for edge in edges})
+        self.neighbors: List[List[int]] = [[] for _ in range(num_qubits)]
+        for a, b in self.edges:
+            if a == b or a < 0 or b >= num_qubits:
+                raise ValueError(f"Invalid coupling edge ({a}, {b}) on {num_qubits} qubits")
+            self.neighbors[a].append(b)
+            self.neighbors[b].append(a)
+        self.distances = self._all_pairs_distances()
+
+    def _all_pairs_distances(self) -> np.ndarray:
+        # Breadth-first search from every qubit at once: row s of frontier
+        # holds the qubits at the current distance from s, and one level is
+        # a gather over a padded neighbor table.
+        n = self.num_qubits
+        degree = max((len(nbrs) for nbrs in self.neighbors), default=0)
+        table = np.arange(n)[:, None].repeat(max(degree, 1), axis=1)
+        for q, nbrs in enumerate(self.neighbors):
+            table[q, :len(nbrs)] = nbrs
+        distances = np.full((n, n), -1, dtype=np.int32)
+        np.fill_diagonal(distances, 0)
+        reached = np.eye(n, dtype=bool)
+        frontier = reached.copy()
+        level = 0
+        while frontier.any():
+            level += 1
+            step = np.zeros_like(frontier)
+            for k in range(table.shape[1]):
+                step |= frontier[:, table[:, k]]
+            step &= ~reached
+            distances[step] = level
+            reached |= step
+            frontier = step
+        if n and (distances < 0).any():
+            raise ValueError(f"Coupling graph '{self.name}' is not connected")
+        return distances
+
+    @property
+    def diameter(self) -> int:
+        return int(self.distances.max()) if self.num_qubits else 0
+
+    def distance(self, a: int, b: int) -> int:
+        return int(self.distances[a, b])
+
+    def shortest_path(self, a: int, b: int) -> List[int]:
+        """Qubits on a shortest path from a to b, both included."""
+        path = [a]
+        row = self.distances[b]
+        while path[-1] != b:
+            path.append(min(self.neighbors[path[-1]], key=row.__getitem__))
+        return path
+
+    def center(self) -> int:
+        """A qubit with the smallest eccentricity."""
+        return int(np.argmin(self.distances.max(axis=1)))
+
+    @classmethod
+    def line(cls, num_qubits: int) -> "Topology":
+        return cls(num_qubits, [(i, i + 1) for i in range(num_qubits - 1)], 'line')
+
+    @classmethod
+    def ring(cls, num_qubits: int) -> "Topology":
+        if num_qubits <= 2:
+            return cls(num_qubits, [(i, i + 1) for i in range(num_qubits - 1)], 'ring')
+        return cls(num_qubits, [(i, (i + 1) % num_qubits) for i in range(num_qubits)], 'ring')
+
+    @classmethod
+    def grid(cls, rows: int, cols: int) -> "Topology":
+        """rows x cols lattice; qubit r * cols + c sits at (r, c)."""
+        edges = []
+        for r in range(rows):
+            for c in range(cols):
+                q = r * cols + c
+                if c + 1 < cols:
+                    edges.append((q, q + 1))
+                if r + 1 < rows:
+                    edges.append((q, q + cols))
+        return cls(rows * cols, edges, 'grid')
+
+    @classmethod
+    def heavy_hex(cls, rows: int, cols: int) -> "Topology":
+        """Heavy-hexagon lattice of rows x cols hexagons.
+
+        A honeycomb in brick-wall form (rows + 1 rows of 2 * cols + 2 sites,
+        rungs between rows on alternating columns) with an extra qubit on
+        every edge, as on IBM heavy-hex devices: degree-3 qubits are only
+        ever coupled to degree-2 qubits.
+        """
+        width = 2 * cols + 2
+
+        def site(r: int, c: int) -> int:
+            return r * width + c
+
+        honeycomb = []
+        for r in range(rows + 1):
+            for c in range(width):
+                if c + 1 < width:
+                    honeycomb.append((site(r, c), site(r, c + 1)))
+                if r < rows and (r + c) % 2 == 0:
+                    honeycomb.append((site(r, c), site(r + 1, c)))
+        num_sites = (rows + 1) * width
+        edges = []
+        for i, (a, b) in enumerate(honeycomb):
+            middle = num_sites + i
+            edges += [(a, middle), (middle, b)]
+        return cls(num_sites + len(honeycomb), edges, 'heavy_hex')
+
+    @classmethod
+    def from_name(cls, name: str, num_qubits: int) -> "Topology":
+        """Build a named topology with at least num_qubits qubits.
+
+        'line' and 'ring' use exactly num_qubits; 'grid' the smallest
+        near-square grid and 'heavy_hex' the smallest square heavy-hex
+        lattice that hold them.
+        """
+        if name == 'line':
+            return cls.line(num_qubits)
+        if name == 'ring':
+            return cls.ring(num_qubits)
+        if name == 'grid':
+            cols = int(np.ceil(np.sqrt(num_qubits)))
+            return cls.grid(int(np.ceil(num_qubits / cols)) if cols else 0, cols)
+        if name == 'heavy_hex':
+            size = 1
+            while cls._heavy_hex_size(size, size) < num_qubits:
+                size += 1
+            return cls.heavy_hex(size, size)
+        raise ValueError(f"Unknown topology: {name}")
+
+    @staticmethod
+    def _heavy_hex_size(rows: int, cols: int) -> int:
+        width = 2 * cols + 2
+        horizontal = (rows + 1) * (width - 1)
+        rungs = sum(1 for r in range(rows) for c in range(width) if (r + c) % 2 == 0)
+        return (rows + 1) * width + horizontal + rungs
+
+
+TOPOLOGIES = ('line', 'ring', 'grid', 'heavy_hex')
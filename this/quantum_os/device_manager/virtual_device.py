@@ -1,18 +1,40 @@
 import cirq
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from enum import Enum
+from .qubit_allocator import QubitAllocator, QubitLease
+from .topology import Topology
+from .device_pool import DeviceGroup, DeviceWorker
 
 class DeviceType(Enum):
     GATE_BASED = "gate_based"
     ANNEALING = "annealing"
 
 class VirtualQuantumDevice:
-    def __init__(self, device_type: DeviceType, num_qubits: int):
+    def __init__(self, device_type: DeviceType, num_qubits: int,
+                 coupling: Optional[Iterable[Tuple[int, int]]] = None,
+                 gateset: Optional[cirq.Gateset] = None,
+                 topology: Optional[Topology] = None):
         self.device_type = device_type
         self.num_qubits = num_qubits
         self.qubits = [cirq.LineQubit(i) for i in range(num_qubits)]
+        # Coupling graph with its distance index; it supplies the coupling map when given
+        self.topology = topology
+        if topology is not None:
+            if coupling is not None:
+                raise ValueError("Pass either a coupling map or a topology, not both")
+            if topology.num_qubits != num_qubits:
+                raise ValueError(f"Topology has {topology.num_qubits} qubits, device {num_qubits}")
+            coupling = topology.edges
+        # Pairs of qubit indices that two-qubit gates may act on; None means all-to-all
+        self.coupling = None if coupling is None else sorted({tuple(sorted(edge)) for edge in coupling})
+        for a, b in self.coupling or ():
+            if a == b or a < 0 or b >= num_qubits:
+                raise ValueError(f"Invalid coupling edge ({a}, {b}) on {num_qubits} qubits")
+        # Gates the device accepts; None accepts anything the simulators can run
+        self.gateset = gateset
         self.noise_model = {}
+        self.allocator = QubitAllocator(self.qubits)
         
     def set_noise_model(self, t1: float = None, t2: float = None, dephasing: float = None):
         """Set noise parameters for the virtual device."""
@@ -24,8 +46,12 @@ class VirtualQuantumDevice:
             self.noise_model['dephasing'] = dephasing
 
     def get_available_qubits(self) -> List[cirq.Qid]:
-        """Return list of available qubits."""
-        return self.qubits
+        """Return list of qubits not currently leased to a task."""
+        return self.allocator.free_qubits()
+
+    def allocate_qubits(self, num_qubits: int, owner: Optional[object] = None) -> QubitLease:
+        """Lease disjoint qubits of this device for a task."""
+        return self.allocator.allocate(num_qubits, owner)
 
     def apply_noise(self, circuit: cirq.Circuit) -> cirq.Circuit:
         """Apply configured noise model to the circuit."""
@@ -44,10 +70,15 @@ class VirtualQuantumDevice:
 class DeviceManager:
     def __init__(self):
         self.devices: Dict[str, VirtualQuantumDevice] = {}
+        self.groups: Dict[str, DeviceGroup] = {}
+        self.workers: Dict[str, DeviceWorker] = {}  # One per device serving a group
         
-    def create_device(self, name: str, device_type: DeviceType, num_qubits: int) -> VirtualQuantumDevice:
+    def create_device(self, name: str, device_type: DeviceType, num_qubits: int,
+                      coupling: Optional[Iterable[Tuple[int, int]]] = None,
+                      gateset: Optional[cirq.Gateset] = None,
+                      topology: Optional[Topology] = None) -> VirtualQuantumDevice:
         """Create and register a new virtual quantum device."""
-        device = VirtualQuantumDevice(device_type, num_qubits)
+        device = VirtualQuantumDevice(device_type, num_qubits, coupling, gateset, topology)
         self.devices[name] = device
         return device
     
@@ -58,3 +89,46 @@ class DeviceManager:
     def list_devices(self) -> List[str]:
         """List all registered devices."""
         return list(self.devices.keys())
+
+    def utilization(self) -> Dict[str, float]:
+        """Fraction of each device's qubits currently leased."""
+        return {name: device.allocator.utilization() for name, device in self.devices.items()}
+
+    def create_group(self, name: str, device_names: Sequence[str], kernel,
+                     workers_per_device: int = 1) -> DeviceGroup:
+        """Group registered devices behind one least-loaded dispatch queue.
+
+        Each device gets its own worker (shared by every group it is in)
+        that runs tasks through ``kernel``.
+        """
+        workers = []
+        for device_name in device_names:
+            device = self.devices.get(device_name)
+            if device is None:
+                raise ValueError(f"Unknown device: {device_name}")
+            worker = self.workers.get(device_name)
+            if worker is None:
+                worker = self.workers[device_name] = DeviceWorker(
+                    device_name, device, kernel, num_workers=workers_per_device)
+            elif worker.kernel is not kernel:
+                raise ValueError(f"Device {device_name} already serves another kernel")
+            workers.append(worker)
+        group = DeviceGroup(name, workers)
+        self.groups[name] = group
+        return group
+
+    def get_group(self, name: str) -> Optional[DeviceGroup]:
+        """Get a device group by name."""
+        return self.groups.get(name)
+
+    def list_groups(self) -> List[str]:
+        return list(self.groups.keys())
+
+    def device_stats(self) -> Dict[str, Dict[str, float]]:
+        """Utilization, queue length and throughput of every device serving a group."""
+        return {name: worker.stats() for name, worker in self.workers.items()}
+
+    def shutdown(self, wait: bool = True):
+        """Stop the device workers."""
+        for worker in self.workers.values():
+            worker.shutdown(wait=wait)
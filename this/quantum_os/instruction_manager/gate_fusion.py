@@ -0,0 +1,132 @@
+import cirq
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass
+
+_SWAP = np.array([[1, 0, 0, 0],
+                  [0, 0, 1, 0],
+                  [0, 1, 0, 0],
+                  [0, 0, 0, 1]], dtype=complex)
+_I2 = np.eye(2, dtype=complex)
+# Two-qubit gates the engines apply with dedicated kernels instead of a dense matrix
+_SPECIALISED = (cirq.CNOT, cirq.CZ, cirq.SWAP)
+
+@dataclass
+class FusionReport:
+    """Statistics of one gate-fusion run."""
+    ops_before: int
+    ops_after: int
+    fused_single_qubit_runs: int = 0
+    absorbed_into_two_qubit: int = 0
+
+    @property
+    def sweeps_saved(self) -> int:
+        """State-vector passes saved, one per operation removed."""
+        return self.ops_before - self.ops_after
+
+class _Block:
+    """A run of operations being fused into one unitary."""
+
+    def __init__(self, qubits: Tuple[cirq.Qid, ...], matrix: Optional[np.ndarray],
+                 op: cirq.Operation):
+        self.qubits = qubits
+        self.matrix = matrix
+        self.ops = [op]
+        self.removed = False
+
+    @property
+    def fusable(self) -> bool:
+        return self.matrix is not None
+
+    def to_operations(self) -> List[cirq.Operation]:
+        # A run of only CNOT/CZ/SWAP has nothing a dense 4x4 would save.
+        if len(self.ops) == 1 or all(op.gate in _SPECIALISED for op in self.ops):
+            return self.ops
+        return [cirq.MatrixGate(self.matrix).on(*self.qubits)]
+
+class GateFusionPass:
+    """Fuse adjacent gates so each fused block costs one state sweep.
+
+    Runs of single-qubit gates on a qubit become one 2x2 unitary, and
+    single-qubit gates adjacent to a two-qubit gate are absorbed into it as a
+    4x4 unitary. Runs made only of CNOT, CZ and SWAP are left to the
+    engines' specialised kernels. Measurements, channels, symbolic gates and gates on more than
+    two qubits are left untouched and act as fusion barriers.
+    """
+
+    def __init__(self, absorb_into_two_qubit: bool = True):
+        self.absorb_into_two_qubit = absorb_into_two_qubit
+
+    def run(self, circuit: cirq.AbstractCircuit) -> Tuple[cirq.Circuit, FusionReport]:
+        """Return the fused circuit and a report of the sweeps saved."""
+        blocks: List[_Block] = []
+        last: Dict[cirq.Qid, _Block] = {}
+        report = FusionReport(ops_before=0, ops_after=0)
+
+        for op in circuit.all_operations():
+            report.ops_before += 1
+            matrix = self._fusable_unitary(op)
+            if matrix is None:
+                block = _Block(op.qubits, None, op)
+                blocks.append(block)
+                for q in op.qubits:
+                    last[q] = block
+            elif len(op.qubits) == 1:
+                self._add_single(op, matrix, blocks, last, report)
+            else:
+                self._add_two(op, matrix, blocks, last, report)
+
+        ops = [op for block in blocks if not block.removed for op in block.to_operations()]
+        report.ops_after = len(ops)
+        return cirq.Circuit(ops), report
+
+    def _fusable_unitary(self, op: cirq.Operation) -> Optional[np.ndarray]:
+        if len(op.qubits) > 2 or cirq.is_parameterized(op) or not cirq.has_unitary(op):
+            return None
+        return cirq.unitary(op)
+
+    def _add_single(self, op, matrix, blocks, last, report):
+        q = op.qubits[0]
+        block = last.get(q)
+        if block is not None and block.fusable and len(block.qubits) == 1:
+            if len(block.ops) == 1:
+                report.fused_single_qubit_runs += 1
+            block.matrix = matrix @ block.matrix
+            block.ops.append(op)
+            return
+        if (self.absorb_into_two_qubit and block is not None and block.fusable
+                and len(block.qubits) == 2):
+            lifted = np.kron(matrix, _I2) if block.qubits[0] == q else np.kron(_I2, matrix)
+            block.matrix = lifted @ block.matrix
+            block.ops.append(op)
+            report.absorbed_into_two_qubit += 1
+            return
+        block = _Block((q,), matrix, op)
+        blocks.append(block)
+        last[q] = block
+
+    def _add_two(self, op, matrix, blocks, last, report):
+        a, b = op.qubits
+        block = last.get(a)
+        if (block is not None and block is last.get(b) and block.fusable
+                and len(block.qubits) == 2):
+            if block.qubits != (a, b):
+                matrix = _SWAP @ matrix @ _SWAP
+            block.matrix = matrix @ block.matrix
+            block.ops.append(op)
+            return
+
+        new = _Block((a, b), matrix, op)
+        if self.absorb_into_two_qubit:
+            # Pull trailing single-qubit runs on either qubit into the block.
+            pre = [_I2, _I2]
+            for i, q in enumerate((a, b)):
+                prev = last.get(q)
+                if prev is not None and prev.fusable and len(prev.qubits) == 1:
+                    pre[i] = prev.matrix
+                    prev.removed = True
+                    new.ops = prev.ops + new.ops
+                    report.absorbed_into_two_qubit += len(prev.ops)
+            new.matrix = matrix @ np.kron(pre[0], pre[1])
+        blocks.append(new)
+        last[a] = last[b] = new
@@ -0,0 +1,282 @@
+import threading
+import cirq
+from abc import ABC, abstractmethod
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from ..kernel.result_cache import circuit_fingerprint
+
+@dataclass
+class PassReport:
+    """Gate count and depth around one run of an optimization pass."""
+    name: str
+    gates_before: int
+    gates_after: int
+    depth_before: int
+    depth_after: int
+
+    @property
+    def gates_removed(self) -> int:
+        """State-vector sweeps saved, one per gate removed."""
+        return self.gates_before - self.gates_after
+
+    @property
+    def depth_reduction(self) -> int:
+        return self.depth_before - self.depth_after
+
+
+def _gate_count(circuit: cirq.AbstractCircuit) -> int:
+    return sum(len(moment) for moment in circuit)
+
+
+def pack_moments(operations: Iterable[cirq.Operation]) -> cirq.Circuit:
+    """Place operations, in order, into the earliest moment after their dependencies.
+
+    An operation depends on the last one sharing a qubit, measurement key
+    or classical control key with it, so the result is equivalent to the
+    input and as shallow as EARLIEST placement allows, in one linear pass.
+    """
+    layers: List[List[cirq.Operation]] = []
+    frontier: Dict[object, int] = {}
+    for op in operations:
+        resources = list(op.qubits)
+        if not isinstance(op.gate, (cirq.EigenGate, cirq.MatrixGate)):
+            resources += [('key', key) for key in cirq.measurement_key_objs(op)]
+            resources += [('key', key) for key in cirq.control_keys(op)]
+        layer = max((frontier.get(r, 0) for r in resources), default=0)
+        if layer == len(layers):
+            layers.append([])
+        layers[layer].append(op)
+        for r in resources:
+            frontier[r] = layer + 1
+    return cirq.Circuit.from_moments(*(cirq.Moment(ops) for ops in layers))
+
+
+class CommutationChecker:
+    """Decides whether two operations commute, caching by gates and qubit layout.
+
+    Operations on disjoint qubits always commute. Otherwise both must be
+    non-parameterized unitaries on at most ``max_qubits`` qubits together,
+    and their unitaries are compared numerically once per layout.
+    """
+
+    def __init__(self, max_qubits: int = 4):
+        self.max_qubits = max_qubits
+        self._cache: Dict[tuple, bool] = {}
+
+    def __call__(self, a: cirq.Operation, b: cirq.Operation) -> bool:
+        if not set(a.qubits).intersection(b.qubits):
+            return True
+        order = list(dict.fromkeys(a.qubits + b.qubits))
+        key = None
+        if a.gate is not None and b.gate is not None:
+            key = (a.gate, b.gate, tuple(order.index(q) for q in a.qubits),
+                   tuple(order.index(q) for q in b.qubits))
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+        result = (len(order) <= self.max_qubits
+                  and not cirq.is_parameterized(a) and not cirq.is_parameterized(b)
+                  and cirq.has_unitary(a) and cirq.has_unitary(b))
+        if result:
+            ua = cirq.Circuit(a).unitary(qubit_order=order)
+            ub = cirq.Circuit(b).unitary(qubit_order=order)
+            result = bool(np.allclose(ua @ ub, ub @ ua))
+        if key is not None:
+            self._cache[key] = result
+        return result
+
+
+class _PeepholePass(ABC):
+    """Combines each operation with an earlier one it can commute back to.
+
+    Earlier operations sharing a qubit are visited latest first, at most
+    ``window`` per qubit; the walk stops at the first one the new operation
+    does not commute with.
+    """
+
+    name = 'peephole'
+
+    def __init__(self, window: int = 16, commutes: Optional[CommutationChecker] = None):
+        self.window = window
+        self.commutes = commutes or CommutationChecker()
+
+    def run(self, circuit: cirq.AbstractCircuit) -> cirq.Circuit:
+        ops: List[Optional[cirq.Operation]] = []
+        history: Dict[cirq.Qid, List[int]] = {}
+        for op in circuit.all_operations():
+            if self._combine(op, ops, self._reachable(op, ops, history)):
+                continue
+            for q in op.qubits:
+                history.setdefault(q, []).append(len(ops))
+            ops.append(op)
+        return pack_moments(op for op in ops if op is not None)
+
+    def _reachable(self, op: cirq.Operation, ops: List[Optional[cirq.Operation]],
+                   history: Dict[cirq.Qid, List[int]]) -> Iterator[Tuple[int, cirq.Operation]]:
+        # Only indices every qubit's window still covers, so no operation
+        # between a candidate and op goes unchecked.
+        lowest = max((history[q][-self.window] for q in op.qubits
+                      if len(history.get(q, ())) >= self.window), default=0)
+        indices = {i for q in op.qubits for i in history.get(q, ())[-self.window:] if i >= lowest}
+        for i in sorted(indices, reverse=True):
+            other = ops[i]
+            if other is None:
+                continue
+            yield i, other
+            if not self.commutes(op, other):
+                return
+
+    @abstractmethod
+    def _combine(self, op: cirq.Operation, ops: List[Optional[cirq.Operation]],
+                 candidates: Iterator[Tuple[int, cirq.Operation]]) -> bool:
+        """Fold op into one of the candidates (editing ops); True if op was consumed."""
+
+
+class CancelInversesPass(_PeepholePass):
+    """Removes pairs of mutually inverse operations (H.H, CNOT.CNOT, SWAP.SWAP, T.T**-1, ...).
+
+    Operations in between must commute with the second one, e.g. Z on the
+    control of CNOT.Z.CNOT. A pair only cancels when its product is exactly
+    the identity, so global phases are kept.
+    """
+
+    name = 'cancel_inverses'
+
+    def __init__(self, window: int = 16, commutes: Optional[CommutationChecker] = None):
+        super().__init__(window, commutes)
+        self._inverse: Dict[tuple, bool] = {}
+
+    def _combine(self, op, ops, candidates) -> bool:
+        for i, other in candidates:
+            if set(other.qubits) == set(op.qubits) and self._is_inverse(other, op):
+                ops[i] = None
+                return True
+        return False
+
+    def _is_inverse(self, a: cirq.Operation, b: cirq.Operation) -> bool:
+        key = None
+        if a.gate is not None and b.gate is not None:
+            key = (a.gate, b.gate, tuple(a.qubits.index(q) for q in b.qubits))
+            cached = self._inverse.get(key)
+            if cached is not None:
+                return cached
+        result = (not cirq.is_parameterized(a) and not cirq.is_parameterized(b)
+                  and cirq.has_unitary(a) and cirq.has_unitary(b))
+        if result:
+            product = cirq.Circuit(a, b).unitary(qubit_order=a.qubits)
+            result = bool(np.allclose(product, np.eye(len(product))))
+        if key is not None:
+            self._inverse[key] = result
+        return result
+
+
+class MergePowersPass(_PeepholePass):
+    """Merges powers of one eigen gate on the same qubits, e.g. T.T -> S or rz(a).rz(b).
+
+    The merged gate sits at the earlier position, which is valid because
+    the later gate commutes with everything in between; merges that yield
+    the identity remove both gates.
+    """
+
+    name = 'merge_powers'
+
+    def __init__(self, window: int = 16, commutes: Optional[CommutationChecker] = None):
+        super().__init__(window, commutes)
+        self._families: Dict[type, type] = {}
+
+    def _combine(self, op, ops, candidates) -> bool:
+        gate = op.gate
+        if not isinstance(gate, cirq.EigenGate) or cirq.is_parameterized(gate):
+            return False
+        family = self._family(gate)
+        for i, other in candidates:
+            previous = other.gate
+            if (other.qubits == op.qubits and isinstance(previous, cirq.EigenGate)
+                    and not cirq.is_parameterized(previous) and self._family(previous) is family
+                    and self._same_but_exponent(previous, gate)):
+                merged = previous._with_exponent(previous.exponent + gate.exponent)
+                u = cirq.unitary(merged)
+                ops[i] = None if np.allclose(u, np.eye(len(u))) else merged.on(*other.qubits)
+                return True
+        return False
+
+    @staticmethod
+    def _same_but_exponent(previous: cirq.EigenGate, gate: cirq.EigenGate) -> bool:
+        # Other parameters (global_shift, phase_exponent, ...) must match.
+        try:
+            return previous._with_exponent(gate.exponent) == gate
+        except (TypeError, ValueError):
+            return False
+
+    def _family(self, gate: cirq.EigenGate) -> type:
+        # cirq.X and X**0.5 are different classes of one gate family.
+        family = self._families.get(type(gate))
+        if family is None:
+            family = self._families[type(gate)] = type(gate._with_exponent(0.5))
+        return family
+
+
+class CompactMomentsPass:
+    """Repacks operations into the fewest moments EARLIEST placement allows."""
+
+    name = 'compact_moments'
+
+    def run(self, circuit: cirq.AbstractCircuit) -> cirq.Circuit:
+        return pack_moments(circuit.all_operations())
+
+
+class PassManager:
+    """Runs optimization passes in rounds until a round removes no gate or moment.
+
+    Every pass run is reported with gate counts and depth before and after.
+    Results are cached per ``circuit_fingerprint`` (the ordered operations),
+    so re-optimizing the same circuit is a lookup.
+    """
+
+    def __init__(self, passes: Optional[Sequence] = None, max_rounds: int = 4,
+                 cache_size: int = 128):
+        commutes = CommutationChecker()
+        self.passes = list(passes) if passes is not None else [
+            CancelInversesPass(commutes=commutes),
+            MergePowersPass(commutes=commutes),
+            CompactMomentsPass(),
+        ]
+        self.max_rounds = max_rounds
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[cirq.FrozenCircuit, List[PassReport]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, circuit: cirq.AbstractCircuit) -> Tuple[cirq.Circuit, List[PassReport]]:
+        """Return the optimized circuit and one report per pass run."""
+        key = circuit_fingerprint(circuit)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached[0].unfreeze(), list(cached[1])
+        reports: List[PassReport] = []
+        current = cirq.Circuit(circuit) if isinstance(circuit, cirq.FrozenCircuit) else circuit
+        gates, depth = _gate_count(current), len(current)
+        for _ in range(self.max_rounds):
+            start = (gates, depth)
+            for optimization in self.passes:
+                current = optimization.run(current)
+                report = PassReport(optimization.name, gates, _gate_count(current),
+                                    depth, len(current))
+                reports.append(report)
+                gates, depth = report.gates_after, report.depth_after
+            if (gates, depth) == start:
+                break
+        frozen = cirq.FrozenCircuit(current)
+        with self._lock:
+            if self.cache_size > 0:
+                self._cache[key] = (frozen, reports)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return frozen.unfreeze(), list(reports)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
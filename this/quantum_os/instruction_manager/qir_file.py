@@ -0,0 +1,303 @@
+"""Binary, memory-mappable QIR circuit files.
+
+Layout (little endian, every section starts on an 8-byte boundary)::
+
+    header    magic b'QIRB', version u16, flags u16, instructions u64,
+              index entries u64, qubit table bytes u64
+    table     cirq JSON list of the qubits referenced by the qubit stream
+    opcodes   u8   x instructions   (indices into OPCODES)
+    qubits    i32  x instructions x 2 (table indices, -1 for unused slots)
+    params    f64  x instructions   (exponents, NaN when absent)
+    index     u64  x index entries  (optional: moment boundaries, first 0, last
+                                     the instruction count)
+
+Loading maps the file and wraps the sections in a QIRProgram without
+copying, so only the pages the compiler or engine touches are read.
+"""
+import json
+import mmap
+import os
+import struct
+import cirq
+import numpy as np
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .qir_program import MAX_ARITY, NO_QUBIT, OPCODE_INDEX, OPCODES, QIRProgram
+
+QIR_FILE_EXTENSION = '.qirb'
+MAGIC = b'QIRB'
+VERSION = 1
+FLAG_INDEX = 1
+HEADER = struct.Struct('<4sHHQQQ')
+
+# Gate types of the opcodes; a gate converts when its global shift is zero.
+_GATE_TYPES = {
+    cirq.HPowGate: 'H', cirq.XPowGate: 'X', cirq.YPowGate: 'Y', cirq.ZPowGate: 'Z',
+    cirq.CXPowGate: 'CNOT', cirq.CZPowGate: 'CZ', cirq.SwapPowGate: 'SWAP',
+}
+
+# GUI gate names; two-qubit gates act on (target, target + 1).
+_QC_GATES = {'H': ('H', None), 'X': ('X', None), 'Y': ('Y', None), 'Z': ('Z', None),
+             'T': ('Z', 0.25), 'S': ('Z', 0.5),
+             'CNOT': ('CNOT', None), 'CZ': ('CZ', None), 'SWAP': ('SWAP', None)}
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+class QIRFile:
+    """A loaded circuit file: the program plus its optional moment index."""
+
+    def __init__(self, program: QIRProgram, moment_bounds: Optional[np.ndarray] = None):
+        self.program = program
+        self.moment_bounds = moment_bounds
+
+    @property
+    def depth(self) -> Optional[int]:
+        """Number of moments, when the file has an index."""
+        return None if self.moment_bounds is None else len(self.moment_bounds) - 1
+
+    def qubits(self) -> List[cirq.Qid]:
+        """The program's qubits in cirq's default (sorted) order."""
+        return sorted(self.program.qubit_table)
+
+    def chunks(self, max_instructions: int = 65536) -> Iterator[QIRProgram]:
+        """Consecutive slices of at most max_instructions (views, no copies).
+
+        With an index, slices end on moment boundaries; a moment larger
+        than max_instructions is its own slice.
+        """
+        if max_instructions < 1:
+            raise ValueError("max_instructions must be positive")
+        total = len(self.program)
+        bounds = self.moment_bounds
+        start = 0
+        while start < total:
+            end = min(start + max_instructions, total)
+            if bounds is not None:
+                fitting = bounds[np.searchsorted(bounds, end, side='right') - 1]
+                end = int(fitting) if fitting > start else int(
+                    bounds[np.searchsorted(bounds, start, side='right')])
+            yield self.program[start:end]
+            start = end
+
+
+def circuit_to_program(circuit: cirq.AbstractCircuit) -> Tuple[QIRProgram, np.ndarray]:
+    """Encode a circuit over the QIR gate set; returns (program, moment bounds)."""
+    numbering = {}
+    opcodes, qubits, params, bounds = [], [], [], [0]
+    for moment in circuit:
+        for op in moment.operations:
+            gate = op.gate
+            # cirq.X, cirq.Y and cirq.Z are instances of Pauli subclasses.
+            name = next((_GATE_TYPES[t] for t in type(gate).__mro__ if t in _GATE_TYPES), None)
+            if name is None or gate.global_shift != 0 or cirq.is_parameterized(gate):
+                raise ValueError(f"Operation {op} cannot be stored in a QIR file")
+            row = [numbering.setdefault(q, len(numbering)) for q in op.qubits]
+            opcodes.append(OPCODE_INDEX[name])
+            qubits.append(row + [NO_QUBIT] * (MAX_ARITY - len(row)))
+            params.append(np.nan if gate.exponent == 1 else float(gate.exponent))
+        bounds.append(len(opcodes))
+    program = QIRProgram(np.array(opcodes, dtype=np.uint8),
+                         np.array(qubits, dtype=np.int32).reshape(-1, MAX_ARITY),
+                         np.array(params, dtype=np.float64), list(numbering))
+    return program, np.array(bounds, dtype=np.uint64)
+
+
+def save_program(path: str, program: QIRProgram, moment_bounds: Optional[Sequence[int]] = None):
+    """Write a program (and optionally its moment boundaries) to a QIR file."""
+    with open(path, 'wb') as f:
+        _write_image(f, program, moment_bounds)
+
+
+def _write_image(f: BinaryIO, program: QIRProgram, moment_bounds: Optional[Sequence[int]] = None):
+    table = cirq.to_json(list(program.qubit_table)).encode()
+    index = None
+    if moment_bounds is not None:
+        index = np.asarray(moment_bounds, dtype='<u8')
+        steps = np.diff(index.astype(np.int64))
+        if not len(index) or index[0] != 0 or index[-1] != len(program) or np.any(steps < 0):
+            raise ValueError("Moment bounds must rise from 0 to the instruction count")
+    f.write(HEADER.pack(MAGIC, VERSION, FLAG_INDEX if index is not None else 0,
+                        len(program), 0 if index is None else len(index), len(table)))
+    f.write(table + bytes(_padding(len(table))))
+    f.write(np.ascontiguousarray(program.opcodes, dtype='<u1').tobytes())
+    f.write(bytes(_padding(len(program))))
+    for array, dtype in ((program.qubits, '<i4'), (program.params, '<f8')):
+        f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+    if index is not None:
+        f.write(index.tobytes())
+
+
+def _unpack_header(data, name: str) -> Tuple[int, int, int, int]:
+    """Check a header and return (flags, instructions, index entries, table bytes)."""
+    if len(data) < HEADER.size:
+        raise ValueError(f"{name} is not a QIR file")
+    magic, version, flags, count, entries, table_bytes = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{name} is not a QIR file")
+    if version != VERSION:
+        raise ValueError(f"Unsupported QIR file version {version}")
+    return flags, count, entries, table_bytes
+
+
+def _image_size(count: int, entries: int, table_bytes: int) -> int:
+    size = HEADER.size + table_bytes + _padding(table_bytes) + count + _padding(count)
+    return size + 4 * MAX_ARITY * count + 8 * count + 8 * entries
+
+
+def parse_program(data, name: str = 'buffer') -> QIRFile:
+    """Wrap a QIR file image (bytes, mmap, ...) without copying its arrays."""
+    flags, count, entries, table_bytes = _unpack_header(data, name)
+    offset = HEADER.size
+    if offset + table_bytes > len(data):
+        raise ValueError(f"{name} is truncated")
+    table = cirq.read_json(json_text=bytes(data[offset:offset + table_bytes]).decode())
+    offset += table_bytes + _padding(table_bytes)
+    sections = {}
+    for section, dtype, size in (('opcodes', '<u1', count), ('qubits', '<i4', count * MAX_ARITY),
+                                 ('params', '<f8', count), ('index', '<u8', entries)):
+        nbytes = np.dtype(dtype).itemsize * size
+        if offset + nbytes > len(data):
+            raise ValueError(f"{name} is truncated")
+        sections[section] = np.frombuffer(data, dtype=dtype, count=size, offset=offset)
+        offset += nbytes + _padding(nbytes)
+    qubits = sections['qubits'].reshape(-1, MAX_ARITY)
+    if count and (qubits.max() >= len(table) or qubits.min() < NO_QUBIT):
+        raise ValueError(f"{name} references qubits outside its qubit table")
+    program = QIRProgram(sections['opcodes'], qubits, sections['params'], table)
+    bounds = sections['index'] if flags & FLAG_INDEX else None
+    return QIRFile(program, bounds)
+
+
+def load_program(path: str, use_mmap: bool = True) -> QIRFile:
+    """Open a QIR file; with use_mmap the arrays are views of the mapped file."""
+    with open(path, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    return parse_program(data, path)
+
+
+def write_stream(stream: BinaryIO, programs: Iterable[QIRProgram]) -> int:
+    """Write programs as consecutive QIR file images; returns the number written.
+
+    Each image carries its own header and qubit table, so a reader can
+    process the stream (a pipe or ``socket.makefile('wb')``) image by image.
+    """
+    written = 0
+    for program in programs:
+        _write_image(stream, program)
+        written += 1
+    stream.flush()
+    return written
+
+
+def read_stream(stream: BinaryIO) -> Iterator[QIRProgram]:
+    """Yield the programs of a stream written by ``write_stream`` one image at a time."""
+    while True:
+        header = _read_exact(stream, HEADER.size)
+        if not header:
+            return
+        _, count, entries, table_bytes = _unpack_header(header, 'stream')
+        body = _read_exact(stream, _image_size(count, entries, table_bytes) - HEADER.size)
+        yield parse_program(header + body, 'stream').program
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    # Raw sockets and pipes may return short reads; only a clean EOF before
+    # the first byte ends the stream.
+    parts = []
+    remaining = size
+    while remaining:
+        part = stream.read(remaining)
+        if not part:
+            if remaining == size:
+                return b''
+            raise ValueError("QIR stream ended inside an image")
+        parts.append(part)
+        remaining -= len(part)
+    return b''.join(parts)
+
+
+def is_qir_file(path: str) -> bool:
+    """Whether a file starts with the QIR file magic."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def program_from_qc(entries: Sequence[Sequence]) -> QIRProgram:
+    """Encode the GUI's ``(gate name, target)`` list as the GUI would run it.
+
+    Qubits are LineQubits; T and S become Z powers, and two-qubit gates
+    whose second qubit is past the highest target are dropped, as in the GUI.
+    """
+    num_qubits = max((int(target) for _, target in entries), default=-1) + 1
+    opcodes, qubits, params = [], [], []
+    for name, target in entries:
+        if name not in _QC_GATES:
+            raise ValueError(f"Unsupported gate type: {name}")
+        opcode, exponent = _QC_GATES[name]
+        target = int(target)
+        row = [target, target + 1] if opcode in ('CNOT', 'CZ', 'SWAP') else [target, NO_QUBIT]
+        if row[1] >= num_qubits:
+            continue
+        opcodes.append(OPCODE_INDEX[opcode])
+        qubits.append(row)
+        params.append(np.nan if exponent is None else exponent)
+    return QIRProgram(np.array(opcodes, dtype=np.uint8),
+                      np.array(qubits, dtype=np.int32).reshape(-1, MAX_ARITY),
+                      np.array(params, dtype=np.float64), cirq.LineQubit.range(num_qubits))
+
+
+def program_to_qc(program: QIRProgram) -> List[Tuple[str, int]]:
+    """The GUI's ``(gate name, target)`` list for a program on LineQubits."""
+    names = {value: name for name, value in _QC_GATES.items()}
+    entries = []
+    for code, row, param in zip(program.opcodes.tolist(), program.qubits.tolist(),
+                                program.params.tolist()):
+        opcode = OPCODES[code]
+        name = names.get((opcode, None if param != param else param))
+        qubits = [program.qubit_table[i] for i in row if i != NO_QUBIT]
+        if name is None or not all(isinstance(q, cirq.LineQubit) for q in qubits):
+            raise ValueError(f"{opcode} with exponent {param} on {qubits} has no GUI equivalent")
+        if len(qubits) == 2 and qubits[1].x != qubits[0].x + 1:
+            raise ValueError(f"The GUI only applies {opcode} to neighbouring qubits")
+        entries.append((name, qubits[0].x))
+    # The GUI sizes the register by the highest target and drops two-qubit
+    # gates that reach past it.
+    top = max((target for _, target in entries), default=-1)
+    if any(_QC_GATES[name][0] in ('CNOT', 'CZ', 'SWAP') and target + 1 > top
+           for name, target in entries):
+        raise ValueError("The GUI would drop a two-qubit gate on its highest qubit")
+    return entries
+
+
+def convert_circuit_file(source: str, target: str,
+                         compiler: Optional["QIRCompiler"] = None) -> QIRFile:
+    """Convert between cirq JSON, the GUI's ``.qc`` and QIR files by extension.
+
+    Returns the loaded source. Files other than ``.qc`` and QIR files are
+    read and written as cirq JSON; JSON written from a program gets its
+    moments from the compiler's earliest placement.
+    """
+    if source.endswith('.qc'):
+        with open(source) as f:
+            loaded = QIRFile(program_from_qc(json.load(f)))
+    elif is_qir_file(source):
+        loaded = load_program(source)
+    else:
+        program, bounds = circuit_to_program(cirq.read_json(source))
+        loaded = QIRFile(program, bounds)
+    if target.endswith(QIR_FILE_EXTENSION):
+        save_program(target, loaded.program, loaded.moment_bounds)
+    elif target.endswith('.qc'):
+        with open(target, 'w') as f:
+            json.dump(program_to_qc(loaded.program), f)
+    else:
+        if compiler is None:
+            from .qir_manager import QIRCompiler  # qir_manager imports the streaming pipeline
+            compiler = QIRCompiler(cache_size=0)
+        cirq.to_json(compiler.compile(loaded.program), target)
+    return loaded
@@ -1,6 +1,18 @@
+import hashlib
+import threading
+import weakref
 import cirq
-from typing import Dict, List, Union
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
+from .gate_fusion import FusionReport, GateFusionPass
+from .optimizer import PassManager, PassReport
+from .routing import RoutingPass, RoutingResult
+from ..device_manager.topology import Topology
+from .validator import CircuitValidator, ValidationIssue
+from .qir_program import ARITY, OPCODES, QIRProgram, instruction_exponent
+from .qir_stream import (DEFAULT_CHUNK_INSTRUCTIONS, QIRSource, compile_chunks, open_source,
+                         optimize_chunks, validate_chunks)
 
 @dataclass
 class QIRInstruction:
@@ -9,10 +21,42 @@ class QIRInstruction:
     qubits: List[cirq.Qid]
     parameters: Dict = None
 
+def program_fingerprint(qir_instructions: Sequence[QIRInstruction]) -> str:
+    """Content hash of an instruction stream, used as the compiled-program cache key.
+
+    Qubits are numbered by first use so the stream is encoded in one pass;
+    the qubit table itself is hashed at the end.
+    """
+    numbering: Dict[cirq.Qid, int] = {}
+    parts = []
+    for instruction in qir_instructions:
+        parts.append(instruction.operation_type)
+        for qubit in instruction.qubits:
+            number = numbering.get(qubit)
+            if number is None:
+                number = numbering[qubit] = len(numbering)
+            parts.append(number)
+        parts.append(repr(sorted(instruction.parameters.items())) if instruction.parameters else ';')
+    digest = hashlib.sha256(repr(parts).encode())
+    digest.update(repr(list(numbering)).encode())
+    return digest.hexdigest()
+
+
 class QIRCompiler:
-    """Compiler for Quantum Intermediate Representation."""
+    """Compiler for Quantum Intermediate Representation.
+
+    Circuits are built in bulk: every operation goes into the earliest moment
+    after the last one touching its qubits (cirq's EARLIEST placement),
+    computed in a single pass. Compiled programs are kept in an LRU cache
+    keyed by ``program_fingerprint``.
+    """
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 128):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, cirq.FrozenCircuit]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.supported_gates = {
             'H': cirq.H,
             'X': cirq.X,
@@ -23,16 +67,91 @@ class QIRCompiler:
             'SWAP': cirq.SWAP
         }
         
-    def compile(self, qir_instructions: List[QIRInstruction]) -> cirq.Circuit:
-        """Compile QIR instructions into a Cirq circuit."""
-        circuit = cirq.Circuit()
-        
+    def compile(self, qir_instructions: Union[List[QIRInstruction], QIRProgram],
+                cache_key: Optional[str] = None, cache: bool = True) -> cirq.Circuit:
+        """Compile QIR instructions or an array-backed QIRProgram into a Cirq circuit.
+
+        ``cache_key`` (from ``program_fingerprint``) lets callers that
+        recompile the same program skip hashing the instruction stream; a
+        QIRProgram hashes its arrays once and remembers the result. Pass
+        ``cache=False`` for one-off programs such as chunks of a streamed file.
+        """
+        is_program = isinstance(qir_instructions, QIRProgram)
+        if not cache:
+            build = self._build_program if is_program else self._build
+            return build(qir_instructions)
+        if cache_key:
+            key = cache_key
+        elif is_program:
+            key = 'program:' + qir_instructions.fingerprint()
+        else:
+            key = program_fingerprint(qir_instructions)
+        with self._lock:
+            frozen = self._cache.get(key)
+            if frozen is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+        if frozen is None:
+            build = self._build_program if is_program else self._build
+            frozen = cirq.FrozenCircuit(build(qir_instructions))
+            with self._lock:
+                self.cache_misses += 1
+                if self.cache_size > 0:
+                    self._cache[key] = frozen
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        # Moments are immutable, so the copy only duplicates the moment list.
+        return frozen.unfreeze()
+
+    def _build(self, qir_instructions: Sequence[QIRInstruction]) -> cirq.Circuit:
+        """Place operations into moments in one linear pass."""
+        layers: List[List[cirq.Operation]] = []
+        frontier: Dict[cirq.Qid, int] = {}
         for instruction in qir_instructions:
-            gate = self._translate_gate(instruction)
-            if gate:
-                circuit.append(gate)
-                
-        return circuit
+            operation = self._translate_gate(instruction)
+            if not operation:
+                continue
+            layer = max((frontier.get(q, 0) for q in operation.qubits), default=0)
+            if layer == len(layers):
+                layers.append([])
+            layers[layer].append(operation)
+            for q in operation.qubits:
+                frontier[q] = layer + 1
+        return cirq.Circuit.from_moments(*(cirq.Moment(ops) for ops in layers))
+
+    def _build_program(self, program: QIRProgram) -> cirq.Circuit:
+        """Bulk-build a circuit straight from a QIRProgram's arrays.
+
+        Operations are immutable, so each distinct (gate, qubits) row is
+        built once and reused; generated programs repeat rows heavily.
+        """
+        base_gates = [self.supported_gates[name] for name in OPCODES]
+        operations: Dict[Tuple[int, Optional[float], Tuple[int, ...]], cirq.Operation] = {}
+        table = program.qubit_table
+        frontier = [0] * len(table)
+        layers: List[List[cirq.Operation]] = []
+        arity = ARITY.tolist()
+        for code, row, param in zip(program.opcodes.tolist(), program.qubits.tolist(),
+                                    program.params.tolist()):
+            row = tuple(row[:arity[code]])
+            if param != param:  # NaN: no exponent
+                param = None
+            key = (code, param, row)
+            operation = operations.get(key)
+            if operation is None:
+                gate = base_gates[code] if param is None else base_gates[code] ** param
+                operation = operations[key] = gate.on(*(table[i] for i in row))
+            layer = max(frontier[i] for i in row)
+            if layer == len(layers):
+                layers.append([])
+            layers[layer].append(operation)
+            for i in row:
+                frontier[i] = layer + 1
+        return cirq.Circuit.from_moments(*(cirq.Moment(ops) for ops in layers))
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
     
     def _translate_gate(self, instruction: QIRInstruction) -> Union[cirq.Operation, None]:
         """Translate a QIR instruction to a Cirq operation."""
@@ -41,8 +160,11 @@ class QIRCompiler:
             
         gate_class = self.supported_gates[instruction.operation_type]
         
-        if instruction.parameters:
-            return gate_class(**instruction.parameters)(*instruction.qubits)
+        # The supported gates are gate instances, so the one meaningful
+        # parameter is an exponent (as in a QIRProgram's params array).
+        exponent = instruction_exponent(instruction.parameters)
+        if exponent is not None:
+            return (gate_class ** exponent)(*instruction.qubits)
         return gate_class(*instruction.qubits)
 
 class InstructionManager:
@@ -50,31 +172,88 @@ class InstructionManager:
     
     def __init__(self):
         self.compiler = QIRCompiler()
+        self.fusion_pass = GateFusionPass()
+        self.optimizer = PassManager()
+        self._validators: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        self._validators_lock = threading.Lock()
         
     def create_instruction(self, op_type: str, qubits: List[cirq.Qid], 
                          parameters: Dict = None) -> QIRInstruction:
         """Create a new QIR instruction."""
         return QIRInstruction(op_type, qubits, parameters)
+
+    def create_program(self, instructions: List[QIRInstruction]) -> QIRProgram:
+        """Pack instructions into a compact array-backed QIRProgram."""
+        return QIRProgram.from_instructions(instructions)
     
-    def compile_program(self, instructions: List[QIRInstruction]) -> cirq.Circuit:
-        """Compile a list of QIR instructions into a quantum circuit."""
-        return self.compiler.compile(instructions)
+    def compile_program(self, instructions: Union[List[QIRInstruction], QIRProgram],
+                        cache_key: Optional[str] = None) -> cirq.Circuit:
+        """Compile a list of QIR instructions or a QIRProgram into a quantum circuit."""
+        return self.compiler.compile(instructions, cache_key)
+
+    def stream_program(self, source: QIRSource, qubits: Optional[Sequence[cirq.Qid]] = None,
+                       chunk_size: int = DEFAULT_CHUNK_INSTRUCTIONS, optimize: bool = False,
+                       fuse: bool = False, device=None) -> Iterator[cirq.Circuit]:
+        """Yield a program as compiled circuits of at most chunk_size instructions.
+
+        ``source`` is a QIR file path, a binary stream of ``write_stream``
+        images or an iterable of QIRInstructions. Chunks are validated
+        (against ``qubits`` and ``device`` when given), compiled, optionally optimized
+        (without caching, gates are only combined within a chunk) and fused
+        one at a time, so the whole program is never held in memory; feed
+        the result to ``QuantumKernel.simulate_stream``.
+        """
+        validator = self.validator_for(device) if device is not None else None
+        chunks = validate_chunks(open_source(source, chunk_size), qubits, validator)
+        circuits = compile_chunks(chunks, self.compiler)
+        if optimize:
+            optimizer = PassManager(cache_size=0)
+            circuits = optimize_chunks(circuits, lambda circuit: optimizer.run(circuit)[0])
+        if fuse:
+            circuits = optimize_chunks(circuits, lambda circuit: self.fuse_gates(circuit)[0])
+        return circuits
+
+    def fuse_gates(self, circuit: cirq.Circuit) -> Tuple[cirq.Circuit, FusionReport]:
+        """Fuse adjacent gates before simulation; the report counts saved state sweeps."""
+        return self.fusion_pass.run(circuit)
     
     def optimize_circuit(self, circuit: cirq.Circuit) -> cirq.Circuit:
         """Optimize the quantum circuit."""
-        # Apply basic optimizations
-        optimized = cirq.optimize_for_target_gate_set(
-            circuit,
-            target_gate_set=cirq.google.XMON
-        )
-        return optimized
-    
-    def validate_circuit(self, circuit: cirq.Circuit) -> bool:
+        return self.optimizer.run(circuit)[0]
+
+    def optimize_with_report(self, circuit: cirq.Circuit) -> Tuple[cirq.Circuit, List[PassReport]]:
+        """Optimize a circuit; the reports give gate counts and depth around every pass."""
+        return self.optimizer.run(circuit)
+
+    def route_circuit(self, circuit: cirq.Circuit, device) -> RoutingResult:
+        """Insert SWAPs so every two-qubit gate acts on coupled qubits of the device."""
+        topology = device.topology
+        if topology is None:
+            if device.coupling is None:
+                raise ValueError("Device is all-to-all; there is nothing to route")
+            topology = Topology(device.num_qubits, device.coupling)
+        return RoutingPass(topology).run(circuit)
+
+    def validator_for(self, device=None) -> CircuitValidator:
+        """The validator of a device (None: no device constraints).
+
+        It is cached per device and rebuilt when the device's qubits,
+        coupling map or gateset change.
+        """
+        key = device if device is not None else self
+        version = None if device is None else (
+            tuple(device.qubits), tuple(getattr(device, 'coupling', None) or ()),
+            getattr(device, 'gateset', None))
+        with self._validators_lock:
+            cached = self._validators.get(key)
+            if cached is None or cached[0] != version:
+                cached = self._validators[key] = (version, CircuitValidator(device))
+        return cached[1]
+
+    def check_circuit(self, circuit: cirq.Circuit, device=None) -> List[ValidationIssue]:
+        """Structured issues of a circuit on a device, found in one pass."""
+        return self.validator_for(device).validate(circuit)
+
+    def validate_circuit(self, circuit: cirq.Circuit, device=None) -> bool:
         """Validate if the circuit is valid and can be executed."""
-        try:
-            # Check if circuit is valid
-            circuit.validate()
-            return True
-        except Exception as e:
-            print(f"Circuit validation failed: {str(e)}")
-            return False
+        return not self.check_circuit(circuit, device)
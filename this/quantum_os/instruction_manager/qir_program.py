@@ -0,0 +1,163 @@
+import hashlib
+import cirq
+import numpy as np
+from typing import Collection, Dict, Iterable, List, Optional, Sequence
+
+# Opcode numbering is part of the program format; append new gates at the end.
+OPCODES = ('H', 'X', 'Y', 'Z', 'CNOT', 'CZ', 'SWAP')
+OPCODE_INDEX = {name: code for code, name in enumerate(OPCODES)}
+ARITY = np.array([1, 1, 1, 1, 2, 2, 2], dtype=np.int8)
+MAX_ARITY = 2
+NO_QUBIT = -1
+
+
+def instruction_exponent(parameters: Optional[Dict]) -> Optional[float]:
+    """The exponent of a QIR instruction's parameters, None when it has none.
+
+    ``exponent`` is the only parameter the QIR gates take; any other raises
+    ValueError, so the validator and the compiler reject the same instructions.
+    """
+    if not parameters:
+        return None
+    exponent = parameters.get('exponent')
+    if len(parameters) > 1 or exponent is None:
+        raise ValueError(f"Unsupported QIR parameters: {sorted(parameters)}")
+    return exponent
+
+
+class QIRProgram:
+    """Struct-of-arrays QIR program.
+
+    Instruction i is ``opcodes[i]`` (an index into ``OPCODES``) on qubits
+    ``qubit_table[qubits[i, :arity]]`` (unused slots hold -1) with optional
+    exponent ``params[i]`` (NaN when absent). Slicing returns views and
+    concatenation only copies arrays, so no per-instruction Python objects
+    are ever created. The arrays are read-only.
+    """
+
+    def __init__(self, opcodes: np.ndarray, qubits: np.ndarray, params: np.ndarray,
+                 qubit_table: Sequence[cirq.Qid]):
+        # Views, so freezing them never touches the caller's arrays.
+        self.opcodes = np.asarray(opcodes, dtype=np.uint8).view()
+        self.qubits = np.asarray(qubits, dtype=np.int32).reshape(-1, MAX_ARITY).view()
+        self.params = np.asarray(params, dtype=np.float64).view()
+        self.qubit_table = list(qubit_table)
+        for array in (self.opcodes, self.qubits, self.params):
+            array.flags.writeable = False
+        if not len(self.opcodes) == len(self.qubits) == len(self.params):
+            raise ValueError("QIR program arrays must have the same length")
+        if len(self.opcodes) and self.opcodes.max() >= len(OPCODES):
+            raise ValueError(f"Unknown opcode {self.opcodes.max()}")
+        self._fingerprint: Optional[str] = None
+
+    @classmethod
+    def empty(cls, qubit_table: Sequence[cirq.Qid] = ()) -> "QIRProgram":
+        return cls(np.zeros(0, np.uint8), np.zeros((0, MAX_ARITY), np.int32),
+                   np.zeros(0, np.float64), qubit_table)
+
+    @classmethod
+    def from_instructions(cls, instructions: Iterable["QIRInstruction"]) -> "QIRProgram":
+        """Pack QIRInstructions; the only supported parameter is ``exponent``."""
+        numbering: Dict[cirq.Qid, int] = {}
+        opcodes, qubits, params = [], [], []
+        for instruction in instructions:
+            code = OPCODE_INDEX.get(instruction.operation_type)
+            if code is None:
+                raise ValueError(f"Unsupported gate type: {instruction.operation_type}")
+            if len(instruction.qubits) != ARITY[code]:
+                raise ValueError(
+                    f"{instruction.operation_type} acts on {ARITY[code]} qubits, "
+                    f"got {len(instruction.qubits)}"
+                )
+            exponent = instruction_exponent(instruction.parameters)
+            row = [numbering.setdefault(q, len(numbering)) for q in instruction.qubits]
+            opcodes.append(code)
+            qubits.append(row + [NO_QUBIT] * (MAX_ARITY - len(row)))
+            params.append(np.nan if exponent is None else exponent)
+        return cls(np.array(opcodes, dtype=np.uint8),
+                   np.array(qubits, dtype=np.int32).reshape(-1, MAX_ARITY),
+                   np.array(params, dtype=np.float64), list(numbering))
+
+    def to_instructions(self) -> List["QIRInstruction"]:
+        """Materialize per-instruction objects (for interoperability only)."""
+        from .qir_manager import QIRInstruction  # qir_manager imports this module
+        instructions = []
+        for code, row, param in zip(self.opcodes.tolist(), self.qubits.tolist(), self.params.tolist()):
+            qubits = [self.qubit_table[i] for i in row[:ARITY[code]]]
+            parameters = None if np.isnan(param) else {'exponent': param}
+            instructions.append(QIRInstruction(OPCODES[code], qubits, parameters))
+        return instructions
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __getitem__(self, index: slice) -> "QIRProgram":
+        if not isinstance(index, slice):
+            raise TypeError("QIR programs can only be sliced")
+        return QIRProgram(self.opcodes[index], self.qubits[index], self.params[index],
+                          self.qubit_table)
+
+    def __add__(self, other: "QIRProgram") -> "QIRProgram":
+        return QIRProgram.concatenate([self, other])
+
+    @staticmethod
+    def concatenate(programs: Sequence["QIRProgram"]) -> "QIRProgram":
+        """Join programs, merging their qubit tables."""
+        if not programs:
+            return QIRProgram.empty()
+        table = list(programs[0].qubit_table)
+        numbering = {q: i for i, q in enumerate(table)}
+        qubit_arrays = []
+        for program in programs:
+            if program.qubit_table == table[:len(program.qubit_table)]:
+                qubit_arrays.append(program.qubits)
+                continue
+            # Translate this program's qubit indices into the merged table;
+            # the trailing entry maps NO_QUBIT (-1) to itself.
+            lookup = np.array([numbering.setdefault(q, len(numbering)) for q in program.qubit_table]
+                              + [NO_QUBIT], dtype=np.int32)
+            table = list(numbering)
+            qubit_arrays.append(lookup[program.qubits])
+        return QIRProgram(np.concatenate([p.opcodes for p in programs]),
+                          np.concatenate(qubit_arrays),
+                          np.concatenate([p.params for p in programs]), list(numbering))
+
+    def validate(self, allowed_qubits: Optional[Collection[cirq.Qid]] = None):
+        """Check every instruction's qubit slots against its opcode's arity.
+
+        Raises ValueError for an unused slot holding a qubit, a missing
+        qubit, a two-qubit gate on one qubit, or (when ``allowed_qubits`` is
+        given) a qubit outside that set.
+        """
+        if not len(self):
+            return
+        arity = ARITY[self.opcodes]
+        first, second = self.qubits[:, 0], self.qubits[:, 1]
+        bad = (first == NO_QUBIT) | ((arity == 1) & (second != NO_QUBIT))
+        bad |= (arity == 2) & ((second == NO_QUBIT) | (first == second))
+        if bad.any():
+            i = int(np.argmax(bad))
+            raise ValueError(f"Instruction {i} ({OPCODES[self.opcodes[i]]}) has invalid "
+                             f"qubits {self.qubits[i].tolist()}")
+        if allowed_qubits is not None:
+            used = np.unique(self.qubits[self.qubits != NO_QUBIT])
+            outside = [self.qubit_table[i] for i in used.tolist()
+                       if self.qubit_table[i] not in allowed_qubits]
+            if outside:
+                raise ValueError(f"Qubits {outside} are not available")
+
+    @property
+    def nbytes(self) -> int:
+        return self.opcodes.nbytes + self.qubits.nbytes + self.params.nbytes
+
+    def fingerprint(self) -> str:
+        """Content hash of the arrays and qubit table; computed once per program."""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for array in (self.opcodes, self.qubits, self.params):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            used = np.unique(self.qubits[self.qubits != NO_QUBIT]) if len(self) else []
+            digest.update(repr([self.qubit_table[i] for i in used]).encode())
+            digest.update(repr(list(used)).encode())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
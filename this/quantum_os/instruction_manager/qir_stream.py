@@ -0,0 +1,99 @@
+"""Generator pipeline that moves QIR programs to an engine in bounded chunks.
+
+Every stage consumes and yields one chunk at a time, so a program of any
+length flows from its source through validation, compilation and
+optimization while only a chunk's worth of cirq objects exists at once.
+"""
+import cirq
+from typing import BinaryIO, Callable, Collection, Iterable, Iterator, Optional, Union
+from .qir_file import is_qir_file, load_program, read_stream
+from .qir_program import QIRProgram
+from .validator import CircuitValidator, ValidationSession
+
+# Instructions per chunk when none is given.
+DEFAULT_CHUNK_INSTRUCTIONS = 16384
+
+QIRSource = Union[str, BinaryIO, Iterable]
+
+
+def chunk_instructions(instructions: Iterable, chunk_size: int = DEFAULT_CHUNK_INSTRUCTIONS
+                       ) -> Iterator[QIRProgram]:
+    """Pack an iterable of QIRInstructions (or QIRPrograms) into chunks.
+
+    Instructions are consumed lazily, chunk_size at a time; programs are
+    passed on in slices of at most chunk_size.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    pending = []
+    for item in instructions:
+        if isinstance(item, QIRProgram):
+            if pending:
+                yield QIRProgram.from_instructions(pending)
+                pending = []
+            yield from rechunk([item], chunk_size)
+            continue
+        pending.append(item)
+        if len(pending) == chunk_size:
+            yield QIRProgram.from_instructions(pending)
+            pending = []
+    if pending:
+        yield QIRProgram.from_instructions(pending)
+
+
+def rechunk(programs: Iterable[QIRProgram], chunk_size: int = DEFAULT_CHUNK_INSTRUCTIONS
+            ) -> Iterator[QIRProgram]:
+    """Split programs into slices (views) of at most chunk_size instructions."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    for program in programs:
+        for start in range(0, len(program), chunk_size):
+            yield program[start:start + chunk_size]
+
+
+def open_source(source: QIRSource, chunk_size: int = DEFAULT_CHUNK_INSTRUCTIONS
+                ) -> Iterator[QIRProgram]:
+    """Chunks of a QIR file path, a binary stream or an instruction iterable.
+
+    Files are memory mapped and sliced on moment boundaries; streams (e.g.
+    ``socket.makefile('rb')``) carry images written by ``write_stream``.
+    """
+    if isinstance(source, str):
+        if not is_qir_file(source):
+            raise ValueError(f"{source} is not a QIR file")
+        return load_program(source).chunks(chunk_size)
+    if hasattr(source, 'read'):
+        return rechunk(read_stream(source), chunk_size)
+    return chunk_instructions(source, chunk_size)
+
+
+def validate_chunks(chunks: Iterable[QIRProgram],
+                    qubits: Optional[Collection[cirq.Qid]] = None,
+                    validator: Optional[CircuitValidator] = None) -> Iterator[QIRProgram]:
+    """Validate each chunk before passing it on; raises ValueError on the first bad one.
+
+    With a device validator, chunks are checked incrementally through one
+    ValidationSession, so issue indices count from the start of the program.
+    """
+    allowed = set(qubits) if qubits is not None else None
+    session = ValidationSession(validator) if validator is not None else None
+    for chunk in chunks:
+        chunk.validate(allowed)
+        if session is not None:
+            issues = session.extend_program(chunk)
+            if issues:
+                raise ValueError(f"Instruction {issues[0].index}: {issues[0].message}")
+        yield chunk
+
+
+def compile_chunks(chunks: Iterable[QIRProgram], compiler) -> Iterator[cirq.Circuit]:
+    """Compile each chunk on its own, bypassing the compiled-program cache."""
+    for chunk in chunks:
+        yield compiler.compile(chunk, cache=False)
+
+
+def optimize_chunks(circuits: Iterable[cirq.Circuit],
+                    optimize: Callable[[cirq.Circuit], cirq.Circuit]) -> Iterator[cirq.Circuit]:
+    """Apply a circuit-to-circuit optimization to each chunk."""
+    for circuit in circuits:
+        yield optimize(circuit)
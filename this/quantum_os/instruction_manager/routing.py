@@ -0,0 +1,202 @@
+import cirq
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from .optimizer import pack_moments
+from ..device_manager.topology import Topology
+
+@dataclass
+class RoutingResult:
+    """A circuit routed onto device qubits.
+
+    ``initial_mapping`` and ``final_mapping`` send each logical qubit to
+    the physical qubit holding it before and after the circuit; the
+    inserted SWAPs permute the final state accordingly.
+    """
+    circuit: cirq.Circuit
+    initial_mapping: Dict[cirq.Qid, cirq.Qid]
+    final_mapping: Dict[cirq.Qid, cirq.Qid]
+    swaps_inserted: int = 0
+    depth_before: int = 0
+    depth_after: int = 0
+
+
+@dataclass
+class _Gate:
+    op: cirq.Operation
+    logical: Tuple[cirq.Qid, ...]
+    done: bool = field(default=False)
+
+
+class RoutingPass:
+    """SABRE-style SWAP insertion against a Topology's distance index.
+
+    Operations run as soon as their qubits are adjacent. When every ready
+    two-qubit gate is blocked, one SWAP is chosen among the edges touching
+    those gates' qubits, scoring how it changes the distances of the ready
+    gates and of the next ``lookahead`` two-qubit gates (lookahead weighted
+    by ``lookahead_weight``) with a decay that discourages swapping the same
+    qubits back and forth. Scoring a candidate only revisits gates on its
+    two qubits, so routing costs about O(gates x distance), near linear in
+    circuit size. If the heuristic stalls, the first blocked gate is routed
+    along a shortest path.
+    """
+
+    def __init__(self, topology: Topology, lookahead: int = 20, lookahead_weight: float = 0.5,
+                 decay: float = 0.001):
+        self.topology = topology
+        self.lookahead = lookahead
+        self.lookahead_weight = lookahead_weight
+        self.decay = decay
+
+    def initial_layout(self, circuit: cirq.AbstractCircuit) -> Dict[cirq.Qid, int]:
+        """Place logical qubits by first two-qubit interaction, breadth first around the center.
+
+        Qubits that interact early land on physical qubits close to each
+        other, which keeps the first SWAP layers short.
+        """
+        logical = sorted(circuit.all_qubits())
+        if len(logical) > self.topology.num_qubits:
+            raise ValueError(f"Circuit needs {len(logical)} qubits but the device has "
+                             f"{self.topology.num_qubits}")
+        order: Dict[cirq.Qid, None] = {}
+        for op in circuit.all_operations():
+            if len(op.qubits) == 2:
+                order.update(dict.fromkeys(op.qubits))
+        order.update(dict.fromkeys(logical))
+        physical = self._breadth_first(self.topology.center())
+        return dict(zip(order, physical))
+
+    def _breadth_first(self, start: int) -> List[int]:
+        seen = {start}
+        queue = [start]
+        for q in queue:
+            for neighbor in self.topology.neighbors[q]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        return queue
+
+    def run(self, circuit: cirq.AbstractCircuit,
+            initial_layout: Optional[Dict[cirq.Qid, int]] = None) -> RoutingResult:
+        """Route a circuit; physical qubit i is ``LineQubit(i)``."""
+        operations = list(cirq.decompose(
+            circuit, keep=lambda op: len(op.qubits) <= 2 or cirq.is_measurement(op)))
+        layout = dict(initial_layout) if initial_layout is not None else self.initial_layout(circuit)
+        logical_to_physical = {q: layout[q] for q in layout}
+        physical_to_logical: Dict[int, cirq.Qid] = {p: q for q, p in logical_to_physical.items()}
+        gates = [_Gate(op, op.qubits) for op in operations]
+
+        # Ready gates are those at the head of all their qubits' queues.
+        queues: Dict[cirq.Qid, List[int]] = {}
+        for i, gate in enumerate(gates):
+            for q in gate.logical:
+                queues.setdefault(q, []).append(i)
+        heads = {q: 0 for q in queues}
+        two_qubit = [i for i, gate in enumerate(gates) if self._needs_coupling(gate.op)]
+        next_two_qubit = 0
+        distances = self.topology.distances
+        qubits = [cirq.LineQubit(p) for p in range(self.topology.num_qubits)]
+        routed: List[cirq.Operation] = []
+        swaps = 0
+        decay = [1.0] * self.topology.num_qubits
+        stalled = 0
+
+        def is_ready(i: int) -> bool:
+            return all(queues[q][heads[q]] == i for q in gates[i].logical)
+
+        ready = {queue[0] for queue in queues.values() if is_ready(queue[0])}
+        while ready:
+            executed = False
+            for i in sorted(ready):
+                gate = gates[i]
+                physical = [logical_to_physical[q] for q in gate.logical]
+                if self._needs_coupling(gate.op) and distances[physical[0], physical[1]] != 1:
+                    continue
+                routed.append(gate.op.transform_qubits({q: qubits[p] for q, p in
+                                                         zip(gate.logical, physical)}))
+                gate.done = True
+                ready.discard(i)
+                executed = True
+                for q in gate.logical:
+                    heads[q] += 1
+                    if heads[q] < len(queues[q]) and is_ready(queues[q][heads[q]]):
+                        ready.add(queues[q][heads[q]])
+            if executed:
+                decay = [1.0] * self.topology.num_qubits
+                stalled = 0
+                continue
+            # Every ready gate is a blocked two-qubit gate: insert one SWAP.
+            while next_two_qubit < len(two_qubit) and gates[two_qubit[next_two_qubit]].done:
+                next_two_qubit += 1
+            if stalled > 2 * self.topology.diameter + 10:
+                a, b = self._path_swap(gates[min(ready)], logical_to_physical)
+            else:
+                a, b = self._best_swap(ready, gates, two_qubit, next_two_qubit,
+                                       logical_to_physical, decay)
+            stalled += 1
+            swaps += 1
+            decay[a] += self.decay
+            decay[b] += self.decay
+            routed.append(cirq.SWAP(qubits[a], qubits[b]))
+            qa, qb = physical_to_logical.pop(a, None), physical_to_logical.pop(b, None)
+            for q, p in ((qa, b), (qb, a)):
+                if q is not None:
+                    logical_to_physical[q] = p
+                    physical_to_logical[p] = q
+        if not all(gate.done for gate in gates):
+            raise ValueError("Routing did not schedule every operation")
+        result = pack_moments(routed)
+        return RoutingResult(
+            result,
+            {q: qubits[p] for q, p in layout.items()},
+            {q: qubits[p] for q, p in logical_to_physical.items()},
+            swaps, len(circuit), len(result),
+        )
+
+    @staticmethod
+    def _needs_coupling(op: cirq.Operation) -> bool:
+        return len(op.qubits) == 2 and not cirq.is_measurement(op)
+
+    def _best_swap(self, ready, gates: List[_Gate], two_qubit: List[int], start: int,
+                   logical_to_physical: Dict[cirq.Qid, int], decay: List[float]) -> Tuple[int, int]:
+        distances = self.topology.distances
+        front = [[logical_to_physical[q] for q in gates[i].logical] for i in ready]
+        extended = []
+        for i in two_qubit[start:]:
+            if len(extended) == self.lookahead:
+                break
+            if i not in ready and not gates[i].done:
+                extended.append([logical_to_physical[q] for q in gates[i].logical])
+        # Per physical qubit: (weight, partner) of every scored gate on it.
+        weight_front = 1.0 / len(front)
+        weight_ext = self.lookahead_weight / len(extended) if extended else 0.0
+        touching: Dict[int, List[Tuple[float, int]]] = {}
+        for pairs, weight in ((front, weight_front), (extended, weight_ext)):
+            for a, b in pairs:
+                touching.setdefault(a, []).append((weight, b))
+                touching.setdefault(b, []).append((weight, a))
+        base = (weight_front * sum(distances[a, b] for a, b in front)
+                + weight_ext * sum(distances[a, b] for a, b in extended))
+        best, best_score = None, None
+        candidates = {tuple(sorted((p, n))) for pair in front for p in pair
+                      for n in self.topology.neighbors[p]}
+        for a, b in sorted(candidates):
+            delta = 0.0
+            for here, there in ((a, b), (b, a)):
+                for weight, partner in touching.get(here, ()):
+                    if partner != there:
+                        delta += weight * (distances[there, partner] - distances[here, partner])
+            score = max(decay[a], decay[b]) * (base + delta)
+            if best_score is None or score < best_score:
+                best, best_score = (a, b), score
+        return best
+
+    def _path_swap(self, gate: _Gate, logical_to_physical: Dict[cirq.Qid, int]) -> Tuple[int, int]:
+        a, b = (logical_to_physical[q] for q in gate.logical)
+        path = self.topology.shortest_path(a, b)
+        return path[0], path[1]
+
+
+def route_circuit(circuit: cirq.AbstractCircuit, topology: Topology, **options) -> RoutingResult:
+    """Route a circuit onto a topology with the default RoutingPass settings."""
+    return RoutingPass(topology, **options).run(circuit)
@@ -0,0 +1,241 @@
+import cirq
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from .qir_program import ARITY, NO_QUBIT, OPCODE_INDEX, OPCODES, QIRProgram, instruction_exponent
+
+# Issue codes
+UNSUPPORTED_GATE = 'unsupported_gate'
+QUBIT_OUT_OF_RANGE = 'qubit_out_of_range'
+ARITY_MISMATCH = 'arity_mismatch'
+DUPLICATE_QUBITS = 'duplicate_qubits'
+NOT_COUPLED = 'not_coupled'
+
+# The cirq gate of each QIR opcode, in OPCODES order.
+_OPCODE_GATES = [cirq.H, cirq.X, cirq.Y, cirq.Z, cirq.CNOT, cirq.CZ, cirq.SWAP]
+
+@dataclass
+class ValidationIssue:
+    """One problem found by the validator; index is the operation's position."""
+    index: int
+    code: str
+    message: str
+    operation: Optional[object] = None
+
+
+def _default_support(gate: cirq.Gate) -> bool:
+    # Anything the simulators can run: unitaries (possibly symbolic),
+    # measurements and noise channels.
+    return (cirq.is_parameterized(gate) or cirq.has_unitary(gate) or cirq.is_measurement(gate)
+            or cirq.has_mixture(gate) or cirq.has_kraus(gate))
+
+
+class CircuitValidator:
+    """Checks operations against a device in one pass with precomputed tables.
+
+    Built once per device: a qubit -> index map for bounds, a boolean
+    adjacency matrix for connectivity (absent for all-to-all devices), a
+    per-opcode support table for QIR programs and a cache of per-gate
+    support decisions. Each operation then costs a few lookups.
+    """
+
+    def __init__(self, device=None, gateset: Optional[cirq.Gateset] = None):
+        self.device = device
+        self.gateset = gateset if gateset is not None else getattr(device, 'gateset', None)
+        self.qubit_index: Optional[Dict[cirq.Qid, int]] = None
+        self.adjacency: Optional[np.ndarray] = None
+        if device is not None:
+            self.qubit_index = {q: i for i, q in enumerate(device.qubits)}
+            coupling = getattr(device, 'coupling', None)
+            if coupling is not None:
+                self.adjacency = np.zeros((len(device.qubits),) * 2, dtype=bool)
+                for a, b in coupling:
+                    self.adjacency[a, b] = self.adjacency[b, a] = True
+        self._supported: Dict[cirq.Gate, bool] = {}
+        self.opcode_supported = np.array([self._gate_supported(cirq_gate)
+                                          for cirq_gate in _OPCODE_GATES], dtype=bool)
+        self._power_supported: Dict[Tuple[int, float], bool] = {}
+
+    def _gate_supported(self, gate: cirq.Gate) -> bool:
+        supported = self._supported.get(gate)
+        if supported is None:
+            supported = gate in self.gateset if self.gateset is not None else _default_support(gate)
+            self._supported[gate] = supported
+        return supported
+
+    def _opcode_supported(self, code: int, exponent: Optional[float] = None) -> bool:
+        # QIR rows with an exponent run ``gate ** exponent``, which a gateset
+        # may reject even when it accepts the base gate.
+        if exponent is None or exponent != exponent:
+            return bool(self.opcode_supported[code])
+        key = (code, exponent)
+        supported = self._power_supported.get(key)
+        if supported is None:
+            supported = self._power_supported[key] = self._gate_supported(
+                _OPCODE_GATES[code] ** exponent)
+        return supported
+
+    def check_operation(self, op: cirq.Operation, index: int = 0) -> List[ValidationIssue]:
+        """Issues of a single operation."""
+        issues = []
+        gate = op.gate
+        if gate is not None:
+            supported = self._gate_supported(gate)
+        elif self.gateset is not None:
+            supported = op in self.gateset
+        else:
+            supported = (cirq.has_unitary(op) or cirq.is_measurement(op) or cirq.has_kraus(op)
+                         or cirq.is_parameterized(op) or bool(cirq.control_keys(op)))
+        if not supported:
+            issues.append(ValidationIssue(index, UNSUPPORTED_GATE,
+                                          f"{op} is not supported by the device", op))
+        if gate is not None and cirq.num_qubits(gate) != len(op.qubits):
+            issues.append(ValidationIssue(
+                index, ARITY_MISMATCH,
+                f"{gate} acts on {cirq.num_qubits(gate)} qubits, got {len(op.qubits)}", op))
+        # Measurements read qubits independently and need no coupling.
+        issues.extend(self._check_indices(index, op.qubits, op,
+                                          coupling=not cirq.is_measurement(op)))
+        return issues
+
+    def _coupled(self, indices: List[int]) -> bool:
+        # Multi-qubit gates need every pair coupled; only two-qubit gates
+        # are usually native, so this is a single lookup in practice.
+        return all(self.adjacency[a, b] for k, a in enumerate(indices) for b in indices[k + 1:])
+
+    def validate(self, operations: Iterable[cirq.Operation], start: int = 0) -> List[ValidationIssue]:
+        """Issues of a circuit or operation sequence; indices count from ``start``."""
+        if isinstance(operations, cirq.AbstractCircuit):
+            operations = operations.all_operations()
+        issues = []
+        for index, op in enumerate(operations, start):
+            issues.extend(self.check_operation(op, index))
+        return issues
+
+    def validate_instructions(self, instructions: Iterable["QIRInstruction"],
+                              start: int = 0) -> List[ValidationIssue]:
+        """Issues of QIR instructions, checked without building cirq operations."""
+        issues = []
+        for index, instruction in enumerate(instructions, start):
+            code = OPCODE_INDEX.get(instruction.operation_type)
+            try:
+                exponent = instruction_exponent(instruction.parameters)
+            except ValueError as e:
+                issues.append(ValidationIssue(index, UNSUPPORTED_GATE, str(e), instruction))
+                continue
+            if code is None or not self._opcode_supported(code, exponent):
+                power = '' if exponent is None else f"**{exponent}"
+                issues.append(ValidationIssue(
+                    index, UNSUPPORTED_GATE,
+                    f"{instruction.operation_type}{power} is not supported", instruction))
+                continue
+            qubits = list(instruction.qubits)
+            if len(qubits) != ARITY[code]:
+                issues.append(ValidationIssue(
+                    index, ARITY_MISMATCH,
+                    f"{instruction.operation_type} acts on {ARITY[code]} qubits, got {len(qubits)}",
+                    instruction))
+                continue
+            issues.extend(self._check_indices(index, qubits, instruction))
+        return issues
+
+    def _check_indices(self, index: int, qubits: Sequence[cirq.Qid], item: object,
+                       coupling: bool = True) -> List[ValidationIssue]:
+        if len(set(qubits)) != len(qubits):
+            return [ValidationIssue(index, DUPLICATE_QUBITS, f"Qubits {qubits} repeat", item)]
+        if self.qubit_index is None:
+            return []
+        indices = [self.qubit_index.get(q) for q in qubits]
+        if None in indices:
+            outside = [q for q, i in zip(qubits, indices) if i is None]
+            return [ValidationIssue(index, QUBIT_OUT_OF_RANGE,
+                                    f"Qubits {outside} are not on the device", item)]
+        if coupling and self.adjacency is not None and len(indices) > 1 and not self._coupled(indices):
+            return [ValidationIssue(index, NOT_COUPLED,
+                                    f"Qubits {qubits} are not coupled", item)]
+        return []
+
+    def validate_program(self, program: QIRProgram, start: int = 0) -> List[ValidationIssue]:
+        """Issues of an array-backed QIR program, found with vectorized table lookups."""
+        if not len(program):
+            return []
+        opcodes, slots = program.opcodes, program.qubits
+        arity = ARITY[opcodes]
+        first, second = slots[:, 0], slots[:, 1]
+        flagged: Dict[int, ValidationIssue] = {}
+
+        def flag(mask: np.ndarray, code: str, describe):
+            for i in np.flatnonzero(mask).tolist():
+                if i not in flagged:
+                    flagged[i] = ValidationIssue(start + i, code, describe(i))
+
+        supported = self.opcode_supported[opcodes]
+        powered = np.flatnonzero(~np.isnan(program.params))
+        if len(powered):
+            # One support decision per distinct (opcode, exponent) pair.
+            pairs, inverse = np.unique(
+                np.stack([opcodes[powered].astype(np.float64), program.params[powered]], axis=1),
+                axis=0, return_inverse=True)
+            decisions = np.array([self._opcode_supported(int(code), exponent)
+                                  for code, exponent in pairs.tolist()], dtype=bool)
+            supported[powered] = decisions[inverse.reshape(-1)]
+        flag(~supported, UNSUPPORTED_GATE,
+             lambda i: f"{OPCODES[opcodes[i]]} is not supported" if np.isnan(program.params[i])
+             else f"{OPCODES[opcodes[i]]}**{program.params[i]} is not supported")
+        flag((first == NO_QUBIT) | ((arity == 1) & (second != NO_QUBIT))
+             | ((arity == 2) & (second == NO_QUBIT)), ARITY_MISMATCH,
+             lambda i: f"{OPCODES[opcodes[i]]} has qubit slots {slots[i].tolist()}")
+        flag((arity == 2) & (first == second), DUPLICATE_QUBITS,
+             lambda i: f"{OPCODES[opcodes[i]]} repeats qubit {program.qubit_table[first[i]]}")
+        if self.qubit_index is not None:
+            # Device index of every qubit-table entry; the trailing entry maps
+            # NO_QUBIT slots to themselves.
+            lookup = np.array([self.qubit_index.get(q, -2) for q in program.qubit_table]
+                              + [NO_QUBIT], dtype=np.int64)
+            mapped = lookup[slots]
+            flag((mapped == -2).any(axis=1), QUBIT_OUT_OF_RANGE,
+                 lambda i: f"{OPCODES[opcodes[i]]} uses qubits not on the device")
+            if self.adjacency is not None:
+                pairs = (arity == 2) & (mapped >= 0).all(axis=1)
+                coupled = np.ones(len(program), dtype=bool)
+                coupled[pairs] = self.adjacency[mapped[pairs, 0], mapped[pairs, 1]]
+                flag(~coupled, NOT_COUPLED,
+                     lambda i: f"{OPCODES[opcodes[i]]} acts on uncoupled qubits "
+                               f"{[program.qubit_table[j] for j in slots[i].tolist()]}")
+        return [flagged[i] for i in sorted(flagged)]
+
+
+class ValidationSession:
+    """Incremental validation of a growing program.
+
+    Each batch of appended operations, instructions or program chunks is
+    checked once, against the same validator tables; issue indices keep
+    counting across batches.
+    """
+
+    def __init__(self, validator: CircuitValidator):
+        self.validator = validator
+        self.count = 0
+        self.issues: List[ValidationIssue] = []
+
+    @property
+    def valid(self) -> bool:
+        return not self.issues
+
+    def extend(self, operations: Iterable[cirq.Operation]) -> List[ValidationIssue]:
+        """Check appended cirq operations; returns only their issues."""
+        operations = list(operations)
+        return self._record(self.validator.validate(operations, self.count), len(operations))
+
+    def extend_instructions(self, instructions: Sequence["QIRInstruction"]) -> List[ValidationIssue]:
+        return self._record(self.validator.validate_instructions(instructions, self.count),
+                            len(instructions))
+
+    def extend_program(self, program: QIRProgram) -> List[ValidationIssue]:
+        return self._record(self.validator.validate_program(program, self.count), len(program))
+
+    def _record(self, issues: List[ValidationIssue], count: int) -> List[ValidationIssue]:
+        self.count += count
+        self.issues.extend(issues)
+        return issues
+
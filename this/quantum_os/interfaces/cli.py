@@ -1,8 +1,10 @@
 import click
 import cirq
-from ..kernel.quantum_kernel import QuantumKernel, QuantumTask
+from ..kernel.quantum_kernel import QuantumKernel
+from ..device_manager.topology import TOPOLOGIES, Topology
 from ..device_manager.virtual_device import DeviceManager, DeviceType
 from ..instruction_manager.qir_manager import InstructionManager
+from ..instruction_manager.qir_file import convert_circuit_file, is_qir_file, load_program
 
 class QuantumCLI:
     def __init__(self):
@@ -17,40 +19,81 @@ class QuantumCLI:
 
     @cli.command()
     @click.option('--num-qubits', default=5, help='Number of qubits to initialize')
-    def init_device(self, num_qubits):
+    @click.option('--topology', type=click.Choice(TOPOLOGIES), default=None,
+                  help='Coupling graph; grid and heavy_hex round the qubit count up')
+    @click.option('--name', default='default', help='Name to register the device under')
+    def init_device(self, num_qubits, topology, name):
         """Initialize a new quantum device"""
+        coupling = Topology.from_name(topology, num_qubits) if topology else None
+        if coupling is not None:
+            num_qubits = coupling.num_qubits
         device = self.device_manager.create_device(
-            name="default",
+            name=name,
             device_type=DeviceType.GATE_BASED,
-            num_qubits=num_qubits
+            num_qubits=num_qubits,
+            topology=coupling
         )
-        click.echo(f"Created quantum device with {num_qubits} qubits")
+        click.echo(f"Created quantum device '{name}' with {num_qubits} qubits"
+                   + (f" on a {topology} topology" if topology else ""))
         return device
 
     @cli.command()
     @click.argument('circuit_file')
-    def run_circuit(self, circuit_file):
-        """Run a quantum circuit from a file"""
+    @click.option('--stream', is_flag=True,
+                  help='Simulate a binary circuit file chunk by chunk without building it whole')
+    @click.option('--route', is_flag=True,
+                  help="Insert SWAPs to fit the device's coupling graph before running")
+    @click.option('--device', 'device_name', default='default', help='Device to run on')
+    @click.option('--group', 'group_name', default=None,
+                  help='Device group to run on; the least-loaded device that fits is used')
+    def run_circuit(self, circuit_file, stream, route, device_name, group_name):
+        """Run a quantum circuit from a cirq JSON or binary QIR file"""
         try:
-            # Load and validate circuit
-            circuit = cirq.read_json(circuit_file)
-            if not self.instruction_manager.validate_circuit(circuit):
-                click.echo("Circuit validation failed")
+            if stream:
+                # Only one chunk of the mapped file is turned into cirq objects at a time
+                qubits = load_program(circuit_file).qubits()
+                chunks = self.instruction_manager.stream_program(circuit_file, qubits)
+                result = self.kernel.simulate_stream(chunks, qubits)
+                click.echo(f"Circuit executed successfully")
+                click.echo(f"Result state vector: {result}")
                 return
 
-            # Create and submit task
-            device = self.device_manager.get_device("default")
+            # Load and validate circuit
+            if is_qir_file(circuit_file):
+                circuit = self.instruction_manager.compile_program(load_program(circuit_file).program)
+            else:
+                circuit = cirq.read_json(circuit_file)
+            if group_name is not None:
+                self._run_on_group(circuit, group_name)
+                return
+            device = self.device_manager.get_device(device_name)
             if not device:
-                click.echo("No quantum device initialized")
+                click.echo(f"No quantum device named '{device_name}'")
+                return
+            routed = None
+            if route and device.coupling is not None:
+                routed = self.instruction_manager.route_circuit(circuit, device)
+                circuit = routed.circuit
+                click.echo(f"Routed with {routed.swaps_inserted} SWAPs, "
+                           f"depth {routed.depth_before} -> {routed.depth_after}")
+            issues = self.instruction_manager.check_circuit(circuit, device)
+            if issues:
+                click.echo("Circuit validation failed")
+                for issue in issues:
+                    click.echo(f"  operation {issue.index} [{issue.code}]: {issue.message}")
                 return
 
-            task = QuantumTask(
-                circuit=circuit,
-                qubits=device.get_available_qubits()
-            )
-            
-            task_id = self.kernel.submit_task(task)
-            result = self.kernel.execute_task(task_id)
+            # Create and submit task
+            # Lease qubits on the device; they are released when the task finishes.
+            # A routed circuit keeps the physical qubits the router picked.
+            lease = None
+            if routed is not None:
+                lease = device.allocator.allocate_qubits(sorted(circuit.all_qubits()))
+            handle = self.kernel.submit_on_device(circuit, device.allocator, lease=lease)
+            result = handle.result()
+            if routed is not None:
+                mapping = ', '.join(f"{q} -> {p}" for q, p in sorted(routed.final_mapping.items()))
+                click.echo(f"Final qubit mapping: {mapping}")
             
             click.echo(f"Circuit executed successfully")
             click.echo(f"Result state vector: {result}")
@@ -58,6 +101,60 @@ class QuantumCLI:
         except Exception as e:
             click.echo(f"Error running circuit: {str(e)}")
 
+    def _run_on_group(self, circuit: cirq.Circuit, group_name: str):
+        group = self.device_manager.get_group(group_name)
+        if group is None:
+            click.echo(f"No device group named '{group_name}'")
+            return
+        # Any member may be picked, so the circuit must be valid on all of them
+        for worker in group.workers:
+            issues = self.instruction_manager.check_circuit(circuit, worker.device)
+            if issues:
+                click.echo(f"Circuit validation failed on device '{worker.name}'")
+                for issue in issues:
+                    click.echo(f"  operation {issue.index} [{issue.code}]: {issue.message}")
+                return
+        handle = group.submit(circuit)
+        result = handle.result()
+        click.echo(f"Circuit executed successfully on device '{handle.device}'")
+        click.echo(f"Result state vector: {result}")
+
+    @cli.command()
+    @click.argument('name')
+    @click.argument('devices', nargs=-1, required=True)
+    @click.option('--workers', default=1, help='Worker threads per device')
+    def create_group(self, name, devices, workers):
+        """Group devices so tasks go to the least-loaded one with enough free qubits"""
+        try:
+            self.device_manager.create_group(name, devices, self.kernel, workers_per_device=workers)
+            click.echo(f"Created device group '{name}' with devices {', '.join(devices)}")
+        except Exception as e:
+            click.echo(f"Error creating group: {str(e)}")
+
+    @cli.command()
+    def device_stats(self):
+        """Show utilization, queue length and throughput of devices serving groups"""
+        stats = self.device_manager.device_stats()
+        if not stats:
+            click.echo("No devices serving groups")
+            return
+        for name, device in stats.items():
+            click.echo(f"Device: {name}")
+            click.echo(f"  Utilization: {device['utilization']:.0%}")
+            click.echo(f"  Queue length: {device['queue_length']}")
+            click.echo(f"  Completed: {device['completed']} ({device['throughput']:.2f} tasks/s)")
+
+    @cli.command()
+    @click.argument('source')
+    @click.argument('target')
+    def convert_circuit(self, source, target):
+        """Convert a circuit between cirq JSON, GUI .qc and binary .qirb files"""
+        try:
+            converted = convert_circuit_file(source, target)
+            click.echo(f"Wrote {len(converted.program)} instructions to {target}")
+        except Exception as e:
+            click.echo(f"Error converting circuit: {str(e)}")
+
     @cli.command()
     def list_devices(self):
         """List all available quantum devices"""
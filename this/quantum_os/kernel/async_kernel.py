@@ -0,0 +1,67 @@
+import asyncio
+import dataclasses
+import numpy as np
+from typing import AsyncIterator, Dict, Optional, Tuple
+from .quantum_kernel import QuantumKernel, QuantumTask
+from .scheduler import TaskHandle
+
+
+class AsyncQuantumKernel:
+    """asyncio front-end for QuantumKernel.
+
+    Tasks still run on the kernel's scheduler threads; this class only
+    bridges their handles into the running event loop. Cancelling an
+    awaited task (or its future) stops the simulation at its next gate, and
+    a task that outlives its deadline fails with TimeoutError.
+    """
+
+    def __init__(self, kernel: Optional[QuantumKernel] = None, **kernel_options):
+        self.kernel = kernel or QuantumKernel(**kernel_options)
+        self._pending: Dict[asyncio.Future, TaskHandle] = {}
+        self._completed: asyncio.Queue = asyncio.Queue()
+
+    def schedule(self, task: QuantumTask, deadline: Optional[float] = None) -> asyncio.Future:
+        """Submit a task without waiting and return an asyncio future for its result.
+
+        ``deadline`` overrides the task's own deadline, in seconds from now.
+        Cancelling the future cancels the kernel task. Scheduled tasks are
+        reported by ``completed()`` when they finish.
+        """
+        handle, future = self._submit(task, deadline)
+        self._pending[future] = handle
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def submit(self, task: QuantumTask, deadline: Optional[float] = None) -> np.ndarray:
+        """Submit a task and wait for its final state vector."""
+        _, future = self._submit(task, deadline)
+        return await future
+
+    def _submit(self, task: QuantumTask, deadline: Optional[float]):
+        if deadline is not None:
+            task = dataclasses.replace(task, deadline=deadline)
+        handle = self.kernel.submit_task(task)
+        return handle, asyncio.wrap_future(handle)
+
+    async def completed(self) -> AsyncIterator[Tuple[int, asyncio.Future]]:
+        """Yield ``(task_id, future)`` for scheduled tasks in completion order.
+
+        Iteration ends once no scheduled task is pending. The future holds
+        the result, or the CancelledError/TimeoutError/exception it ended with.
+        """
+        while self._pending or not self._completed.empty():
+            yield await self._completed.get()
+
+    def __aiter__(self) -> AsyncIterator[Tuple[int, asyncio.Future]]:
+        return self.completed()
+
+    async def shutdown(self, wait: bool = True):
+        """Cancel pending tasks and stop the kernel's workers."""
+        for future in list(self._pending):
+            future.cancel()
+        await asyncio.get_running_loop().run_in_executor(None, self.kernel.shutdown, wait)
+
+    def _on_done(self, future: asyncio.Future):
+        handle = self._pending.pop(future, None)
+        if handle is not None:
+            self._completed.put_nowait((handle.task_id, future))
@@ -0,0 +1,122 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import cirq
+import numpy as np
+
+from .engines import create_engines, select_engine
+
+# Arena size when none is given; windows of the batch are simulated into it in turn.
+DEFAULT_WINDOW_BYTES = 256 * 2**20
+
+# Per-worker state, populated once by _init_worker.
+_worker_circuits: List[cirq.Circuit] = []
+_worker_shm: Optional[shared_memory.SharedMemory] = None
+_worker_engines: dict = {}
+_worker_engine_name = 'cirq'
+_worker_dtype = np.dtype(np.complex128)
+
+
+def _init_worker(shm_name: str, circuits_blob: bytes, engine: str, dtype: np.dtype):
+    """Attach the shared result arena and unpickle the batch once per worker."""
+    global _worker_circuits, _worker_shm, _worker_engines, _worker_engine_name, _worker_dtype
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_circuits = pickle.loads(circuits_blob)
+    _worker_engines = create_engines(dtype=dtype)
+    _worker_engine_name = engine
+    _worker_dtype = np.dtype(dtype)
+
+
+def _run_index(job: Tuple[int, int]) -> int:
+    """Simulate one circuit of the batch and write its state at an arena offset."""
+    index, offset = job
+    circuit = _worker_circuits[index]
+    state = select_engine(_worker_engines, _worker_engine_name, circuit).simulate(circuit)
+    out = np.ndarray((state_size(circuit),), dtype=_worker_dtype,
+                     buffer=_worker_shm.buf, offset=offset)
+    out[:] = state
+    return index
+
+
+def state_size(circuit: cirq.Circuit) -> int:
+    """Number of amplitudes in the final state vector of a circuit."""
+    return 2 ** len(circuit.all_qubits())
+
+
+def pool_workers(num_circuits: int, max_workers: Optional[int] = None) -> int:
+    """Worker processes a pool over num_circuits circuits starts."""
+    return max(1, min(max_workers or os.cpu_count() or 1, num_circuits))
+
+
+def arena_bytes(circuits: Sequence[cirq.Circuit], dtype=np.complex128,
+                window_bytes: int = DEFAULT_WINDOW_BYTES) -> int:
+    """Shared-memory arena size for a batch: one window, at least its largest state."""
+    itemsize = np.dtype(dtype).itemsize
+    sizes = [state_size(circuit) * itemsize for circuit in circuits]
+    return min(sum(sizes), max(window_bytes, max(sizes, default=0)))
+
+
+def iter_process_pool(circuits: Sequence[cirq.Circuit], max_workers: Optional[int] = None,
+                      mp_context=None, engine: str = 'cirq', dtype=np.complex128,
+                      window_bytes: int = DEFAULT_WINDOW_BYTES
+                      ) -> Iterator[Tuple[int, np.ndarray]]:
+    """Simulate circuits across a process pool, yielding (index, state) in input order.
+
+    Circuits are pickled once and shipped to each worker at start-up. The
+    batch is cut into consecutive windows whose states fit one shared-memory
+    arena of ``arena_bytes`` bytes; workers write a window's states into it
+    and the arena is reused by the next window. Yielded states are views into
+    the arena, valid until the next window starts, so copy those to keep.
+    """
+    if not circuits:
+        return
+    dtype = np.dtype(dtype)
+    sizes = [state_size(circuit) for circuit in circuits]
+    capacity = arena_bytes(circuits, dtype, window_bytes)
+    windows: List[List[Tuple[int, int]]] = [[]]
+    used = 0
+    for index, size in enumerate(sizes):
+        nbytes = size * dtype.itemsize
+        if used + nbytes > capacity:
+            windows.append([])
+            used = 0
+        windows[-1].append((index, used))
+        used += nbytes
+
+    circuits_blob = pickle.dumps(list(circuits), protocol=pickle.HIGHEST_PROTOCOL)
+    shm = shared_memory.SharedMemory(create=True, size=max(capacity, 1))
+    try:
+        workers = pool_workers(len(circuits), max_workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(shm.name, circuits_blob, engine, dtype)
+        ) as executor:
+            for window in windows:
+                chunksize = max(1, len(window) // (4 * workers))
+                for _ in executor.map(_run_index, window, chunksize=chunksize):
+                    pass
+                for index, offset in window:
+                    yield index, np.ndarray((sizes[index],), dtype=dtype,
+                                            buffer=shm.buf, offset=offset)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def simulate_in_process_pool(circuits: Sequence[cirq.Circuit],
+                             max_workers: Optional[int] = None,
+                             mp_context=None, engine: str = 'cirq',
+                             dtype=np.complex128,
+                             window_bytes: int = DEFAULT_WINDOW_BYTES) -> List[np.ndarray]:
+    """Simulate circuits across a process pool and return their state vectors.
+
+    States are copied out of the reused arena window by window, so peak
+    memory is the results plus one window rather than twice the batch.
+    """
+    return [state.copy() for _, state in iter_process_pool(
+        circuits, max_workers, mp_context, engine, dtype, window_bytes)]
@@ -0,0 +1,151 @@
+import cirq
+import numpy as np
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .statevector_engine import StateBuffer, _apply_matrix1, _apply_matrix2, _apply_matrix_n
+from .sweep import DEFAULT_CHUNK_BYTES, _apply_batched
+
+Step = Tuple[Tuple[int, ...], np.ndarray, np.ndarray]
+
+
+class BatchedCircuitEngine:
+    """Simulates many circuits of the same width as one (batch, 2**n) state.
+
+    Each circuit is lowered to (axes, matrix) operations. The programs are
+    then merged step by step: every step applies one operation per row on
+    the same axes, with the matrix chosen per row from a small table of
+    distinct gates (rows whose next operation is elsewhere get the
+    identity). Circuits that only differ in gate choices, such as
+    randomized benchmarking sequences, merge into one step per operation.
+    """
+
+    name = 'batched'
+
+    def __init__(self, dtype=np.complex128):
+        self.dtype = np.dtype(dtype)
+
+    def supports(self, circuits: Sequence[cirq.AbstractCircuit]) -> bool:
+        """Whether measurements are terminal and every other operation a non-parameterized unitary."""
+        checked: Dict[cirq.Gate, bool] = {}
+        for circuit in circuits:
+            if not circuit.are_all_measurements_terminal():
+                return False
+            for op in circuit.all_operations():
+                gate = op.gate
+                if isinstance(gate, cirq.MeasurementGate):
+                    if gate.confusion_map:
+                        return False
+                    continue
+                # Distinct gates are few across a batch, so check each once.
+                ok = checked.get(gate) if gate is not None else None
+                if ok is None:
+                    ok = not cirq.is_parameterized(op) and cirq.has_unitary(op)
+                    if gate is not None:
+                        checked[gate] = ok
+                if not ok:
+                    return False
+        return True
+
+    def compile(self, circuits: Sequence[cirq.AbstractCircuit],
+                qubit_orders: Sequence[Sequence[cirq.Qid]]) -> List[Step]:
+        """Merge the circuits' unitary parts into (axes, gate table, row selection) steps."""
+        # Distinct gates are few across a batch; matrices are shared for this call only.
+        unitaries: Dict[cirq.Gate, np.ndarray] = {}
+        programs = [self._lower(c, order, unitaries) for c, order in zip(circuits, qubit_orders)]
+        positions = [0] * len(programs)
+        steps: List[Step] = []
+        while True:
+            pending = [(row, program[positions[row]][0]) for row, program in enumerate(programs)
+                       if positions[row] < len(program)]
+            if not pending:
+                return steps
+            # Serve the axes most rows are waiting on; the others idle this step.
+            axes = Counter(axes for _, axes in pending).most_common(1)[0][0]
+            dim = 2 ** len(axes)
+            table = [np.eye(dim, dtype=self.dtype)]
+            keys = {table[0].tobytes(): 0}
+            selection = np.zeros(len(programs), dtype=np.intp)
+            for row, row_axes in pending:
+                if row_axes != axes:
+                    continue
+                matrix = programs[row][positions[row]][1]
+                key = matrix.tobytes()
+                if key not in keys:
+                    keys[key] = len(table)
+                    table.append(matrix)
+                selection[row] = keys[key]
+                positions[row] += 1
+            steps.append((axes, np.stack(table), selection))
+
+    def _lower(self, circuit: cirq.AbstractCircuit, qubits: Sequence[cirq.Qid],
+               unitaries: Dict[cirq.Gate, np.ndarray]) -> List[Tuple[Tuple[int, ...], np.ndarray]]:
+        # Axes are sorted (permuting the matrix to match) so CNOT(a, b) and
+        # CNOT(b, a) land on the same axes and can share a step.
+        index = {q: i for i, q in enumerate(qubits)}
+        program = []
+        for op in circuit.all_operations():
+            if isinstance(op.gate, cirq.MeasurementGate):
+                continue
+            u = self._unitary(op, unitaries)
+            axes = [index[q] for q in op.qubits]
+            order = sorted(range(len(axes)), key=axes.__getitem__)
+            if order != list(range(len(axes))):
+                k = len(axes)
+                u = u.reshape((2,) * (2 * k)).transpose(order + [k + i for i in order])
+                u = u.reshape(2 ** k, 2 ** k)
+            program.append((tuple(sorted(axes)), np.ascontiguousarray(u, dtype=self.dtype)))
+        return program
+
+    @staticmethod
+    def _unitary(op: cirq.Operation, unitaries: Dict[cirq.Gate, np.ndarray]) -> np.ndarray:
+        gate = op.gate
+        if gate is None:
+            return cirq.unitary(op)
+        u = unitaries.get(gate)
+        if u is None:
+            u = unitaries[gate] = cirq.unitary(gate)
+        return u
+
+    def run(self, steps: List[Step], buf: StateBuffer):
+        """Apply merged steps to a buffer with one row per circuit."""
+        buf.reset()
+        for axes, table, selection in steps:
+            if len(table) == 2 and selection.all():
+                # Every row applies the same gate: use the shared-matrix kernels.
+                u = table[1]
+                if len(axes) == 1:
+                    _apply_matrix1(buf, axes[0], u)
+                elif len(axes) == 2:
+                    _apply_matrix2(buf, axes[0], axes[1], u.reshape(2, 2, 2, 2))
+                else:
+                    _apply_matrix_n(buf, axes, u)
+            else:
+                _apply_batched(buf, axes, table[selection])
+
+    def chunk_size(self, num_qubits: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> int:
+        """Circuits per chunk so the state, spare and scratch buffers fit chunk_bytes."""
+        row_bytes = 3 * self.dtype.itemsize * 2 ** num_qubits
+        return max(1, chunk_bytes // row_bytes)
+
+    def simulate(self, circuits: Sequence[cirq.AbstractCircuit],
+                 qubit_orders: Sequence[Sequence[cirq.Qid]],
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (start, states) per chunk; row i of states is circuit start + i.
+
+        All qubit orders must have the same length. The state array is
+        reused by the next chunk, so copy rows to keep them.
+        """
+        widths = {len(order) for order in qubit_orders}
+        if len(widths) > 1:
+            raise ValueError("Batched circuits must all have the same number of qubits")
+        num_qubits = widths.pop() if widths else 0
+        chunk = self.chunk_size(num_qubits, chunk_bytes)
+        buf: Optional[StateBuffer] = None
+        for start in range(0, len(circuits), chunk):
+            part = slice(start, start + chunk)
+            steps = self.compile(circuits[part], qubit_orders[part])
+            size = len(circuits[part])
+            if buf is None or buf.batch != size:
+                buf = StateBuffer(num_qubits, batch=size, dtype=self.dtype)
+            self.run(steps, buf)
+            yield start, buf.state
@@ -0,0 +1,53 @@
+import cirq
+import numpy as np
+from typing import Callable, Dict, Optional, Sequence
+from .statevector_engine import NumpyStateVectorEngine
+
+
+class CirqEngine:
+    """Engine backed by cirq's generic state-vector simulator."""
+
+    name = 'cirq'
+
+    def __init__(self, simulator: Optional[cirq.Simulator] = None):
+        self.simulator = simulator or cirq.Simulator()
+
+    def supports(self, circuit: cirq.AbstractCircuit) -> bool:
+        return True
+
+    def simulate(self, circuit: cirq.AbstractCircuit,
+                 qubit_order: Optional[Sequence[cirq.Qid]] = None,
+                 checkpoint: Optional[Callable[[], None]] = None) -> np.ndarray:
+        order = qubit_order if qubit_order is not None else cirq.QubitOrder.DEFAULT
+        if checkpoint is None or not len(circuit):
+            return self.simulator.simulate(circuit, qubit_order=order).final_state_vector
+        # Step moment by moment so a cancelled task stops between moments.
+        for step in self.simulator.simulate_moment_steps(circuit, qubit_order=order):
+            checkpoint()
+        return step.state_vector(copy=True)
+
+
+ENGINE_NAMES = ('auto', 'cirq', 'numpy')
+
+
+def create_engines(simulator: Optional[cirq.Simulator] = None,
+                   dtype=np.complex128) -> Dict[str, object]:
+    """Instantiate the available simulation engines keyed by name."""
+    return {
+        'cirq': CirqEngine(simulator or cirq.Simulator(dtype=dtype)),
+        'numpy': NumpyStateVectorEngine(dtype=dtype),
+    }
+
+
+def select_engine(engines: Dict[str, object], name: str, circuit: cirq.AbstractCircuit):
+    """Resolve an engine name for a circuit.
+
+    ``'auto'`` prefers the native NumPy engine and falls back to cirq for
+    circuits it cannot run (measurements, channels, symbolic parameters).
+    """
+    if name == 'auto':
+        native = engines['numpy']
+        return native if native.supports(circuit) else engines['cirq']
+    if name not in engines:
+        raise ValueError(f"Unknown simulation engine: {name}")
+    return engines[name]
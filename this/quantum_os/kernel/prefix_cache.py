@@ -0,0 +1,73 @@
+import hashlib
+import cirq
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from .result_cache import ResultCache
+
+
+def split_parameter_free_prefix(circuit: cirq.AbstractCircuit) -> Tuple[cirq.Circuit, cirq.Circuit]:
+    """Split a circuit into its longest parameter-free prefix and the rest.
+
+    An operation joins the prefix unless it is parameterized or one of its
+    qubits was already touched by an operation left for the tail, so the
+    prefix is the whole parameter-independent past of the circuit rather
+    than just its leading moments.
+    """
+    prefix, tail = [], []
+    blocked = set()
+    for op in circuit.all_operations():
+        if cirq.is_parameterized(op) or blocked.intersection(op.qubits):
+            tail.append(op)
+            blocked.update(op.qubits)
+        else:
+            prefix.append(op)
+    return cirq.Circuit(prefix), cirq.Circuit(tail)
+
+
+def prefix_keys(operations: Sequence[cirq.Operation], qubits: Sequence[cirq.Qid]) -> List[str]:
+    """Content hashes of every prefix of an operation list over a qubit order.
+
+    ``keys[i]`` covers the first i operations, so circuits that share
+    leading operations share keys up to where they diverge.
+    """
+    digest = hashlib.sha256()
+    for qubit in qubits:
+        digest.update(repr(qubit).encode())
+        digest.update(b',')
+    digest.update(b'|')
+    keys = [digest.hexdigest()]
+    for operation in operations:
+        digest.update(repr(operation).encode())
+        digest.update(b';')
+        keys.append(digest.hexdigest())
+    return keys
+
+
+class PrefixStateCache:
+    """States reached after circuit prefixes, for resuming related simulations.
+
+    A simulation stores its final state under the hash of its operations;
+    a later circuit that starts with the same operations on the same qubit
+    order resumes from that state and only simulates what it adds.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20):
+        self.states = ResultCache(max_bytes=max_bytes)
+
+    def longest(self, operations: Sequence[cirq.Operation],
+                qubits: Sequence[cirq.Qid]) -> Tuple[int, Optional[np.ndarray]]:
+        """Return (length, state) of the longest cached non-empty prefix, or (0, None)."""
+        keys = prefix_keys(operations, qubits)
+        for length in range(len(operations), 0, -1):
+            state = self.states.get(keys[length])
+            if state is not None:
+                return length, state
+        return 0, None
+
+    def put(self, operations: Sequence[cirq.Operation], qubits: Sequence[cirq.Qid],
+            state: np.ndarray):
+        if operations:
+            self.states.put(prefix_keys(operations, qubits)[-1], state)
+
+    def stats(self):
+        return self.states.stats()
@@ -1,55 +1,630 @@
+import threading
 import cirq
 import numpy as np
-from typing import List, Dict, Optional
+from concurrent.futures import CancelledError
+from typing import Callable, Iterable, List, Dict, Optional, Sequence, Union
 from dataclasses import dataclass
+from .scheduler import TaskHandle, TaskScheduler
+from .batch_executor import (DEFAULT_WINDOW_BYTES, arena_bytes, pool_workers,
+                             simulate_in_process_pool)
+from .result_cache import ResultCache, circuit_fingerprint
+from .batched_circuits import BatchedCircuitEngine
+from .engines import ENGINE_NAMES, create_engines, select_engine
+from .sampling import (has_terminal_measurements_only, independent_components,
+                       measurement_records, qubit_bits, sample_indices, split_measurements)
+from .resources import MemoryBudget, MemoryEstimate, estimate_memory, precision_dtype
+from .expectation import pauli_expectations
+from .mps_engine import MPSEngine, MPSState
+from .prefix_cache import PrefixStateCache
+from .stabilizer_engine import StabilizerEngine
+from .statevector_engine import NumpyStateVectorEngine, StateBuffer
+from .sweep import DEFAULT_CHUNK_BYTES, SweepEngine
+from .trajectory_engine import TrajectoryEngine, TrajectoryResult
+from .task_store import TaskRecord, TaskStore
+from ..instruction_manager.gate_fusion import GateFusionPass
+from ..device_manager.qubit_allocator import QubitAllocator, QubitLease, pack_circuits, remap_circuit
 
 @dataclass
 class QuantumTask:
     circuit: cirq.Circuit
     qubits: List[cirq.Qid]
-    priority: int = 0
+    priority: int = 0  # Higher priority tasks are scheduled first
     noise_model: Optional[Dict] = None
+    deadline: Optional[float] = None  # Seconds after submission before the task times out
 
 class QuantumKernel:
-    def __init__(self):
-        self.task_queue = []
-        self.available_qubits = [cirq.LineQubit(i) for i in range(10)]  # Default 10 qubits
-        self.simulator = cirq.Simulator()
-
-    def submit_task(self, task: QuantumTask) -> int:
-        """Submit a quantum task to the kernel."""
-        task_id = len(self.task_queue)
-        self.task_queue.append(task)
-        return task_id
-
-    def execute_task(self, task_id: int) -> np.ndarray:
-        """Execute a quantum task and return results."""
-        if task_id >= len(self.task_queue):
-            raise ValueError("Invalid task ID")
-        
-        task = self.task_queue[task_id]
-        
-        # Apply noise model if specified
-        if task.noise_model:
-            noisy_circuit = self.apply_noise_model(task.circuit, task.noise_model)
-            result = self.simulator.simulate(noisy_circuit)
+    def __init__(self, num_workers: int = 1, cache_bytes: int = 256 * 2**20,
+                 cache_dir: Optional[str] = None, engine: str = 'auto',
+                 fuse_gates: bool = False, num_qubits: int = 10,
+                 precision: str = 'double', memory_budget_bytes: Optional[int] = None,
+                 max_tasks: int = 10000, task_ttl: Optional[float] = None,
+                 spill_dir: Optional[str] = None, spill_bytes: int = 1 << 20,
+                 mps_max_bond: int = 64, mps_min_qubits: int = 25,
+                 prefix_cache_bytes: int = 64 * 2**20):
+        if engine not in ENGINE_NAMES:
+            raise ValueError(f"Unknown simulation engine: {engine}")
+        # Bounded registry of submitted tasks and their results
+        self.tasks = TaskStore(max_tasks=max_tasks, ttl=task_ttl,
+                               spill_dir=spill_dir, spill_bytes=spill_bytes)
+        self.available_qubits = [cirq.LineQubit(i) for i in range(num_qubits)]
+        self.qubit_allocator = QubitAllocator(self.available_qubits)
+        # 'single' opts into complex64 state vectors, halving memory
+        self.precision = precision
+        self.dtype = precision_dtype(precision)
+        self.memory_budget = MemoryBudget(memory_budget_bytes)
+        self.simulator = cirq.Simulator(dtype=self.dtype)
+        self.engine = engine
+        self.engines = create_engines(self.simulator, dtype=self.dtype)
+        self.trajectory_engine = TrajectoryEngine(dtype=self.dtype, num_workers=num_workers)
+        # Clifford circuits are sampled from a stabilizer tableau in polynomial time
+        self.stabilizer_engine = StabilizerEngine()
+        # Wide non-Clifford circuits are sampled from a bond-capped MPS
+        self.mps_engine = MPSEngine(max_bond=mps_max_bond, dtype=self.dtype)
+        self.mps_min_qubits = mps_min_qubits
+        self.last_truncation_error = 0.0  # Discarded MPS weight of the latest MPS run
+        self.sweep_engine = SweepEngine(dtype=self.dtype)
+        self.batch_engine = BatchedCircuitEngine(dtype=self.dtype)
+        self.fusion_pass = GateFusionPass() if fuse_gates else None
+        self.sweeps_saved = 0  # Total state sweeps removed by gate fusion
+        self._counter_lock = threading.Lock()
+        # A zero byte budget without a disk tier disables result caching
+        self.result_cache = (
+            ResultCache(max_bytes=cache_bytes, disk_dir=cache_dir)
+            if cache_bytes > 0 or cache_dir else None
+        )
+        # States after shared circuit prefixes, so related circuits resume instead of restarting
+        self.prefix_cache = PrefixStateCache(prefix_cache_bytes) if prefix_cache_bytes > 0 else None
+        self.scheduler = TaskScheduler(self.execute_task, num_workers=num_workers)
+
+    def submit_task(self, task: QuantumTask,
+                    scheduler: Optional[TaskScheduler] = None) -> TaskHandle:
+        """Submit a quantum task to the kernel and schedule it by priority.
+
+        Returns a future-like handle; ``handle.result()`` blocks until the
+        task's state vector is available and ``handle.task_id`` identifies it.
+        ``scheduler`` queues the task on other workers than the kernel's own,
+        e.g. a device worker of a ``DeviceGroup``; it must run ``execute_task``.
+        """
+        self._check_admission(task)
+        task_id = self.tasks.add(task)
+        scheduler = scheduler or self.scheduler
+        handle = scheduler.schedule(task_id, task.priority, timeout=task.deadline)
+        handle.add_done_callback(self._record_outcome)
+        return handle
+
+    def _record_outcome(self, handle: TaskHandle):
+        if handle.cancelled():
+            self.tasks.finish(handle.task_id, error=CancelledError())
+        elif handle.exception() is not None:
+            self.tasks.finish(handle.task_id, error=handle.exception())
+        else:
+            self.tasks.finish(handle.task_id, result=handle.result())
+
+    def get_task(self, task_id: int) -> QuantumTask:
+        """Return a submitted task, raising ValueError once it has been evicted."""
+        try:
+            return self.tasks.get_task(task_id)
+        except KeyError:
+            raise ValueError(f"Invalid task ID: {task_id}") from None
+
+    def get_result(self, task_id: int) -> Optional[np.ndarray]:
+        """Return a finished task's state vector (None while it is pending)."""
+        try:
+            record = self.tasks.record(task_id)
+        except KeyError:
+            raise ValueError(f"Invalid task ID: {task_id}") from None
+        if record.error is not None:
+            raise record.error
+        return self.tasks.result(task_id)
+
+    def task_record(self, task_id: int) -> TaskRecord:
+        """Return status and timing of a submitted task."""
+        try:
+            return self.tasks.record(task_id)
+        except KeyError:
+            raise ValueError(f"Invalid task ID: {task_id}") from None
+
+    def estimate_memory(self, task: QuantumTask) -> MemoryEstimate:
+        """Estimate a task's state-vector and density-matrix footprint."""
+        num_qubits = len(set(task.qubits) | task.circuit.all_qubits())
+        return estimate_memory(num_qubits, self.dtype)
+
+    def memory_stats(self) -> Dict[str, Optional[int]]:
+        """Return reserved, peak and budgeted simulation memory."""
+        return self.memory_budget.stats()
+
+    def _check_admission(self, task: QuantumTask) -> MemoryEstimate:
+        """Reject up front a task that can never fit in the memory budget.
+
+        Tasks that fit the budget but not the memory currently free are
+        queued: they wait for a reservation when they are executed.
+        """
+        estimate = self.estimate_memory(task)
+        if not self.memory_budget.fits(estimate.state_vector_bytes):
+            raise ValueError(
+                f"Task on {estimate.num_qubits} qubits needs an estimated "
+                f"{estimate.state_vector_bytes} bytes, over the memory budget of "
+                f"{self.memory_budget.limit_bytes} bytes"
+            )
+        return estimate
+
+    def scheduler_stats(self) -> Dict[str, float]:
+        """Return queue-depth and wait-time counters of the scheduler."""
+        return self.scheduler.stats()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the scheduler workers."""
+        self.scheduler.shutdown(wait=wait)
+
+    def close(self):
+        """Stop the workers and discard stored tasks, deleting spilled results."""
+        self.shutdown()
+        self.tasks.close()
+
+    def execute_task(self, task_id: int,
+                     checkpoint: Optional[Callable[[], None]] = None) -> np.ndarray:
+        """Execute a quantum task and return results.
+
+        Noiseless results are memoized by circuit fingerprint, precision and
+        engine; cached state vectors are shared and therefore read-only.
+        Noisy tasks sample a fresh trajectory on every run and are never
+        cached. ``checkpoint`` is called between gates and may raise to
+        abandon the simulation.
+        """
+        task = self.get_task(task_id)
+        if self.result_cache is None or task.noise_model:
+            return self._simulate_task(task, checkpoint)
+        key = self._cache_key('task', task.circuit)
+        return self.result_cache.get_or_compute(key, lambda: self._simulate_task(task, checkpoint),
+                                                checkpoint=checkpoint)
+
+    def _simulate_task(self, task: QuantumTask,
+                       checkpoint: Optional[Callable[[], None]] = None) -> np.ndarray:
+        nbytes = self._check_admission(task).state_vector_bytes
+        if checkpoint is None:
+            self.memory_budget.reserve(nbytes)
         else:
-            result = self.simulator.simulate(task.circuit)
-            
-        return result.final_state_vector
+            # Poll so a task cancelled while waiting for memory gives up.
+            while not self.memory_budget.reserve(nbytes, timeout=0.1):
+                checkpoint()
+        try:
+            circuit = self._prepare_circuit(task)
+            engine = select_engine(self.engines, self.engine, circuit)
+            return engine.simulate(circuit, checkpoint=checkpoint)
+        finally:
+            self.memory_budget.release(nbytes)
+
+    def execute_many(self, tasks: Sequence[Union[int, QuantumTask]],
+                     max_workers: Optional[int] = None) -> List[np.ndarray]:
+        """Execute many tasks (ids or QuantumTasks) across a process pool.
+
+        Results are returned in input order. State vectors come back through
+        shared memory rather than being pickled. The workers' working sets
+        and the shared arena are reserved against the memory budget first,
+        waiting for running tasks to free memory; the arena shrinks to what
+        the budget leaves over.
+        """
+        circuits = []
+        per_task = 0
+        for task in tasks:
+            if not isinstance(task, QuantumTask):
+                task = self.get_task(task)
+            per_task = max(per_task, self._check_admission(task).state_vector_bytes)
+            circuits.append(self._prepare_circuit(task))
+        if not circuits:
+            return []
+        workers = pool_workers(len(circuits), max_workers)
+        window = DEFAULT_WINDOW_BYTES
+        limit = self.memory_budget.limit_bytes
+        if limit is not None:
+            # Fewer workers rather than failing: the arena needs at least the
+            # largest state, and each worker one task's working set.
+            min_arena = arena_bytes(circuits, self.dtype, 0)
+            workers = max(1, min(workers, (limit - min_arena) // per_task))
+            window = max(0, min(window, limit - workers * per_task))
+        working = workers * per_task
+        nbytes = working + arena_bytes(circuits, self.dtype, window)
+        self.memory_budget.reserve(nbytes)
+        try:
+            return simulate_in_process_pool(circuits, max_workers=workers, engine=self.engine,
+                                            dtype=self.dtype, window_bytes=window)
+        finally:
+            self.memory_budget.release(nbytes)
+
+    def sample(self, circuit: cirq.Circuit, repetitions: int = 1000,
+               simulator: Optional[cirq.SimulatesSamples] = None,
+               seed: Optional[int] = None) -> cirq.Result:
+        """Sample measurement results of a circuit.
+
+        Circuits whose measurements are all terminal and that carry no noise
+        are simulated once; all shots are then drawn from the final-state
+        probabilities in one vectorized pass. With the 'auto' engine,
+        all-Clifford circuits skip the state vector and are sampled from a
+        stabilizer tableau instead, and circuits on at least
+        ``mps_min_qubits`` qubits are sampled from a matrix product state
+        (see ``last_truncation_error``). Anything else, or a noisy ``simulator``,
+        falls back to ``simulator.run`` (the kernel's own simulator by
+        default).
+        """
+        noisy = simulator is not None and getattr(simulator, 'noise', cirq.NO_NOISE) != cirq.NO_NOISE
+        if noisy or not has_terminal_measurements_only(circuit):
+            return (simulator or self.simulator).run(circuit, repetitions=repetitions)
+
+        rng = np.random.default_rng(seed)
+        if self._use_stabilizer(circuit):
+            return self.stabilizer_engine.sample(circuit, repetitions, rng)
+
+        unitary, measurements = split_measurements(circuit)
+        if self._use_mps(circuit):
+            qubits = sorted(circuit.all_qubits())
+            samples = self.simulate_mps(unitary, qubits).sample(repetitions, rng)
+            bits = {q: samples[:, i] for i, q in enumerate(qubits)}
+            return cirq.ResultDict(
+                params=cirq.ParamResolver({}),
+                records=measurement_records(measurements, bits)
+            )
+
+        bits = {}
+        # Qubits that never interact are sampled independently, so packed or
+        # otherwise disjoint circuits never pay for their joint state.
+        for qubits in independent_components(circuit):
+            members = set(qubits)
+            component = cirq.Circuit(op for op in unitary.all_operations() if op.qubits[0] in members)
+            if self.result_cache is not None:
+                # Own namespace: an empty component still has a 2**len(qubits)
+                # state, unlike execute_task's result for the same circuit.
+                key = self._cache_key(f"sample-component:{len(qubits)}", component)
+                state = self.result_cache.get_or_compute(
+                    key, lambda: self._final_state(component, qubits)
+                )
+            else:
+                state = self._final_state(component, qubits)
+            indices = sample_indices(np.abs(state) ** 2, repetitions, rng)
+            bits.update(qubit_bits(indices, qubits))
+        return cirq.ResultDict(
+            params=cirq.ParamResolver({}),
+            records=measurement_records(measurements, bits)
+        )
+
+    def expectation_values(self, circuit: cirq.Circuit,
+                           observables: Union[cirq.PauliSum, Sequence[cirq.PauliString]]) -> np.ndarray:
+        """Expectation values of Pauli strings (or a PauliSum's terms) on the circuit's final state.
+
+        Terminal measurements are ignored. With the 'auto' engine,
+        all-Clifford circuits are evaluated on a stabilizer tableau; others
+        run once and every term is reduced directly from the final state
+        vector, without sampling.
+        """
+        if not has_terminal_measurements_only(circuit):
+            raise ValueError("Expectation values need a circuit without mid-circuit measurements")
+        observables = list(observables)
+        qubits = sorted(circuit.all_qubits().union(*(p.qubits for p in observables)))
+        if self._use_stabilizer(circuit):
+            tableau = self.stabilizer_engine.simulate(circuit, qubits)
+            return np.array([self.stabilizer_engine.expectation(tableau, p, qubits)
+                             for p in observables], dtype=np.complex128)
+        unitary, _ = split_measurements(circuit)
+        return pauli_expectations(self._final_state(unitary, qubits), observables, qubits)
+
+    def expectation(self, circuit: cirq.Circuit,
+                    observable: Union[cirq.PauliSum, cirq.PauliString]) -> complex:
+        """Expectation value of a Pauli string or of a whole PauliSum (e.g. a Hamiltonian)."""
+        if isinstance(observable, cirq.PauliString):
+            observable = [observable]
+        return complex(self.expectation_values(circuit, observable).sum())
+
+    def simulate_mps(self, circuit: cirq.Circuit,
+                     qubit_order: Optional[Sequence[cirq.Qid]] = None) -> MPSState:
+        """Simulate a circuit's unitary part as a matrix product state."""
+        state = self.mps_engine.simulate(circuit, qubit_order)
+        self.last_truncation_error = state.truncation_error
+        return state
+
+    def amplitudes(self, circuit: cirq.Circuit, bitstrings: Sequence[Sequence[int]],
+                   qubit_order: Optional[Sequence[cirq.Qid]] = None) -> np.ndarray:
+        """Amplitudes of the circuit's final state for the given bitstrings.
+
+        Each bitstring lists one bit per qubit in ``qubit_order`` (sorted
+        qubits by default). Wide circuits are contracted from an MPS one
+        bitstring at a time instead of building the state vector.
+        """
+        qubits = list(qubit_order) if qubit_order is not None else sorted(circuit.all_qubits())
+        bits = np.atleast_2d(np.asarray(bitstrings, dtype=np.intp))
+        if bits.shape[1] != len(qubits):
+            raise ValueError(f"Bitstrings need {len(qubits)} bits, got {bits.shape[1]}")
+        unitary, _ = split_measurements(circuit)
+        if self._use_mps(circuit):
+            return self.simulate_mps(unitary, qubits).amplitudes(bits)
+        state = self._final_state(unitary, qubits)
+        weights = 1 << np.arange(len(qubits) - 1, -1, -1, dtype=np.int64)
+        return state[bits @ weights]
+
+    def _use_stabilizer(self, circuit: cirq.Circuit) -> bool:
+        return self.engine == 'auto' and self.stabilizer_engine.supports(circuit)
+
+    def _use_mps(self, circuit: cirq.Circuit) -> bool:
+        return (self.engine == 'auto' and len(circuit.all_qubits()) >= self.mps_min_qubits
+                and self.mps_engine.supports(circuit))
+
+    def sample_sweep(self, circuit: cirq.Circuit, params: cirq.Sweepable,
+                     repetitions: int = 1000, seed: Optional[int] = None) -> List[cirq.Result]:
+        """Sample a parameterized circuit at every point of a sweep.
+
+        The circuit is compiled once: its parameter-free prefix is simulated
+        a single time (through the prefix cache) and only the tail runs per
+        point, with the points simulated together as (chunk, 2**n) state
+        tensors sized to the memory budget. Measurements must be terminal.
+        """
+        if not self.sweep_engine.supports(circuit):
+            raise ValueError("Sweeps need terminal measurements and gates that are unitary once resolved")
+        qubits = sorted(circuit.all_qubits())
+        _, measurements = split_measurements(circuit)
+        chunk_bytes = self._chunk_bytes(len(qubits))
+        # Compile first: the prefix simulation takes its own reservation.
+        program = self.sweep_engine.compile(circuit, qubits, prefix_simulator=self._final_state)
+        chunks = self.sweep_engine.chunks(program, params, chunk_bytes=chunk_bytes)
+        nbytes = self.sweep_engine.chunk_size(len(qubits), chunk_bytes) * self._row_bytes(len(qubits))
+        rng = np.random.default_rng(seed)
+        results = []
+        for points, states in self._budgeted(chunks, nbytes):
+            indices = sample_indices(np.abs(states) ** 2, repetitions, rng)
+            for point, row in zip(points, indices):
+                results.append(cirq.ResultDict(
+                    params=point,
+                    records=measurement_records(measurements, qubit_bits(row, qubits))
+                ))
+        return results
+
+    def simulate_batch(self, circuits: Sequence[cirq.Circuit]) -> List[np.ndarray]:
+        """Final states of many circuits, stacked and simulated together.
+
+        Circuits are grouped by qubit count; each group runs as one
+        (batch, 2**n) state in chunks sized to the memory budget, with
+        per-row gate selection. Each state is over the circuit's sorted
+        qubits; measurements are ignored.
+        """
+        states: List[Optional[np.ndarray]] = [None] * len(circuits)
+        for rows, start, chunk in self._batch_chunks(circuits):
+            for i, state in enumerate(chunk):
+                states[rows[start + i]] = state.copy()
+        return states
+
+    def sample_batch(self, circuits: Sequence[cirq.Circuit], repetitions: int = 1000,
+                     seed: Optional[int] = None) -> List[cirq.Result]:
+        """Sample many circuits with terminal measurements through batched simulation."""
+        rng = np.random.default_rng(seed)
+        results: List[Optional[cirq.Result]] = [None] * len(circuits)
+        for rows, start, chunk in self._batch_chunks(circuits):
+            indices = sample_indices(np.abs(chunk) ** 2, repetitions, rng)
+            for i, row in enumerate(indices):
+                circuit = circuits[rows[start + i]]
+                measurements = [op for op in circuit.all_operations()
+                                if isinstance(op.gate, cirq.MeasurementGate)]
+                bits = qubit_bits(row, sorted(circuit.all_qubits()))
+                results[rows[start + i]] = cirq.ResultDict(
+                    params=cirq.ParamResolver({}),
+                    records=measurement_records(measurements, bits)
+                )
+        return results
+
+    def simulate_stream(self, circuits: Iterable[cirq.Circuit],
+                        qubits: Sequence[cirq.Qid]) -> np.ndarray:
+        """Final state of circuits applied one after another to one state.
+
+        Used to run a large circuit in pieces, e.g. the chunks yielded by
+        ``InstructionManager.stream_program``: only one piece exists as cirq
+        objects at a time and NumPy-engine pieces update a single state
+        buffer in place. Measurements are ignored.
+        """
+        qubits = list(qubits)
+        nbytes = self._check_admission(QuantumTask(cirq.Circuit(), qubits)).state_vector_bytes
+        self.memory_budget.reserve(nbytes)
+        try:
+            buf = StateBuffer(len(qubits), dtype=self.dtype)
+            for circuit in circuits:
+                unitary = cirq.Circuit(op for op in circuit.all_operations()
+                                       if not isinstance(op.gate, cirq.MeasurementGate))
+                engine = select_engine(self.engines, self.engine, unitary)
+                if isinstance(engine, NumpyStateVectorEngine):
+                    engine.run(engine.compile(unitary, qubits), buf)
+                else:
+                    buf.state[0] = self._simulate_from(unitary, qubits, buf.state[0])
+            return buf.state[0]
+        finally:
+            self.memory_budget.release(nbytes)
+
+    def _batch_chunks(self, circuits: Sequence[cirq.Circuit]):
+        # Yields (rows, start, states): states[i] belongs to circuits[rows[start + i]].
+        if not self.batch_engine.supports(circuits):
+            raise ValueError("Batched simulation needs terminal measurements and "
+                             "non-parameterized unitary gates")
+        groups: Dict[int, List[int]] = {}
+        for i, circuit in enumerate(circuits):
+            groups.setdefault(len(circuit.all_qubits()), []).append(i)
+        for num_qubits, rows in groups.items():
+            chunk_bytes = self._chunk_bytes(num_qubits)
+            orders = [sorted(circuits[i].all_qubits()) for i in rows]
+            chunks = self.batch_engine.simulate([circuits[i] for i in rows], orders,
+                                                chunk_bytes=chunk_bytes)
+            nbytes = self.batch_engine.chunk_size(num_qubits, chunk_bytes) * self._row_bytes(num_qubits)
+            for start, states in self._budgeted(chunks, nbytes):
+                yield rows, start, states
+
+    def _row_bytes(self, num_qubits: int) -> int:
+        return estimate_memory(num_qubits, self.dtype).state_vector_bytes
+
+    def _chunk_bytes(self, num_qubits: int) -> int:
+        """Bytes one chunk of a batched simulation may use under the memory budget."""
+        row_bytes = self._row_bytes(num_qubits)
+        if not self.memory_budget.fits(row_bytes):
+            raise ValueError(
+                f"A batch row on {num_qubits} qubits needs an estimated {row_bytes} bytes, "
+                f"over the memory budget of {self.memory_budget.limit_bytes} bytes"
+            )
+        return min(self.memory_budget.limit_bytes or DEFAULT_CHUNK_BYTES, DEFAULT_CHUNK_BYTES)
+
+    def _budgeted(self, chunks, nbytes: int):
+        """Iterate chunks while holding a memory reservation for each one."""
+        while True:
+            self.memory_budget.reserve(nbytes)
+            try:
+                item = next(chunks, None)
+                if item is None:
+                    return
+                yield item
+            finally:
+                self.memory_budget.release(nbytes)
+
+    def _final_state(self, circuit: cirq.Circuit, qubits: List[cirq.Qid]) -> np.ndarray:
+        nbytes = self._check_admission(QuantumTask(circuit, qubits)).state_vector_bytes
+        self.memory_budget.reserve(nbytes)
+        try:
+            if self.prefix_cache is None:
+                return self._simulate_from(circuit, qubits)
+            operations = list(circuit.all_operations())
+            start, state = self.prefix_cache.longest(operations, qubits)
+            if start == len(operations) and state is not None:
+                return state
+            state = self._simulate_from(cirq.Circuit(operations[start:]), qubits, state)
+            self.prefix_cache.put(operations, qubits, state)
+            return state
+        finally:
+            self.memory_budget.release(nbytes)
+
+    def _simulate_from(self, circuit: cirq.Circuit, qubits: List[cirq.Qid],
+                       state: Optional[np.ndarray] = None) -> np.ndarray:
+        """Simulate a unitary circuit from |0...0> or from a given state."""
+        engine = select_engine(self.engines, self.engine, circuit)
+        if state is None:
+            return engine.simulate(circuit, qubit_order=qubits)
+        if isinstance(engine, NumpyStateVectorEngine):
+            buf = StateBuffer(len(qubits), dtype=self.dtype)
+            buf.state[0] = state
+            engine.run(engine.compile(circuit, qubits), buf)
+            return buf.state[0]
+        return self.simulator.simulate(circuit, qubit_order=qubits,
+                                       initial_state=np.array(state)).final_state_vector
+
+    def simulate_noisy(self, circuit: cirq.Circuit, noise_model: Optional[Dict] = None,
+                       repetitions: int = 1000, num_trajectories: Optional[int] = None,
+                       seed: Optional[int] = None) -> TrajectoryResult:
+        """Simulate a noisy circuit with Monte Carlo quantum trajectories.
+
+        ``noise_model`` takes the keys stored by
+        ``VirtualQuantumDevice.set_noise_model`` (T1, T2, dephasing) plus an
+        optional ``gate_error`` and ``gate_time``. By default one trajectory
+        is run per shot.
+        """
+        num_trajectories = num_trajectories or max(repetitions, 1)
+        engine = self.trajectory_engine
+        rows = min(engine.batch_size, num_trajectories) * max(engine.num_workers, 1)
+        estimate = estimate_memory(len(circuit.all_qubits()), self.dtype)
+        nbytes = rows * estimate.state_vector_bytes
+        if not self.memory_budget.fits(nbytes):
+            raise ValueError(
+                f"Trajectory batches need an estimated {nbytes} bytes, over the memory budget of "
+                f"{self.memory_budget.limit_bytes} bytes"
+            )
+        self.memory_budget.reserve(nbytes)
+        try:
+            return engine.simulate(circuit, noise_model, num_trajectories=num_trajectories,
+                                   repetitions=repetitions, seed=seed)
+        finally:
+            self.memory_budget.release(nbytes)
+
+    def _cache_key(self, namespace: str, circuit: cirq.AbstractCircuit) -> str:
+        # Kernels sharing a disk tier may differ in precision and engine.
+        return f"{namespace}:{np.dtype(self.dtype).name}:{self.engine}:{circuit_fingerprint(circuit)}"
+
+    def _prepare_circuit(self, task: QuantumTask) -> cirq.Circuit:
+        """Return the circuit to simulate for a task, fused and with noise applied if specified."""
+        circuit = task.circuit
+        if self.fusion_pass is not None:
+            circuit, report = self.fusion_pass.run(circuit)
+            with self._counter_lock:
+                self.sweeps_saved += report.sweeps_saved
+        if task.noise_model:
+            return self.apply_noise_model(circuit, task.noise_model)
+        return circuit
 
     def apply_noise_model(self, circuit: cirq.Circuit, noise_model: Dict) -> cirq.Circuit:
         """Apply noise model to the circuit."""
         # Basic T1/T2 noise model implementation
         noisy_circuit = circuit.copy()
+        qubits = sorted(circuit.all_qubits())
         if noise_model.get('T1'):
-            noisy_circuit.append(cirq.amplitude_damp(noise_model['T1']))
+            noisy_circuit.append(cirq.amplitude_damp(noise_model['T1']).on_each(qubits))
         if noise_model.get('T2'):
-            noisy_circuit.append(cirq.phase_damp(noise_model['T2']))
+            noisy_circuit.append(cirq.phase_damp(noise_model['T2']).on_each(qubits))
         return noisy_circuit
 
-    def allocate_qubits(self, num_qubits: int) -> List[cirq.Qid]:
-        """Allocate virtual qubits for a task."""
-        if num_qubits > len(self.available_qubits):
-            raise ValueError("Not enough qubits available")
-        return self.available_qubits[:num_qubits]
+    def allocate_qubits(self, num_qubits: int, owner: Optional[object] = None) -> QubitLease:
+        """Lease disjoint virtual qubits for a task; release the lease when done."""
+        estimate = estimate_memory(num_qubits, self.dtype)
+        if not self.memory_budget.fits(estimate.state_vector_bytes):
+            raise ValueError(
+                f"Simulating {num_qubits} qubits needs an estimated "
+                f"{estimate.state_vector_bytes} bytes, over the memory budget"
+            )
+        return self.qubit_allocator.allocate(num_qubits, owner)
+
+    def release_qubits(self, lease: QubitLease):
+        """Return leased qubits to the pool."""
+        lease.release()
+
+    def submit_on_device(self, circuit: cirq.Circuit, allocator: Optional[QubitAllocator] = None,
+                         priority: int = 0, noise_model: Optional[Dict] = None,
+                         lease: Optional[QubitLease] = None,
+                         scheduler: Optional[TaskScheduler] = None) -> TaskHandle:
+        """Lease qubits for a circuit, submit it on them, and release them when it finishes.
+
+        ``allocator`` is a device's allocator (``VirtualQuantumDevice.allocator``);
+        the kernel's own qubit pool is used by default. A ``lease`` taken
+        beforehand is used instead of allocating, and is released the same way.
+        A circuit already on the leased qubits, such as one routed onto the
+        device, runs on them unchanged; any other is moved onto the lease.
+        """
+        if lease is None:
+            allocator = allocator or self.qubit_allocator
+            lease = allocator.allocate(len(circuit.all_qubits()))
+        try:
+            if not circuit.all_qubits() <= set(lease.qubits):
+                circuit = remap_circuit(circuit, lease)
+            task = QuantumTask(circuit, list(lease.qubits),
+                               priority=priority, noise_model=noise_model)
+            handle = self.submit_task(task, scheduler)
+        except Exception:
+            lease.release()
+            raise
+        lease.owner = handle.task_id
+        handle.add_done_callback(lambda _: lease.release())
+        return handle
+
+    def sample_multiplexed(self, circuits: Sequence[cirq.Circuit],
+                           allocator: Optional[QubitAllocator] = None,
+                           repetitions: int = 1000, seed: Optional[int] = None) -> List[cirq.Result]:
+        """Sample many small independent circuits packed onto disjoint qubits.
+
+        Circuits are leased side by side until the device is full and each
+        packed batch runs as one combined circuit; results are split back per
+        circuit and returned in input order.
+        """
+        allocator = allocator or self.qubit_allocator
+        rng = np.random.default_rng(seed)
+        results: List[cirq.Result] = []
+        start = 0
+        while start < len(circuits):
+            batch, end = pack_circuits(circuits, allocator, start)
+            if batch is None:
+                raise ValueError(
+                    f"Circuit {start} needs {len(circuits[start].all_qubits())} qubits, "
+                    f"{allocator.num_free} free"
+                )
+            try:
+                combined = self.sample(batch.circuit, repetitions=repetitions,
+                                       seed=int(rng.integers(2**63)))
+            finally:
+                batch.release()
+            results.extend(batch.split_result(combined))
+            start = end
+        return results
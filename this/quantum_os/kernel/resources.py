@@ -0,0 +1,90 @@
+import threading
+import numpy as np
+from typing import Dict, Optional
+from dataclasses import dataclass
+
+PRECISIONS = {
+    'double': np.complex128,
+    'single': np.complex64,
+}
+
+# The state-vector engines keep the state, a spare buffer of the same size and
+# scratch space, so a simulation needs roughly three copies of the state.
+STATE_VECTOR_COPIES = 3
+DENSITY_MATRIX_COPIES = 2
+
+
+def precision_dtype(precision: str) -> np.dtype:
+    """Return the complex dtype of a precision mode ('double' or 'single')."""
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+    return np.dtype(PRECISIONS[precision])
+
+
+@dataclass
+class MemoryEstimate:
+    """Estimated simulation footprint of a task, in bytes."""
+    num_qubits: int
+    state_vector_bytes: int
+    density_matrix_bytes: int
+
+
+def estimate_memory(num_qubits: int, dtype=np.complex128) -> MemoryEstimate:
+    """Estimate state-vector and density-matrix footprints for num_qubits."""
+    itemsize = np.dtype(dtype).itemsize
+    return MemoryEstimate(
+        num_qubits=num_qubits,
+        state_vector_bytes=STATE_VECTOR_COPIES * itemsize * 2 ** num_qubits,
+        density_matrix_bytes=DENSITY_MATRIX_COPIES * itemsize * 4 ** num_qubits
+    )
+
+
+class MemoryBudget:
+    """Tracks simulation memory reserved against a fixed RAM budget."""
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit_bytes = limit_bytes
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def fits(self, nbytes: int) -> bool:
+        """Whether nbytes could ever be reserved under this budget."""
+        return self.limit_bytes is None or nbytes <= self.limit_bytes
+
+    def reserve(self, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """Block until nbytes are available and reserve them.
+
+        Returns False if the timeout expires first.
+        """
+        if not self.fits(nbytes):
+            raise ValueError(
+                f"Task needs {nbytes} bytes but the memory budget is {self.limit_bytes} bytes"
+            )
+        with self._condition:
+            if self.limit_bytes is not None and self.in_use + nbytes > self.limit_bytes:
+                self.waits += 1
+                ready = self._condition.wait_for(
+                    lambda: self.in_use + nbytes <= self.limit_bytes, timeout
+                )
+                if not ready:
+                    return False
+            self.in_use += nbytes
+            self.peak = max(self.peak, self.in_use)
+            return True
+
+    def release(self, nbytes: int):
+        """Return a reservation to the budget."""
+        with self._condition:
+            self.in_use -= nbytes
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        with self._condition:
+            return {
+                'limit_bytes': self.limit_bytes,
+                'in_use': self.in_use,
+                'peak': self.peak,
+                'waits': self.waits,
+            }
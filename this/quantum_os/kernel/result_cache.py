@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future, wait
+from typing import Callable, Dict, Optional
+
+import cirq
+import numpy as np
+
+
+def circuit_fingerprint(circuit: cirq.AbstractCircuit, noise_model: Optional[Dict] = None) -> str:
+    """Return a canonical content hash of a circuit and its noise model.
+
+    The hash covers the (sorted) qubit register and every operation in order,
+    so circuits that differ only in how operations were packed into moments
+    share a fingerprint.
+    """
+    digest = hashlib.sha256()
+    for qubit in sorted(circuit.all_qubits()):
+        digest.update(repr(qubit).encode())
+        digest.update(b',')
+    digest.update(b'|')
+    for operation in circuit.all_operations():
+        digest.update(repr(operation).encode())
+        digest.update(b';')
+    digest.update(b'|')
+    if noise_model:
+        digest.update(json.dumps(noise_model, sort_keys=True, default=repr).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU cache of simulation results under a byte budget.
+
+    An optional persistent on-disk tier (one ``.npy`` file per key) is written
+    through on every store and consulted on memory misses. Identical computations requested while one is
+    already running are merged into that single execution.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.merged = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._entries:
+                return True
+        path = self._disk_path(key)
+        return path is not None and os.path.exists(path)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return a cached result, or None on a miss."""
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key: str, value: np.ndarray):
+        """Store a result, evicting least recently used entries as needed."""
+        value = np.asarray(value)
+        value.setflags(write=False)
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir:
+            self._write_disk(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], np.ndarray],
+                       checkpoint: Optional[Callable[[], None]] = None,
+                       poll_interval: float = 0.1) -> np.ndarray:
+        """Return the cached result for key, computing it at most once.
+
+        If the computation being waited on is cancelled or times out, a
+        waiter computes the result itself rather than inheriting the error.
+        A waiter calls ``checkpoint`` every ``poll_interval`` seconds, so its
+        own cancellation or deadline still takes effect while it waits.
+        """
+        while True:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    return value
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.merged += 1
+                    owner = False
+                else:
+                    future = Future()
+                    self._inflight[key] = future
+                    self.misses += 1
+                    owner = True
+
+            if owner:
+                break
+            if checkpoint is not None:
+                while not wait([future], timeout=poll_interval).done:
+                    checkpoint()
+            try:
+                return future.result()
+            except (CancelledError, TimeoutError):
+                continue
+
+        try:
+            value = compute()
+            self.put(key, value)
+        except BaseException as e:
+            # Drop the in-flight entry first so a retrying waiter starts afresh.
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'merged': self.merged,
+                'evictions': self.evictions,
+            }
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        # Called with the lock held.
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+        path = self._disk_path(key)
+        if path is not None and os.path.exists(path):
+            value = np.load(path)
+            value.setflags(write=False)
+            self._store(key, value)
+            self.disk_hits += 1
+            return value
+        return None
+
+    def _store(self, key: str, value: np.ndarray):
+        # Called with the lock held.
+        if value.nbytes > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.current_bytes -= old.nbytes
+        self._entries[key] = value
+        self.current_bytes += value.nbytes
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        return os.path.join(self.disk_dir, f"{key}.npy")
+
+    def _write_disk(self, key: str, value: np.ndarray):
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        # Write under a temporary name so readers never see a partial file.
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, value)
+        os.replace(tmp_path, path)
@@ -0,0 +1,117 @@
+import cirq
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+def has_terminal_measurements_only(circuit: cirq.AbstractCircuit) -> bool:
+    """Whether a circuit can be simulated once and sampled from its final state.
+
+    Every measurement must be terminal and every other operation a
+    non-symbolic unitary (no noise channels or classically controlled gates).
+    """
+    if not circuit.are_all_measurements_terminal():
+        return False
+    keys = set()
+    for op in circuit.all_operations():
+        if isinstance(op.gate, cirq.MeasurementGate):
+            key = cirq.measurement_key_name(op)
+            if key in keys or op.gate.confusion_map:
+                return False
+            keys.add(key)
+        elif cirq.is_parameterized(op) or not cirq.has_unitary(op):
+            return False
+    return True
+
+
+def split_measurements(circuit: cirq.AbstractCircuit) -> Tuple[cirq.Circuit, List[cirq.Operation]]:
+    """Separate a circuit into its unitary part and its terminal measurements.
+
+    The unitary part keeps the circuit's moments, so its operations stay in
+    the original order (prefix caches key on that order).
+    """
+    moments, measurements = [], []
+    for moment in circuit:
+        unitary = []
+        for op in moment:
+            if isinstance(op.gate, cirq.MeasurementGate):
+                measurements.append(op)
+            else:
+                unitary.append(op)
+        if unitary:
+            moments.append(cirq.Moment(unitary))
+    return cirq.Circuit.from_moments(*moments), measurements
+
+
+def sample_indices(probabilities: np.ndarray, repetitions: int,
+                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Draw basis-state indices from one or a batch of probability vectors.
+
+    A single distribution is sampled with one multinomial draw over all
+    shots; a (batch, dim) array uses one inverse-CDF search over all rows.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), 0, None)
+    if probabilities.ndim == 1:
+        probabilities = probabilities / probabilities.sum()
+        counts = rng.multinomial(repetitions, probabilities)
+        indices = np.repeat(np.arange(len(probabilities)), counts)
+        rng.shuffle(indices)
+        return indices
+
+    batch, dim = probabilities.shape
+    cdf = np.cumsum(probabilities, axis=1)
+    cdf /= cdf[:, -1:]
+    # Offset each row by its index so one searchsorted covers the whole batch.
+    offsets = np.arange(batch)[:, None]
+    draws = rng.random((batch, repetitions)) + offsets
+    flat = np.searchsorted((cdf + offsets).ravel(), draws.ravel(), side='right')
+    indices = flat.reshape(batch, repetitions) - offsets * dim
+    return np.minimum(indices, dim - 1)
+
+
+def independent_components(circuit: cirq.AbstractCircuit) -> List[List[cirq.Qid]]:
+    """Group qubits that are connected through multi-qubit gates.
+
+    Measurements do not join qubits: they are terminal in the circuits this
+    is used for, so the final state is a product over the components.
+    """
+    parent = {q: q for q in circuit.all_qubits()}
+
+    def find(q):
+        while parent[q] != q:
+            parent[q] = parent[parent[q]]
+            q = parent[q]
+        return q
+
+    for op in circuit.all_operations():
+        if isinstance(op.gate, cirq.MeasurementGate):
+            continue
+        roots = [find(q) for q in op.qubits]
+        for root in roots[1:]:
+            parent[root] = roots[0]
+    groups: Dict[cirq.Qid, List[cirq.Qid]] = {}
+    for q in sorted(parent):
+        groups.setdefault(find(q), []).append(q)
+    return list(groups.values())
+
+
+def qubit_bits(indices: np.ndarray, qubit_order: Sequence[cirq.Qid]) -> Dict[cirq.Qid, np.ndarray]:
+    """Per-qubit bits of sampled basis-state indices (big-endian qubit order)."""
+    n = len(qubit_order)
+    return {q: ((indices >> (n - 1 - i)) & 1).astype(np.int8) for i, q in enumerate(qubit_order)}
+
+
+def measurement_records(measurements: Sequence[cirq.Operation],
+                        bits: Dict[cirq.Qid, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Turn sampled per-qubit bits into per-key measurement records.
+
+    Records have cirq's (repetitions, instances, qubits) layout.
+    """
+    records = {}
+    for op in measurements:
+        record = np.stack([bits[q] for q in op.qubits], axis=-1)
+        invert = np.array(op.gate.full_invert_mask(), dtype=np.int8)
+        if invert.any():
+            record ^= invert
+        records[cirq.measurement_key_name(op)] = record[..., None, :]
+    return records
@@ -0,0 +1,245 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class TaskHandle(Future):
+    """Future-like handle returned for a scheduled quantum task."""
+
+    def __init__(self, task_id: int, priority: int = 0, timeout: Optional[float] = None):
+        super().__init__()
+        self.task_id = task_id
+        self.priority = priority
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout if timeout is not None else None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._stop = threading.Event()
+
+    def cancel(self) -> bool:
+        """Cancel the task.
+
+        A queued task is cancelled outright. A running task cannot be
+        cancelled as a Future, so this returns False, but the simulation is
+        asked to stop at its next checkpoint and the handle then raises
+        CancelledError.
+        """
+        self._stop.set()
+        return super().cancel()
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop.is_set()
+
+    def checkpoint(self):
+        """Raise if the task was cancelled or ran past its deadline.
+
+        Engines call this between gates so abandoned work stops early.
+        """
+        if self._stop.is_set():
+            raise CancelledError(f"Task {self.task_id} was cancelled")
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TimeoutError(f"Task {self.task_id} exceeded its deadline")
+
+    @property
+    def wait_time(self) -> Optional[float]:
+        """Seconds the task spent queued before a worker picked it up."""
+        if self.started_at is None:
+            return None
+        return self.started_at - self.submitted_at
+
+
+class TaskScheduler:
+    """Priority scheduler draining a heap of tasks with a pool of worker threads.
+
+    Tasks with a higher ``priority`` run first; ties are broken by submit order.
+    The runner is called as ``runner(task_id, checkpoint)`` and should call
+    ``checkpoint()`` periodically so cancellation and deadlines take effect.
+    Queued tasks whose deadline passes are dropped from the heap and fail
+    with TimeoutError without waiting for a worker.
+    """
+
+    def __init__(self, runner: Callable[[int, Callable[[], None]], Any], num_workers: int = 1):
+        if num_workers < 1:
+            raise ValueError("num_workers must be at least 1")
+        self.runner = runner
+        self.num_workers = num_workers
+        self._heap: List[Tuple[int, int, TaskHandle]] = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._deadlines: List[Tuple[float, int, TaskHandle]] = []
+        self._expirer: Optional[threading.Thread] = None
+        self._shutdown = False
+
+        # Counters
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def schedule(self, task_id: int, priority: int = 0,
+                 timeout: Optional[float] = None) -> TaskHandle:
+        """Queue a task id for execution and return its handle.
+
+        ``timeout`` is the task's deadline in seconds from now, covering both
+        queueing and execution.
+        """
+        handle = TaskHandle(task_id, priority, timeout)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Scheduler has been shut down")
+            self._start_workers()
+            order = next(self._counter)
+            heapq.heappush(self._heap, (-priority, order, handle))
+            if handle.deadline is not None:
+                self._start_expirer()
+                heapq.heappush(self._deadlines, (handle.deadline, order, handle))
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._heap))
+            self._condition.notify_all()
+        return handle
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a worker."""
+        with self._condition:
+            return len(self._heap)
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue-depth and wait-time counters."""
+        with self._condition:
+            return {
+                'queue_depth': len(self._heap),
+                'max_queue_depth': self.max_queue_depth,
+                'running': self.running,
+                'submitted': self.submitted,
+                'started': self.started,
+                'completed': self.completed,
+                'failed': self.failed,
+                'cancelled': self.cancelled,
+                'timed_out': self.timed_out,
+                'total_wait_time': self.total_wait_time,
+                'mean_wait_time': (
+                    self.total_wait_time / self.started if self.started else 0.0
+                ),
+                'max_wait_time': self.max_wait_time,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers; queued tasks that never started are cancelled."""
+        with self._condition:
+            self._shutdown = True
+            pending = [handle for _, _, handle in self._heap]
+            self._heap.clear()
+            self._deadlines.clear()
+            self._condition.notify_all()
+        # Cancel outside the lock: done callbacks run inside cancel().
+        cancelled = sum(1 for handle in pending if handle.cancel())
+        with self._condition:
+            self.cancelled += cancelled
+        if wait:
+            for worker in self._workers:
+                worker.join()
+            if self._expirer is not None:
+                self._expirer.join()
+
+    def _start_workers(self):
+        # Called with the condition held; workers are started lazily on first use.
+        if self._workers:
+            return
+        for i in range(self.num_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"quantum-kernel-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _start_expirer(self):
+        # Called with the condition held, on the first task with a deadline.
+        if self._expirer is not None:
+            return
+        self._expirer = threading.Thread(target=self._expire_loop,
+                                         name="quantum-kernel-expirer", daemon=True)
+        self._expirer.start()
+
+    def _expire_loop(self):
+        while True:
+            with self._condition:
+                expired = []
+                while not expired:
+                    if self._shutdown:
+                        return
+                    if not self._deadlines:
+                        self._condition.wait()
+                        continue
+                    remaining = self._deadlines[0][0] - time.monotonic()
+                    if remaining > 0:
+                        self._condition.wait(remaining)
+                        continue
+                    _, order, handle = heapq.heappop(self._deadlines)
+                    entry = (-handle.priority, order, handle)
+                    if handle.started_at is not None or entry not in self._heap:
+                        continue
+                    self._heap.remove(entry)
+                    heapq.heapify(self._heap)
+                    if handle.set_running_or_notify_cancel():
+                        self.timed_out += 1
+                        expired.append(handle)
+                    else:
+                        self.cancelled += 1
+            # Outside the lock: done callbacks run inside set_exception().
+            for handle in expired:
+                handle.finished_at = time.monotonic()
+                handle.set_exception(
+                    TimeoutError(f"Task {handle.task_id} exceeded its deadline while queued"))
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._heap and not self._shutdown:
+                    self._condition.wait()
+                if self._shutdown:
+                    return
+                _, _, handle = heapq.heappop(self._heap)
+                if not handle.set_running_or_notify_cancel():
+                    self.cancelled += 1
+                    continue
+                handle.started_at = time.monotonic()
+                wait = handle.wait_time
+                self.total_wait_time += wait
+                self.max_wait_time = max(self.max_wait_time, wait)
+                self.started += 1
+                self.running += 1
+
+            try:
+                handle.checkpoint()
+                result = self.runner(handle.task_id, handle.checkpoint)
+            except BaseException as e:
+                handle.finished_at = time.monotonic()
+                with self._condition:
+                    self.running -= 1
+                    if isinstance(e, CancelledError):
+                        self.cancelled += 1
+                    elif isinstance(e, TimeoutError):
+                        self.timed_out += 1
+                    else:
+                        self.failed += 1
+                handle.set_exception(e)
+            else:
+                handle.finished_at = time.monotonic()
+                with self._condition:
+                    self.running -= 1
+                    self.completed += 1
+                handle.set_result(result)
@@ -0,0 +1,323 @@
+import cirq
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+from .sampling import has_terminal_measurements_only, measurement_records, split_measurements
+
+_WORD = 64
+_H = cirq.unitary(cirq.H)
+_S = cirq.unitary(cirq.S)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of a (..., W) uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    bits = np.unpackbits(words.view(np.uint8), axis=-1)
+    return bits.sum(axis=-1, dtype=np.int64)
+
+
+def _unitary_key(u: np.ndarray) -> bytes:
+    # Unitaries equal up to global phase map to the same key.
+    pivot = u.flat[np.argmax(np.abs(u) > 1e-8)]
+    return np.round(u / (pivot / abs(pivot)), 6).tobytes()
+
+
+def _single_qubit_cliffords() -> Dict[bytes, Tuple[str, ...]]:
+    """Shortest H/S word (in application order) for each of the 24 single-qubit Cliffords."""
+    table = {_unitary_key(np.eye(2, dtype=complex)): ()}
+    frontier = [((), np.eye(2, dtype=complex))]
+    while frontier:
+        next_frontier = []
+        for word, u in frontier:
+            for name, g in (('H', _H), ('S', _S)):
+                v = g @ u
+                key = _unitary_key(v)
+                if key not in table:
+                    table[key] = word + (name,)
+                    next_frontier.append((word + (name,), v))
+        frontier = next_frontier
+    return table
+
+
+_CLIFFORD_WORDS = _single_qubit_cliffords()
+
+
+class StabilizerTableau:
+    """Aaronson-Gottesman tableau with every qubit column bit-packed over rows.
+
+    Rows 0..n-1 are destabilizers and rows n..2n-1 stabilizers. ``x[q]`` and
+    ``z[q]`` hold the X and Z bits of qubit q for all 2n rows packed into
+    uint64 words, so each Clifford gate is a handful of word-wise operations
+    on two or three columns.
+    """
+
+    def __init__(self, num_qubits: int):
+        self.num_qubits = n = num_qubits
+        self.words = max(-(-2 * n // _WORD), 1)
+        self.x = np.zeros((n, self.words), dtype=np.uint64)
+        self.z = np.zeros((n, self.words), dtype=np.uint64)
+        self.r = np.zeros(self.words, dtype=np.uint64)
+        for q in range(n):
+            self.x[q, q // _WORD] |= np.uint64(1 << (q % _WORD))
+            row = n + q
+            self.z[q, row // _WORD] |= np.uint64(1 << (row % _WORD))
+
+    def h(self, a: int):
+        x, z = self.x, self.z
+        self.r ^= x[a] & z[a]
+        x[a], z[a] = z[a].copy(), x[a].copy()
+
+    def s(self, a: int):
+        self.r ^= self.x[a] & self.z[a]
+        self.z[a] ^= self.x[a]
+
+    def s_dag(self, a: int):
+        self.r ^= self.x[a] & ~self.z[a]
+        self.z[a] ^= self.x[a]
+
+    def pauli_x(self, a: int):
+        self.r ^= self.z[a]
+
+    def pauli_z(self, a: int):
+        self.r ^= self.x[a]
+
+    def pauli_y(self, a: int):
+        self.r ^= self.x[a] ^ self.z[a]
+
+    def cnot(self, a: int, b: int):
+        x, z = self.x, self.z
+        self.r ^= x[a] & z[b] & ~(x[b] ^ z[a])
+        x[b] ^= x[a]
+        z[a] ^= z[b]
+
+    def cz(self, a: int, b: int):
+        x, z = self.x, self.z
+        self.r ^= x[a] & x[b] & (z[a] ^ z[b])
+        z[a] ^= x[b]
+        z[b] ^= x[a]
+
+    def swap(self, a: int, b: int):
+        for m in (self.x, self.z):
+            m[[a, b]] = m[[b, a]]
+
+    def rows(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row-major view: (2n, W) X and Z bits packed over qubits, and phases."""
+        n = self.num_qubits
+        return _transpose_bits(self.x, 2 * n), _transpose_bits(self.z, 2 * n), \
+            _unpack(self.r[None, :], 2 * n)[0]
+
+
+def _unpack(words: np.ndarray, count: int) -> np.ndarray:
+    bits = np.unpackbits(words.astype('<u8').view(np.uint8), axis=-1, bitorder='little')
+    return bits[..., :count]
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    count = bits.shape[-1]
+    width = max(-(-count // _WORD), 1) * _WORD
+    padded = np.zeros(bits.shape[:-1] + (width,), dtype=np.uint8)
+    padded[..., :count] = bits
+    return np.packbits(padded, axis=-1, bitorder='little').view('<u8').astype(np.uint64)
+
+
+def _transpose_bits(columns: np.ndarray, num_rows: int) -> np.ndarray:
+    return _pack(np.ascontiguousarray(_unpack(columns, num_rows).T))
+
+
+def _product_phase(x1, z1, r1, x2, z2, r2) -> np.ndarray:
+    """Phase bit of the product of Hermitian Pauli rows (x1, z1, r1)(x2, z2, r2).
+
+    Counts the powers of i picked up per qubit (the g function of
+    Aaronson-Gottesman) with popcounts over packed words.
+    """
+    y1, xo1, zo1 = x1 & z1, x1 & ~z1, ~x1 & z1
+    plus = (y1 & z2 & ~x2) | (xo1 & z2 & x2) | (zo1 & x2 & ~z2)
+    minus = (y1 & x2 & ~z2) | (xo1 & z2 & ~x2) | (zo1 & x2 & z2)
+    total = 2 * r1.astype(np.int64) + 2 * r2.astype(np.int64) + _popcount(plus) - _popcount(minus)
+    return ((total % 4) == 2).astype(np.uint8)
+
+
+def _bit(rows: np.ndarray, column: int) -> np.ndarray:
+    return ((rows[:, column // _WORD] >> np.uint64(column % _WORD)) & np.uint64(1)).astype(bool)
+
+
+class StabilizerEngine:
+    """Polynomial-time simulator for Clifford circuits.
+
+    Supports H, S, S^-1, the Paulis, CNOT, CZ, SWAP and any other gate with a
+    stabilizer effect that cirq decomposes into those; single-qubit Cliffords
+    are rewritten as H/S words. Only terminal measurements are supported: the
+    measurement distribution of a stabilizer state is uniform over an affine
+    subspace, so all shots are drawn at once as ``x0 + c . basis``.
+    """
+
+    name = 'stabilizer'
+
+    def supports(self, circuit: cirq.AbstractCircuit) -> bool:
+        """Whether the circuit is all-Clifford with only terminal measurements."""
+        if not has_terminal_measurements_only(circuit):
+            return False
+        try:
+            for op in circuit.all_operations():
+                if not isinstance(op.gate, cirq.MeasurementGate):
+                    self._compile_operation(op, {q: 0 for q in op.qubits}, [])
+        except ValueError:
+            return False
+        return True
+
+    def compile(self, circuit: cirq.AbstractCircuit, qubits: Sequence[cirq.Qid]) -> List[tuple]:
+        """Translate the unitary part of a circuit into tableau gate calls."""
+        index = {q: i for i, q in enumerate(qubits)}
+        program: List[tuple] = []
+        for op in circuit.all_operations():
+            if not isinstance(op.gate, cirq.MeasurementGate):
+                self._compile_operation(op, index, program)
+        return program
+
+    def _compile_operation(self, op: cirq.Operation, index, program: List[tuple]):
+        gate = op.gate
+        axes = [index[q] for q in op.qubits]
+        if gate == cirq.CNOT:
+            program.append((StabilizerTableau.cnot, axes))
+        elif gate == cirq.CZ:
+            program.append((StabilizerTableau.cz, axes))
+        elif gate == cirq.SWAP:
+            program.append((StabilizerTableau.swap, axes))
+        elif gate == cirq.X:
+            program.append((StabilizerTableau.pauli_x, axes))
+        elif gate == cirq.Y:
+            program.append((StabilizerTableau.pauli_y, axes))
+        elif gate == cirq.Z:
+            program.append((StabilizerTableau.pauli_z, axes))
+        elif gate == cirq.H:
+            program.append((StabilizerTableau.h, axes))
+        elif gate == cirq.S:
+            program.append((StabilizerTableau.s, axes))
+        elif gate == cirq.S ** -1:
+            program.append((StabilizerTableau.s_dag, axes))
+        elif len(axes) == 1 and not cirq.is_parameterized(op) and cirq.has_unitary(op):
+            word = _CLIFFORD_WORDS.get(_unitary_key(cirq.unitary(op)))
+            if word is None:
+                raise ValueError(f"Not a Clifford gate: {op}")
+            # Words list gates in application order.
+            for name in word:
+                program.append((StabilizerTableau.h if name == 'H' else StabilizerTableau.s, axes))
+        elif cirq.has_stabilizer_effect(op):
+            decomposed = cirq.decompose_once(op, default=None)
+            if decomposed is None:
+                raise ValueError(f"Cannot decompose Clifford gate: {op}")
+            for sub in decomposed:
+                self._compile_operation(sub, index, program)
+        else:
+            raise ValueError(f"Not a Clifford gate: {op}")
+
+    def simulate(self, circuit: cirq.AbstractCircuit,
+                 qubit_order: Optional[Sequence[cirq.Qid]] = None) -> StabilizerTableau:
+        """Run the unitary part of a circuit and return the final tableau."""
+        qubits = list(qubit_order) if qubit_order is not None else sorted(circuit.all_qubits())
+        tableau = StabilizerTableau(len(qubits))
+        for method, axes in self.compile(circuit, qubits):
+            method(tableau, *axes)
+        return tableau
+
+    def sample(self, circuit: cirq.AbstractCircuit, repetitions: int,
+               rng: Optional[np.random.Generator] = None) -> cirq.ResultDict:
+        """Sample the terminal measurements of a Clifford circuit."""
+        rng = rng if rng is not None else np.random.default_rng()
+        qubits = sorted(circuit.all_qubits())
+        _, measurements = split_measurements(circuit)
+        measured = sorted({q for op in measurements for q in op.qubits})
+        x0, basis = self.support(self.simulate(circuit, qubits))
+        columns = [qubits.index(q) for q in measured]
+        basis = basis[:, columns]
+        coefficients = rng.integers(0, 2, size=(repetitions, len(basis)), dtype=np.uint8)
+        # GF(2) product: float matmul is exact for up to 2**24 basis vectors.
+        flips = (coefficients.astype(np.float32) @ basis.astype(np.float32)).astype(np.int64) & 1
+        outcomes = (flips ^ x0[columns]).astype(np.int8)
+        bits = {q: outcomes[:, i] for i, q in enumerate(measured)}
+        return cirq.ResultDict(
+            params=cirq.ParamResolver({}),
+            records=measurement_records(measurements, bits)
+        )
+
+    def support(self, tableau: StabilizerTableau) -> Tuple[np.ndarray, np.ndarray]:
+        """Affine support of the state in the computational basis.
+
+        Returns (x0, basis): every outcome is x0 xor a GF(2) combination of
+        the basis rows, all with equal probability.
+        """
+        n = tableau.num_qubits
+        xs, zs, rs = tableau.rows()
+        x, z, r = xs[n:].copy(), zs[n:].copy(), rs[n:].copy()
+        # Row-reduce the stabilizers on their X bits. Rows past the rank are
+        # Z-type and fix the parity constraints z . b = r of the support.
+        rank = 0
+        for col in range(n):
+            candidates = np.flatnonzero(_bit(x[rank:], col))
+            if not len(candidates):
+                continue
+            pivot = rank + candidates[0]
+            for m in (x, z, r):
+                m[[rank, pivot]] = m[[pivot, rank]]
+            targets = np.flatnonzero(_bit(x, col))
+            targets = targets[targets != rank]
+            if len(targets):
+                r[targets] = _product_phase(x[rank], z[rank], r[rank], x[targets], z[targets], r[targets])
+                x[targets] ^= x[rank]
+                z[targets] ^= z[rank]
+            rank += 1
+        basis = _unpack(x[:rank], n).astype(np.uint8)
+        x0 = _solve_gf2(_unpack(z[rank:], n).astype(np.uint8), r[rank:].astype(np.uint8))
+        return x0, basis
+
+    def expectation(self, tableau: StabilizerTableau, pauli: cirq.PauliString,
+                    qubits: Sequence[cirq.Qid]) -> complex:
+        """Expectation of a Pauli string: its coefficient times +1, -1 or 0."""
+        n = tableau.num_qubits
+        position = {q: i for i, q in enumerate(qubits)}
+        px = np.zeros(n, dtype=np.uint8)
+        pz = np.zeros(n, dtype=np.uint8)
+        for q, p in pauli.items():
+            px[position[q]] = p in (cirq.X, cirq.Y)
+            pz[position[q]] = p in (cirq.Z, cirq.Y)
+        px, pz = _pack(px), _pack(pz)
+        xs, zs, rs = tableau.rows()
+        # Symplectic product of P with every row: 1 where they anticommute.
+        anticommute = (_popcount((xs & pz) ^ (zs & px)) & 1).astype(bool)
+        if anticommute[n:].any():
+            return 0
+        # P is +-(product of the stabilizers whose destabilizer anticommutes with P).
+        x, z, r = np.zeros_like(px), np.zeros_like(pz), np.zeros(1, dtype=np.uint8)
+        for i in np.flatnonzero(anticommute[:n]):
+            row = n + i
+            r = _product_phase(xs[row:row + 1], zs[row:row + 1], rs[row:row + 1], x[None], z[None], r)
+            x, z = x ^ xs[row], z ^ zs[row]
+        return pauli.coefficient * (-1 if r[0] else 1)
+
+
+def _solve_gf2(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """One solution of a . x = b over GF(2), free variables set to zero."""
+    a, b = a.copy(), b.copy()
+    rows, cols = a.shape
+    pivots = []
+    rank = 0
+    for col in range(cols):
+        if rank == rows:
+            break
+        candidates = np.flatnonzero(a[rank:, col])
+        if not len(candidates):
+            continue
+        pivot = rank + candidates[0]
+        a[[rank, pivot]] = a[[pivot, rank]]
+        b[[rank, pivot]] = b[[pivot, rank]]
+        targets = np.flatnonzero(a[:, col])
+        targets = targets[targets != rank]
+        a[targets] ^= a[rank]
+        b[targets] ^= b[rank]
+        pivots.append(col)
+        rank += 1
+    if b[rank:].any():
+        raise ValueError("Inconsistent stabilizer tableau")
+    x = np.zeros(cols, dtype=np.uint8)
+    x[pivots] = b[:rank]
+    return x
@@ -0,0 +1,459 @@
+import cirq
+import numpy as np
+from typing import Callable, List, Optional, Sequence, Tuple
+
+_SQRT1_2 = 1 / np.sqrt(2)
+# Pending Hadamard scalar below which it is applied to the state (32 H gates)
+_MIN_FACTOR = 2.0 ** -16
+
+Instruction = Tuple[Callable, tuple]
+# (cluster, kernel, args); a None kernel creates the cluster from (part, scalar) args
+ClusterStep = Tuple[int, Optional[Callable], Sequence]
+
+
+class StateBuffer:
+    """Preallocated state storage of shape (batch, 2**n) plus scratch space.
+
+    Gate kernels view the flat state as an n-axis tensor (qubit 0 is the most
+    significant axis, matching cirq's big-endian ordering) and update it in
+    place; ``spare`` is a second full-size buffer used by gates that cannot be
+    applied in place.
+    """
+
+    def __init__(self, num_qubits: int, batch: int = 1, dtype=np.complex128):
+        self.num_qubits = num_qubits
+        self.batch = batch
+        self.dtype = np.dtype(dtype)
+        size = 2 ** num_qubits
+        self.state = np.zeros((batch, size), dtype=self.dtype)
+        self.spare = np.empty((batch, size), dtype=self.dtype)
+        half = batch * max(size // 2, 1)
+        self._scratch = np.empty((2, half), dtype=self.dtype)
+        self.reset()
+
+    def reset(self):
+        """Return every row to |0...0>."""
+        self.state.fill(0)
+        self.state[:, 0] = 1
+
+    def scratch(self, shape: Tuple[int, ...], slot: int = 0) -> np.ndarray:
+        """A scratch view of at most half the state size."""
+        size = int(np.prod(shape))
+        return self._scratch[slot, :size].reshape(shape)
+
+    def halves(self, axis: int):
+        """Views of the |0> and |1> halves of a qubit axis, plus scratch views."""
+        n = self.num_qubits
+        v = self.state.reshape(self.batch * 2 ** axis, 2, 2 ** (n - axis - 1))
+        shape = (v.shape[0], v.shape[2])
+        return v[:, 0, :], v[:, 1, :], self.scratch(shape, 0), self.scratch(shape, 1)
+
+    def quarters(self, a: int, b: int):
+        """Five-axis view exposing qubit axes a < b as axes 1 and 3."""
+        n = self.num_qubits
+        return self.state.reshape(
+            self.batch * 2 ** a, 2, 2 ** (b - a - 1), 2, 2 ** (n - b - 1)
+        )
+
+    def swap_buffers(self):
+        self.state, self.spare = self.spare, self.state
+
+
+# ---------------------------------------------------------------------------
+# Gate kernels. Each takes the buffer first and updates buffer.state, either in
+# place or by writing the spare buffer and swapping.
+# ---------------------------------------------------------------------------
+
+def _apply_h(buf: StateBuffer, axis: int):
+    # Unnormalized Hadamard written into the spare buffer; the 1/sqrt(2)
+    # factor is folded into the frame.
+    a0, a1, _, _ = buf.halves(axis)
+    out = buf.spare.reshape(buf.batch * 2 ** axis, 2, -1)
+    np.add(a0, a1, out=out[:, 0, :])
+    np.subtract(a0, a1, out=out[:, 1, :])
+    buf.swap_buffers()
+
+
+def _apply_scale(buf: StateBuffer, factor: complex):
+    np.multiply(buf.state, factor, out=buf.state)
+
+
+def _apply_negate(buf: StateBuffer, axis: int, half: int):
+    block = buf.halves(axis)[half]
+    np.negative(block, out=block)
+
+
+def _apply_phase(buf: StateBuffer, axis: int, half: int, phase: complex):
+    buf.halves(axis)[half][...] *= phase
+
+
+def _apply_matrix1(buf: StateBuffer, axis: int, m: np.ndarray):
+    a0, a1, t0, t1 = buf.halves(axis)
+    m00, m01, m10, m11 = m[0, 0], m[0, 1], m[1, 0], m[1, 1]
+    np.multiply(a0, m10, out=t0)
+    a0 *= m00
+    np.multiply(a1, m01, out=t1)
+    a0 += t1
+    a1 *= m11
+    a1 += t0
+
+
+def _swap_blocks(buf: StateBuffer, x: np.ndarray, y: np.ndarray):
+    t = buf.scratch(x.shape)
+    t[...] = x
+    x[...] = y
+    y[...] = t
+
+
+def _apply_cnot(buf: StateBuffer, a: int, b: int, control_first: bool):
+    v = buf.quarters(a, b)
+    if control_first:
+        _swap_blocks(buf, v[:, 1, :, 0, :], v[:, 1, :, 1, :])
+    else:
+        _swap_blocks(buf, v[:, 0, :, 1, :], v[:, 1, :, 1, :])
+
+
+def _apply_cz(buf: StateBuffer, a: int, b: int):
+    block = buf.quarters(a, b)[:, 1, :, 1, :]
+    np.negative(block, out=block)
+
+
+def _apply_matrix2(buf: StateBuffer, a: int, b: int, u: np.ndarray):
+    v = buf.quarters(a, b)
+    out = buf.spare.reshape(v.shape)
+    np.einsum('ijkl,pkmlr->pimjr', u, v, out=out)
+    buf.swap_buffers()
+
+
+def _apply_matrix_n(buf: StateBuffer, axes: Tuple[int, ...], u: np.ndarray):
+    k = len(axes)
+    tensor = buf.state.reshape((buf.batch,) + (2,) * buf.num_qubits)
+    targets = [axis + 1 for axis in axes]
+    moved = np.tensordot(u.reshape((2,) * (2 * k)), tensor,
+                         axes=(list(range(k, 2 * k)), targets))
+    buf.spare.reshape(tensor.shape)[...] = np.moveaxis(moved, list(range(k)), targets)
+    buf.swap_buffers()
+
+
+def _apply_frame(buf: StateBuffer, flipped: Tuple[int, ...], negated: Tuple[int, ...],
+                 factor: complex, axes: Optional[Tuple[int, ...]] = None):
+    # Resolve a pending frame in one pass: Z signs, X flips, the scalar and,
+    # when axes were relabelled by SWAPs, the transpose back to qubit order.
+    n = buf.num_qubits
+    tensor = buf.state.reshape((buf.batch,) + (2,) * n)
+    scale = np.asarray(factor, dtype=buf.dtype)
+    if negated:
+        # The sign depends on the physical index, i.e. after undoing the flip.
+        scale = np.full([1] * (n + 1), factor, dtype=buf.dtype)
+        for axis in negated:
+            sign = [-1, 1] if axis in flipped else [1, -1]
+            scale = scale * np.array(sign, dtype=buf.dtype).reshape(
+                [1] * (axis + 1) + [2] + [1] * (n - axis - 1))
+    source = np.flip(tensor, axis=[axis + 1 for axis in flipped]) if flipped else tensor
+    if axes is not None:
+        source = source.transpose([0] + [axis + 1 for axis in axes])
+        scale = scale.transpose([0] + [axis + 1 for axis in axes]) if scale.ndim else scale
+    np.multiply(source, scale, out=buf.spare.reshape(tensor.shape))
+    buf.swap_buffers()
+
+
+class _Frame:
+    """Compile-time Pauli frame ``factor * X^x Z^z`` left of the physical state.
+
+    Pauli gates are never applied to the state: they only update the per-axis
+    ``x``/``z`` bits. Clifford gates (H, CNOT, CZ, SWAP) conjugate the frame,
+    diagonal gates commute with it up to which half they act on, and any other
+    gate absorbs the frame into its matrix. Scalars such as the Hadamard
+    normalisation accumulate in ``factor``. A final ``_apply_frame`` pass
+    resolves whatever is left.
+    """
+
+    def __init__(self, num_qubits: int):
+        self.x = [0] * num_qubits
+        self.z = [0] * num_qubits
+        self.factor = 1 + 0j
+
+    def absorb(self, u: np.ndarray, axes: Tuple[int, ...]) -> np.ndarray:
+        """Return u . (X^x Z^z on axes) and clear the frame on those axes."""
+        k = len(axes)
+        u = u.reshape((2,) * (2 * k))
+        for i, axis in enumerate(axes):
+            column = k + i
+            if self.x[axis]:
+                u = np.flip(u, axis=column)
+                self.x[axis] = 0
+            if self.z[axis]:
+                u = u.copy()
+                index = [slice(None)] * (2 * k)
+                index[column] = 1
+                u[tuple(index)] *= -1
+                self.z[axis] = 0
+        return u.reshape(2 ** k, 2 ** k)
+
+    def flush(self, axes: Optional[Tuple[int, ...]] = None) -> Optional[Instruction]:
+        """Instruction resolving the frame; ``axes[i]`` is the axis holding qubit i."""
+        flipped = tuple(axis for axis, bit in enumerate(self.x) if bit)
+        negated = tuple(axis for axis, bit in enumerate(self.z) if bit)
+        if axes is not None and list(axes) == list(range(len(axes))):
+            axes = None
+        if not flipped and not negated and self.factor == 1 and axes is None:
+            return None
+        instruction = (_apply_frame, (flipped, negated, self.factor, axes))
+        self.x = [0] * len(self.x)
+        self.z = [0] * len(self.z)
+        self.factor = 1 + 0j
+        return instruction
+
+
+class NumpyStateVectorEngine:
+    """State-vector simulator applying gates in place with reshaped NumPy views.
+
+    Circuits are first compiled into a flat list of (kernel, args) pairs so the
+    gate type and qubit axes are resolved once, outside the simulation loop.
+    The QIR gate set (H, X, Y, Z, CNOT, CZ, SWAP) and diagonal phase gates have
+    dedicated handling; any other unitary gate falls back to a dense matrix.
+    Pauli gates and normalisation constants are tracked in a compile-time
+    Pauli frame and SWAPs relabel axes, so none of them cost a pass over the
+    state.
+    """
+
+    name = 'numpy'
+
+    def __init__(self, dtype=np.complex128):
+        self.dtype = np.dtype(dtype)
+
+    def supports(self, circuit: cirq.AbstractCircuit) -> bool:
+        """Whether every operation is a non-parameterized unitary."""
+        return all(
+            not cirq.is_parameterized(op) and cirq.has_unitary(op)
+            for op in circuit.all_operations()
+        )
+
+    def compile(self, circuit: cirq.AbstractCircuit,
+                qubits: Sequence[cirq.Qid]) -> List[Instruction]:
+        """Translate a circuit into kernel instructions over the given qubit order."""
+        index = {q: i for i, q in enumerate(qubits)}
+        frame = _Frame(len(qubits))
+        program: List[Instruction] = []
+        for op in circuit.all_operations():
+            self._compile_operation(op, index, frame, program)
+        final = frame.flush(tuple(index[q] for q in qubits))
+        if final is not None:
+            program.append(final)
+        return program
+
+    def simulate(self, circuit: cirq.AbstractCircuit,
+                 qubit_order: Optional[Sequence[cirq.Qid]] = None,
+                 checkpoint: Optional[Callable[[], None]] = None) -> np.ndarray:
+        """Simulate a unitary circuit from |0...0> and return the final state.
+
+        Qubits are kept in independent clusters until a gate entangles them, so
+        untangled parts of the register never pay for the full 2**n state.
+        The circuit is compiled once by ``compile_clusters`` and the loop only
+        runs kernels. ``checkpoint`` is called before every step and may
+        raise to abandon the simulation.
+        """
+        qubits = list(qubit_order) if qubit_order is not None else sorted(circuit.all_qubits())
+        steps, roots = self.compile_clusters(circuit, qubits)
+        buffers = {i: StateBuffer(1, dtype=self.dtype) for i in range(len(qubits))}
+        for cluster, kernel, args in steps:
+            if checkpoint is not None:
+                checkpoint()
+            if kernel is None:
+                buffers[cluster] = _merge_buffers(buffers, args, self.dtype)
+            else:
+                kernel(buffers[cluster], *args)
+        return _combine([(buffers[cluster], members) for cluster, members in roots],
+                        qubits, self.dtype)
+
+    def compile_clusters(self, circuit: cirq.AbstractCircuit, qubits: Sequence[cirq.Qid]
+                         ) -> Tuple[List[ClusterStep], List[Tuple[int, List[cirq.Qid]]]]:
+        """Compile a circuit into steps over independent qubit clusters.
+
+        Each step is ``(cluster, kernel, args)`` applying a kernel to that
+        cluster's buffer, or ``(cluster, None, parts)`` creating the cluster as
+        the tensor product of ``(part, scalar)`` buffers. Cluster i < n starts
+        as qubit i alone in |0>. Also returns the final ``(cluster, qubits)``
+        roots, whose frames are already flushed by the last steps.
+        """
+        clusters = {q: _ClusterPlan(i, [q]) for i, q in enumerate(qubits)}
+        steps: List[ClusterStep] = []
+        next_id = len(qubits)
+        for op in circuit.all_operations():
+            parts = []
+            for q in op.qubits:
+                if clusters[q] not in parts:
+                    parts.append(clusters[q])
+            if len(parts) == 1:
+                cluster = parts[0]
+            else:
+                cluster = _ClusterPlan.merge(parts, next_id)
+                steps.append((next_id, None, [(part.id, part.frame.factor) for part in parts]))
+                next_id += 1
+                for q in cluster.qubits:
+                    clusters[q] = cluster
+            for kernel, args in self.compile_operation(op, cluster.index, cluster.frame):
+                steps.append((cluster.id, kernel, args))
+
+        roots = []
+        for q in qubits:
+            if clusters[q] not in roots:
+                roots.append(clusters[q])
+        for root in roots:
+            final = root.frame.flush(tuple(root.index[q] for q in root.qubits))
+            if final is not None:
+                steps.append((root.id, final[0], final[1]))
+        return steps, [(root.id, root.qubits) for root in roots]
+
+    def compile_operation(self, op: cirq.Operation, index, frame: "_Frame") -> List[Instruction]:
+        """Compile a single operation against an existing frame."""
+        program: List[Instruction] = []
+        self._compile_operation(op, index, frame, program)
+        return program
+
+    def run(self, program: List[Instruction], buf: StateBuffer):
+        """Apply compiled instructions to a state buffer in place."""
+        for kernel, args in program:
+            kernel(buf, *args)
+
+    def _compile_operation(self, op: cirq.Operation, index, frame: _Frame,
+                           program: List[Instruction]):
+        gate = op.gate
+        axes = tuple(index[q] for q in op.qubits)
+        x, z = frame.x, frame.z
+        if len(axes) == 1:
+            axis = axes[0]
+            if gate == cirq.X:
+                x[axis] ^= 1
+                return
+            if gate == cirq.Z:
+                # Z.X^x Z^z = (-1)^x X^x Z^(z+1)
+                if x[axis]:
+                    frame.factor = -frame.factor
+                z[axis] ^= 1
+                return
+            if gate == cirq.Y:
+                # Y = iXZ
+                frame.factor *= -1j if x[axis] else 1j
+                x[axis] ^= 1
+                z[axis] ^= 1
+                return
+            if gate == cirq.H:
+                # H.X^x Z^z = (-1)^(xz) X^z Z^x.H
+                program.append((_apply_h, (axis,)))
+                if x[axis] and z[axis]:
+                    frame.factor = -frame.factor
+                x[axis], z[axis] = z[axis], x[axis]
+                frame.factor *= _SQRT1_2
+                if abs(frame.factor) < _MIN_FACTOR:
+                    # Each unnormalized H can double amplitudes; fold the
+                    # scalar in before they overflow.
+                    program.append((_apply_scale, (frame.factor,)))
+                    frame.factor = 1 + 0j
+                return
+            m = cirq.unitary(op)
+            if m[0, 1] == 0 and m[1, 0] == 0:
+                self._compile_diagonal(axis, m[0, 0], m[1, 1], frame, program)
+                return
+            m = frame.absorb(m, axes)
+            program.append((_apply_matrix1, (axis, m.astype(self.dtype))))
+            return
+        if len(axes) == 2:
+            a, b = axes
+            lo, hi = min(a, b), max(a, b)
+            if gate == cirq.CNOT:
+                # Conjugation: X_a -> X_a X_b, Z_b -> Z_a Z_b
+                program.append((_apply_cnot, (lo, hi, a < b)))
+                x[b] ^= x[a]
+                z[a] ^= z[b]
+                return
+            if gate == cirq.CZ:
+                # Conjugation: X_a -> X_a Z_b, X_b -> Z_a X_b, with a sign
+                # when both X parts are present
+                program.append((_apply_cz, (lo, hi)))
+                if x[a] and x[b]:
+                    frame.factor = -frame.factor
+                z[a] ^= x[b]
+                z[b] ^= x[a]
+                return
+            if gate == cirq.SWAP:
+                # Relabel the axes instead of moving amplitudes; the frame bits
+                # belong to the axes and travel with them.
+                qa, qb = op.qubits
+                index[qa], index[qb] = index[qb], index[qa]
+                return
+            u = frame.absorb(cirq.unitary(op), axes).reshape(2, 2, 2, 2)
+            if a > b:
+                u = u.transpose(1, 0, 3, 2)
+            program.append((_apply_matrix2, (lo, hi, np.ascontiguousarray(u, dtype=self.dtype))))
+            return
+        u = frame.absorb(cirq.unitary(op), axes)
+        program.append((_apply_matrix_n, (axes, u.astype(self.dtype))))
+
+    def _compile_diagonal(self, axis: int, d0: complex, d1: complex, frame: _Frame,
+                          program: List[Instruction]):
+        # diag(d0, d1) = d0 * diag(1, d1/d0) commutes with Z; past an X flip the
+        # phase lands on the physical |0> half instead.
+        frame.factor *= d0
+        phase = d1 / d0
+        if phase == 1:
+            return
+        half = 1 ^ frame.x[axis]
+        if phase == -1:
+            program.append((_apply_negate, (axis, half)))
+        else:
+            program.append((_apply_phase, (axis, half, phase)))
+
+
+class _ClusterPlan:
+    """Compile-time view of a group of qubits simulated together in one buffer."""
+
+    def __init__(self, cluster_id: int, qubits: List[cirq.Qid], frame: Optional[_Frame] = None,
+                 index: Optional[dict] = None):
+        self.id = cluster_id
+        self.qubits = qubits
+        # Axis currently holding each qubit; SWAPs permute this mapping.
+        self.index = index or {q: i for i, q in enumerate(qubits)}
+        self.frame = frame or _Frame(len(qubits))
+
+    @staticmethod
+    def merge(parts: List["_ClusterPlan"], cluster_id: int) -> "_ClusterPlan":
+        # The tensor product keeps each part's pending Pauli bits, which are
+        # per axis; the parts' scalars are folded in by _merge_buffers.
+        qubits = []
+        index = {}
+        frame = _Frame(0)
+        for part in parts:
+            for q in part.qubits:
+                index[q] = len(qubits) + part.index[q]
+            qubits += part.qubits
+            frame.x += part.frame.x
+            frame.z += part.frame.z
+        return _ClusterPlan(cluster_id, qubits, frame, index)
+
+
+def _merge_buffers(buffers: dict, parts: List[Tuple[int, complex]], dtype) -> StateBuffer:
+    # Scalars are folded in per part so the product stays in range.
+    for i, (cluster, factor) in enumerate(parts):
+        part_state = buffers.pop(cluster).state[0] * factor
+        state = np.multiply.outer(state, part_state).reshape(-1) if i else part_state
+    merged = StateBuffer(int(state.size).bit_length() - 1, dtype=dtype)
+    merged.state[0] = state
+    return merged
+
+
+def _combine(roots: List[Tuple[StateBuffer, List[cirq.Qid]]], order: List[cirq.Qid],
+             dtype) -> np.ndarray:
+    """Tensor the final cluster states together in the requested qubit order."""
+    if not roots:
+        return np.ones(1, dtype=dtype)
+    state = roots[0][0].state[0]
+    qubits = list(roots[0][1])
+    for buf, members in roots[1:]:
+        state = np.multiply.outer(state, buf.state[0]).reshape(-1)
+        qubits += members
+    if qubits != list(order):
+        position = {q: i for i, q in enumerate(qubits)}
+        tensor = state.reshape((2,) * len(qubits))
+        state = np.ascontiguousarray(tensor.transpose([position[q] for q in order])).reshape(-1)
+    return state
@@ -0,0 +1,196 @@
+import cirq
+import numpy as np
+import sympy
+from typing import Callable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from .prefix_cache import split_parameter_free_prefix
+from .statevector_engine import NumpyStateVectorEngine, StateBuffer, _Frame
+
+PrefixSimulator = Callable[[cirq.Circuit, List[cirq.Qid]], np.ndarray]
+
+# Chunk size used when no memory budget is configured.
+DEFAULT_CHUNK_BYTES = 64 * 2**20
+
+
+def _apply_batched(buf: StateBuffer, axes: Tuple[int, ...], u: np.ndarray):
+    # u has shape (batch, 2**k, 2**k): one matrix per parameter point.
+    n, k = buf.num_qubits, len(axes)
+    tensor = buf.state.reshape((buf.batch,) + (2,) * n)
+    state_labels = list(range(1, n + 1))
+    in_labels = [1 + axis for axis in axes]
+    new_labels = list(range(n + 1, n + 1 + k))
+    out_labels = list(state_labels)
+    for axis, label in zip(axes, new_labels):
+        out_labels[axis] = label
+    np.einsum(u.reshape((buf.batch,) + (2,) * (2 * k)), [0] + new_labels + in_labels,
+              tensor, [0] + state_labels, [0] + out_labels,
+              out=buf.spare.reshape(tensor.shape))
+    buf.swap_buffers()
+
+
+class _ParameterizedGate:
+    """Batched unitary of one parameterized operation.
+
+    Eigen gates (rx/ry/rz, X/Y/Z/CZ/CNOT powers, ...) are evaluated for all
+    points at once from their eigendecomposition; other operations are
+    resolved and converted point by point.
+    """
+
+    def __init__(self, op: cirq.Operation, axes: Tuple[int, ...], frame_matrix: np.ndarray, dtype):
+        self.op = op
+        self.axes = axes
+        self.frame_matrix = frame_matrix
+        self.dtype = dtype
+        gate = op.gate
+        self.components = None
+        if isinstance(gate, cirq.EigenGate) and not cirq.is_parameterized(gate.global_shift):
+            exponent = sympy.sympify(gate.exponent)
+            symbols = sorted(exponent.free_symbols, key=str)
+            self.names = [str(s) for s in symbols]
+            self.exponent = sympy.lambdify(symbols, exponent, 'numpy')
+            self.components = [(float(value) + gate.global_shift, projector)
+                               for value, projector in gate._eigen_components()]
+
+    def matrices(self, values: Mapping[str, np.ndarray], points: Sequence[cirq.ParamResolver],
+                 batch: int) -> np.ndarray:
+        if self.components is not None:
+            t = np.broadcast_to(self.exponent(*(values[name] for name in self.names)), (batch,))
+            u = sum(np.exp(1j * np.pi * t * value)[:, None, None] * projector
+                    for value, projector in self.components)
+        else:
+            u = np.stack([cirq.unitary(cirq.resolve_parameters(self.op, point)) for point in points])
+        return np.matmul(u, self.frame_matrix).astype(self.dtype)
+
+
+class SweepProgram:
+    """A parameterized circuit compiled once for evaluation over many points.
+
+    The parameter-free prefix is simulated once into ``initial_state``;
+    only the tail is run per point. Fixed tail operations reuse the
+    state-vector engine's instructions; parameterized ones become batched
+    matrices rebuilt per chunk of points.
+    """
+
+    def __init__(self, qubits: List[cirq.Qid], parameters: List[str], steps: list, dtype,
+                 initial_state: Optional[np.ndarray] = None, prefix_length: int = 0):
+        self.qubits = qubits
+        self.parameters = parameters
+        self.steps = steps
+        self.dtype = dtype
+        self.initial_state = initial_state
+        self.prefix_length = prefix_length  # Operations folded into initial_state
+
+    def run(self, points: Sequence[cirq.ParamResolver], buf: StateBuffer):
+        """Evaluate all points into the rows of a buffer of matching batch size."""
+        values = {}
+        for name in self.parameters:
+            column = [point.value_of(name) for point in points]
+            if any(cirq.is_parameterized(value) for value in column):
+                raise ValueError(f"No value given for parameter {name}")
+            values[name] = np.array(column, dtype=float)
+        if self.initial_state is None:
+            buf.reset()
+        else:
+            buf.state[...] = self.initial_state
+        for step in self.steps:
+            if isinstance(step, _ParameterizedGate):
+                _apply_batched(buf, step.axes, step.matrices(values, points, buf.batch))
+            else:
+                kernel, args = step
+                kernel(buf, *args)
+
+
+class SweepEngine:
+    """Simulates one parameterized circuit over many parameter points.
+
+    Each chunk of points is one (chunk, 2**n) state tensor, so the circuit
+    is walked once per chunk rather than once per point.
+    """
+
+    def __init__(self, dtype=np.complex128):
+        self.dtype = np.dtype(dtype)
+        self.engine = NumpyStateVectorEngine(dtype=self.dtype)
+
+    def supports(self, circuit: cirq.AbstractCircuit) -> bool:
+        """Whether measurements are terminal and every gate is unitary once resolved."""
+        if not circuit.are_all_measurements_terminal():
+            return False
+        for op in circuit.all_operations():
+            if isinstance(op.gate, cirq.MeasurementGate):
+                if op.gate.confusion_map:
+                    return False
+                continue
+            resolved = cirq.resolve_parameters(op, {name: 0.0 for name in cirq.parameter_names(op)})
+            if not cirq.has_unitary(resolved):
+                return False
+        return True
+
+    def compile(self, circuit: cirq.AbstractCircuit,
+                qubits: Optional[Sequence[cirq.Qid]] = None,
+                prefix_simulator: Optional[PrefixSimulator] = None) -> SweepProgram:
+        """Compile the unitary part of a circuit; measurements are ignored.
+
+        ``prefix_simulator(prefix, qubits)`` computes the state after the
+        parameter-free prefix (the NumPy engine by default), e.g. through a
+        cache shared with other runs.
+        """
+        qubits = list(qubits) if qubits is not None else sorted(circuit.all_qubits())
+        unitary = cirq.Circuit(op for op in circuit.all_operations()
+                               if not isinstance(op.gate, cirq.MeasurementGate))
+        prefix, tail = split_parameter_free_prefix(unitary)
+        initial_state = None
+        if len(prefix):
+            simulate = prefix_simulator or (
+                lambda c, order: self.engine.simulate(c, qubit_order=order))
+            initial_state = simulate(prefix, qubits)
+        index = {q: i for i, q in enumerate(qubits)}
+        frame = _Frame(len(qubits))
+        steps = []
+        for op in tail.all_operations():
+            if not cirq.is_parameterized(op):
+                steps.extend(self.engine.compile_operation(op, index, frame))
+                continue
+            axes = tuple(index[q] for q in op.qubits)
+            # Absorbing the identity yields the pending Pauli frame on these axes.
+            frame_matrix = frame.absorb(np.eye(2 ** len(axes), dtype=complex), axes)
+            steps.append(_ParameterizedGate(op, axes, frame_matrix, self.dtype))
+        final = frame.flush(tuple(index[q] for q in qubits))
+        if final is not None:
+            steps.append(final)
+        parameters = sorted(cirq.parameter_names(circuit))
+        return SweepProgram(qubits, parameters, steps, self.dtype, initial_state,
+                            len(list(prefix.all_operations())))
+
+    def chunk_size(self, num_qubits: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> int:
+        """Points per chunk so the state, spare and scratch buffers fit chunk_bytes."""
+        row_bytes = 3 * self.dtype.itemsize * 2 ** num_qubits
+        return max(1, chunk_bytes // row_bytes)
+
+    def simulate(self, circuit: cirq.AbstractCircuit, params: cirq.Sweepable,
+                 qubit_order: Optional[Sequence[cirq.Qid]] = None,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                 checkpoint: Optional[Callable[[], None]] = None,
+                 prefix_simulator: Optional[PrefixSimulator] = None
+                 ) -> Iterator[Tuple[List[cirq.ParamResolver], np.ndarray]]:
+        """Yield (points, states) per chunk; states has one final state per row.
+
+        The state array is reused by the next chunk, so copy rows to keep them.
+        """
+        program = self.compile(circuit, qubit_order, prefix_simulator)
+        return self.chunks(program, params, chunk_bytes, checkpoint)
+
+    def chunks(self, program: SweepProgram, params: cirq.Sweepable,
+               chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+               checkpoint: Optional[Callable[[], None]] = None
+               ) -> Iterator[Tuple[List[cirq.ParamResolver], np.ndarray]]:
+        """Run a compiled program over the points, one chunk at a time."""
+        points = list(cirq.to_resolvers(params))
+        chunk = self.chunk_size(len(program.qubits), chunk_bytes)
+        buf = None
+        for start in range(0, len(points), chunk):
+            if checkpoint is not None:
+                checkpoint()
+            part = points[start:start + chunk]
+            if buf is None or buf.batch != len(part):
+                buf = StateBuffer(len(program.qubits), batch=len(part), dtype=self.dtype)
+            program.run(part, buf)
+            yield part, buf.state
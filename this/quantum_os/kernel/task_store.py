@@ -0,0 +1,196 @@
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass
+class TaskRecord:
+    """A submitted task and, once it finishes, its outcome."""
+    task_id: int
+    task: Any
+    status: str = PENDING
+    submitted_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    error: Optional[BaseException] = None
+    result: Optional[np.ndarray] = field(default=None, repr=False)
+    result_path: Optional[str] = None
+    result_nbytes: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status != PENDING
+
+
+class TaskStore:
+    """Bounded registry of submitted tasks keyed by stable, increasing ids.
+
+    Pending tasks are always kept. Finished tasks are evicted least recently
+    used first once more than ``max_tasks`` are stored, and after ``ttl``
+    seconds when a TTL is set. Results of at least ``spill_bytes`` are
+    written to ``.npy`` files and memory-mapped back on first access. Each
+    store spills into its own subdirectory of ``spill_dir``, since task ids
+    restart in every store; it is removed by ``close`` or at garbage
+    collection.
+    """
+
+    def __init__(self, max_tasks: int = 10000, ttl: Optional[float] = None,
+                 spill_dir: Optional[str] = None, spill_bytes: int = 1 << 20):
+        if max_tasks < 1:
+            raise ValueError("max_tasks must be at least 1")
+        self.max_tasks = max_tasks
+        self.ttl = ttl
+        self.spill_dir = spill_dir
+        self.spill_bytes = spill_bytes
+        self.spill_path: Optional[str] = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_path = tempfile.mkdtemp(prefix='tasks-', dir=spill_dir)
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_path, True)
+        self._records: "OrderedDict[int, TaskRecord]" = OrderedDict()
+        # Finished ids, least recently used first and in finish order.
+        self._recent: "OrderedDict[int, None]" = OrderedDict()
+        self._by_finish: "OrderedDict[int, float]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.evicted = 0
+        self.spilled = 0
+        self.reloaded = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def __contains__(self, task_id: int) -> bool:
+        with self._lock:
+            return task_id in self._records
+
+    def add(self, task: Any) -> int:
+        """Register a task and return its id."""
+        with self._lock:
+            task_id = next(self._ids)
+            self._records[task_id] = TaskRecord(task_id, task)
+            self._evict()
+            return task_id
+
+    def record(self, task_id: int) -> TaskRecord:
+        """Return a task's record, raising KeyError if unknown or evicted."""
+        with self._lock:
+            record = self._records[task_id]
+            self._records.move_to_end(task_id)
+            if task_id in self._recent:
+                self._recent.move_to_end(task_id)
+            return record
+
+    def get_task(self, task_id: int) -> Any:
+        return self.record(task_id).task
+
+    def finish(self, task_id: int, result: Optional[np.ndarray] = None,
+               error: Optional[BaseException] = None):
+        """Store a task's result or error; large results are spilled to disk."""
+        path = None
+        if result is not None and self.spill_path and result.nbytes >= self.spill_bytes:
+            path = os.path.join(self.spill_path, f"task-{task_id}.npy")
+            np.save(path, result)
+        with self._lock:
+            record = self._records.get(task_id)
+            if record is None:
+                if path:
+                    os.remove(path)
+                return
+            if not record.finished:
+                self._recent[task_id] = None
+                self._by_finish[task_id] = time.monotonic()
+            record.status = FAILED if error is not None else DONE
+            record.finished_at = self._by_finish[task_id]
+            record.error = error
+            if result is not None:
+                record.result_nbytes = result.nbytes
+            if path:
+                record.result_path = path
+                self.spilled += 1
+            else:
+                record.result = result
+            self._evict()
+
+    def result(self, task_id: int) -> Optional[np.ndarray]:
+        """Return a finished task's result, memory-mapping spilled results lazily."""
+        record = self.record(task_id)
+        if record.result is None and record.result_path is not None:
+            with self._lock:
+                if record.result is None:
+                    record.result = np.load(record.result_path, mmap_mode='r')
+                    self.reloaded += 1
+        return record.result
+
+    def remove(self, task_id: int):
+        """Forget a task and delete its spilled result."""
+        with self._lock:
+            record = self._records.pop(task_id, None)
+            self._recent.pop(task_id, None)
+            self._by_finish.pop(task_id, None)
+        if record is not None:
+            self._drop(record)
+
+    def clear(self):
+        with self._lock:
+            records = list(self._records.values())
+            self._records.clear()
+            self._recent.clear()
+            self._by_finish.clear()
+        for record in records:
+            self._drop(record)
+
+    def close(self):
+        """Forget every task and delete the store's spill directory."""
+        self.clear()
+        if self.spill_path:
+            self._cleanup()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = sum(1 for r in self._records.values() if not r.finished)
+            return {
+                'stored': len(self._records),
+                'pending': pending,
+                'resident_result_bytes': sum(
+                    r.result_nbytes for r in self._records.values()
+                    if r.result is not None and r.result_path is None
+                ),
+                'evicted': self.evicted,
+                'spilled': self.spilled,
+                'reloaded': self.reloaded,
+            }
+
+    def _evict(self):
+        # Called with the lock held; pops expired, then least recently used finished ids.
+        if self.ttl is not None:
+            cutoff = time.monotonic() - self.ttl
+            while self._by_finish and next(iter(self._by_finish.values())) < cutoff:
+                self._evict_one(next(iter(self._by_finish)))
+        while len(self._records) > self.max_tasks and self._recent:
+            self._evict_one(next(iter(self._recent)))
+
+    def _evict_one(self, task_id: int):
+        del self._recent[task_id]
+        del self._by_finish[task_id]
+        self._drop(self._records.pop(task_id))
+        self.evicted += 1
+
+    def _drop(self, record: TaskRecord):
+        record.result = None
+        if record.result_path and os.path.exists(record.result_path):
+            os.remove(record.result_path)
@@ -0,0 +1,265 @@
+import cirq
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from .statevector_engine import NumpyStateVectorEngine, StateBuffer, _Frame
+from .sampling import (has_terminal_measurements_only, measurement_records,
+                       qubit_bits, sample_indices, split_measurements)
+
+_PAULIS = (
+    np.eye(2, dtype=complex),
+    np.array([[0, 1], [1, 0]], dtype=complex),
+    np.array([[0, -1j], [1j, 0]], dtype=complex),
+    np.array([[1, 0], [0, -1]], dtype=complex),
+)
+
+
+@dataclass
+class NoiseParameters:
+    """Per-moment noise rates derived from a device noise model.
+
+    ``T1`` and ``T2`` are relaxation and coherence times in the unit of
+    ``gate_time`` (microseconds, as entered in the GUI). ``dephasing`` is an
+    extra phase-flip probability per moment and ``gate_error`` a
+    depolarizing probability on every qubit a gate acts on.
+    """
+    t1: Optional[float] = None
+    t2: Optional[float] = None
+    dephasing: float = 0.0
+    gate_error: float = 0.0
+    gate_time: float = 0.02
+
+    @classmethod
+    def from_noise_model(cls, noise_model: Optional[Dict],
+                         gate_time: float = 0.02) -> "NoiseParameters":
+        """Read the keys stored by ``VirtualQuantumDevice.set_noise_model``."""
+        noise_model = noise_model or {}
+        return cls(
+            t1=noise_model.get('T1'),
+            t2=noise_model.get('T2'),
+            dephasing=noise_model.get('dephasing') or 0.0,
+            gate_error=noise_model.get('gate_error') or 0.0,
+            gate_time=noise_model.get('gate_time', gate_time)
+        )
+
+    def amplitude_damping(self) -> float:
+        if not self.t1:
+            return 0.0
+        return 1 - np.exp(-self.gate_time / self.t1)
+
+    def phase_damping(self) -> float:
+        # Pure dephasing rate 1/T_phi = 1/T2 - 1/(2 T1); coherences decay as
+        # sqrt(1 - lambda) per moment.
+        if not self.t2:
+            return 0.0
+        rate = 1 / self.t2 - (1 / (2 * self.t1) if self.t1 else 0.0)
+        return 1 - np.exp(-2 * self.gate_time * max(rate, 0.0))
+
+    def idle_kraus(self) -> List[np.ndarray]:
+        """Kraus operators applied to every qubit after each moment."""
+        channels = []
+        if self.amplitude_damping() > 0:
+            channels.append(cirq.kraus(cirq.amplitude_damp(self.amplitude_damping())))
+        if self.phase_damping() > 0:
+            channels.append(cirq.kraus(cirq.phase_damp(self.phase_damping())))
+        if self.dephasing > 0:
+            channels.append(cirq.kraus(cirq.phase_flip(self.dephasing)))
+        return _compose(channels)
+
+    def gate_kraus(self) -> List[np.ndarray]:
+        """Kraus operators applied to the qubits a gate acted on."""
+        channels = [self.idle_kraus()]
+        if self.gate_error > 0:
+            channels.append(cirq.kraus(cirq.depolarize(self.gate_error)))
+        return _compose(channels)
+
+
+def _compose(channels: Sequence[Sequence[np.ndarray]]) -> List[np.ndarray]:
+    """Kraus operators of channels applied in sequence, dropping zero terms."""
+    ops = [np.eye(2, dtype=complex)]
+    for channel in channels:
+        ops = [k @ op for op in ops for k in channel]
+    return [op for op in ops if np.abs(op).max() > 1e-12]
+
+
+@dataclass
+class TrajectoryResult:
+    """Probabilities estimated from stochastic trajectories."""
+    qubits: List[cirq.Qid]
+    probabilities: np.ndarray
+    std_error: np.ndarray
+    num_trajectories: int
+    measurements: Optional[cirq.ResultDict] = None
+
+    def confidence_interval(self, confidence: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        """Normal-approximation interval on each basis-state probability."""
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        low = np.clip(self.probabilities - z * self.std_error, 0, 1)
+        high = np.clip(self.probabilities + z * self.std_error, 0, 1)
+        return low, high
+
+
+class _Channel:
+    """A sampled Kraus channel on one axis, conjugated by the Pauli frame."""
+
+    def __init__(self, axis: int, kraus: List[np.ndarray], dtype):
+        self.axis = axis
+        self.kraus = np.array(kraus, dtype=dtype)
+        povm = np.einsum('kji,kjl->kil', self.kraus.conj(), self.kraus)
+        self.weights0 = povm[:, 0, 0].real
+        self.weights1 = povm[:, 1, 1].real
+        self.coherences = povm[:, 0, 1]
+        self.diagonal_povm = not self.coherences.any()
+
+    def apply(self, buf: StateBuffer, rng: np.random.Generator):
+        v = buf.state.reshape(buf.batch, 2 ** self.axis, 2, -1)
+        # Populations of both halves in one pass over the real view.
+        real = v.view(buf.state.real.dtype)
+        populations = np.einsum('blhr,blhr->bh', real, real)
+        # Tr(K rho K^dagger) for each trajectory and Kraus operator
+        weights = np.outer(populations[:, 0], self.weights0) + np.outer(populations[:, 1], self.weights1)
+        if not self.diagonal_povm:
+            c = np.einsum('blr,blr->b', v[:, :, 0, :].conj(), v[:, :, 1, :])
+            weights += 2 * np.outer(c, self.coherences).real
+        cdf = np.cumsum(np.clip(weights, 0, None), axis=1)
+        draws = rng.random(buf.batch) * cdf[:, -1]
+        choice = np.minimum((cdf < draws[:, None]).sum(axis=1), len(self.kraus) - 1)
+        ops = self.kraus[choice]
+
+        a0, a1 = v[:, :, 0, :], v[:, :, 1, :]
+        if not (ops[:, 0, 1].any() or ops[:, 1, 0].any() or (ops[:, 0, 0] == 0).any()):
+            # Rows only need to be normalised up to a positive scalar, so a
+            # diagonal operator diag(d0, d1) costs half a sweep as diag(1, d1/d0).
+            ratio = ops[:, 1, 1] / ops[:, 0, 0]
+            if (ratio != 1).any():
+                a1 *= ratio[:, None, None]
+            return
+        norm = np.sqrt(weights[np.arange(buf.batch), choice])
+        ops = ops / norm[:, None, None].astype(buf.dtype)
+        m00, m01, m10, m11 = (ops[:, i, j, None, None] for i, j in ((0, 0), (0, 1), (1, 0), (1, 1)))
+        shape = a0.shape
+        t0, t1 = buf.scratch(shape, 0), buf.scratch(shape, 1)
+        np.multiply(a0, m10, out=t0)
+        a0 *= m00
+        np.multiply(a1, m01, out=t1)
+        a0 += t1
+        a1 *= m11
+        a1 += t0
+
+
+class TrajectoryEngine:
+    """Noisy simulation by Monte Carlo quantum trajectories.
+
+    Each trajectory is a pure state vector; after every moment a Kraus
+    operator of the noise channel is sampled per qubit with its Born
+    probability. Trajectories are stacked as rows of a (batch, 2**n) buffer
+    so every gate and channel is one NumPy call per batch, and batches run
+    on a thread pool. Memory grows as 2**n per trajectory instead of the
+    4**n of a density matrix.
+    """
+
+    name = 'trajectory'
+
+    def __init__(self, dtype=np.complex128, batch_size: int = 64, num_workers: int = 1):
+        self.dtype = np.dtype(dtype)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self._unitary = NumpyStateVectorEngine(dtype=dtype)
+
+    def compile(self, circuit: cirq.AbstractCircuit, qubits: Sequence[cirq.Qid],
+                noise: NoiseParameters) -> list:
+        """Interleave gate kernels with a noise channel after every moment."""
+        index = {q: i for i, q in enumerate(qubits)}
+        frame = _Frame(len(qubits))
+        idle, gate = noise.idle_kraus(), noise.gate_kraus()
+        program = []
+        for moment in circuit:
+            touched = set()
+            for op in moment:
+                # Measurements are terminal and sampled from the final state.
+                if not isinstance(op.gate, cirq.MeasurementGate):
+                    program.extend(self._unitary.compile_operation(op, index, frame))
+                    touched.update(op.qubits)
+            if moment.operations and not touched:
+                continue  # measurement-only moment
+            for q in qubits:
+                kraus = gate if q in touched else idle
+                if len(kraus) > 1:
+                    axis = index[q]
+                    program.append(_Channel(axis, self._conjugate(kraus, frame, axis), self.dtype))
+        final = frame.flush(tuple(index[q] for q in qubits))
+        if final is not None:
+            program.append(final)
+        return program
+
+    def _conjugate(self, kraus: List[np.ndarray], frame: _Frame, axis: int) -> List[np.ndarray]:
+        # The buffer holds the state up to a pending Pauli P = X^x Z^z on this
+        # axis, so the channel acts on it as P^-1 K P.
+        pauli = np.linalg.matrix_power(_PAULIS[1], frame.x[axis]) @ \
+            np.linalg.matrix_power(_PAULIS[3], frame.z[axis])
+        return [pauli.conj().T @ k @ pauli for k in kraus]
+
+    def simulate(self, circuit: cirq.AbstractCircuit, noise_model: Optional[Dict] = None,
+                 num_trajectories: int = 1000, repetitions: int = 0,
+                 qubit_order: Optional[Sequence[cirq.Qid]] = None,
+                 seed: Optional[int] = None) -> TrajectoryResult:
+        """Estimate final-state probabilities of a noisy circuit.
+
+        Terminal measurements are sampled from the trajectories themselves:
+        with ``repetitions`` shots, each trajectory contributes an equal share.
+        """
+        if not has_terminal_measurements_only(circuit):
+            raise ValueError("Trajectory simulation needs unitary gates and terminal measurements")
+        if num_trajectories < 1:
+            raise ValueError("num_trajectories must be positive")
+        _, measurements = split_measurements(circuit)
+        qubits = list(qubit_order) if qubit_order is not None else sorted(circuit.all_qubits())
+        noise = NoiseParameters.from_noise_model(noise_model)
+        program = self.compile(circuit, qubits, noise)
+
+        sizes = [self.batch_size] * (num_trajectories // self.batch_size)
+        if num_trajectories % self.batch_size:
+            sizes.append(num_trajectories % self.batch_size)
+        shots = -(-repetitions // num_trajectories) if measurements else 0
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(len(qubits), size, program, shots, s) for size, s in zip(sizes, seeds)]
+        if self.num_workers > 1 and len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=self.num_workers) as pool:
+                chunks = list(pool.map(lambda job: self._run_batch(*job), jobs))
+        else:
+            chunks = [self._run_batch(*job) for job in jobs]
+
+        total = sum(chunk[0] for chunk in chunks)
+        total_sq = sum(chunk[1] for chunk in chunks)
+        mean = total / num_trajectories
+        if num_trajectories > 1:
+            variance = np.clip(total_sq / num_trajectories - mean ** 2, 0, None)
+            std_error = np.sqrt(variance / (num_trajectories - 1))
+        else:
+            std_error = np.zeros_like(mean)
+
+        result = None
+        if measurements:
+            # Shot-major order, so trimming drops at most one shot per trajectory
+            indices = np.concatenate([chunk[2] for chunk in chunks]).T.reshape(-1)[:repetitions]
+            result = cirq.ResultDict(
+                params=cirq.ParamResolver({}),
+                records=measurement_records(measurements, qubit_bits(indices, qubits))
+            )
+        return TrajectoryResult(qubits, mean, std_error, num_trajectories, result)
+
+    def _run_batch(self, num_qubits: int, size: int, program: list, shots: int,
+                   seed: np.random.SeedSequence):
+        rng = np.random.default_rng(seed)
+        buf = StateBuffer(num_qubits, batch=size, dtype=self.dtype)
+        for step in program:
+            if isinstance(step, _Channel):
+                step.apply(buf, rng)
+            else:
+                step[0](buf, *step[1])
+        probabilities = np.abs(buf.state) ** 2
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        indices = sample_indices(probabilities, shots, rng) if shots else np.empty((size, 0), int)
+        return (probabilities.sum(axis=0), (probabilities ** 2).sum(axis=0), indices)
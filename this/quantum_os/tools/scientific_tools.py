@@ -5,6 +5,7 @@ from typing import List, Dict, Optional
 import cirq
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from ..kernel.quantum_kernel import QuantumKernel
 
 class QuantumDataAnalyzer:
     def __init__(self):
@@ -40,22 +41,32 @@ class QuantumDataAnalyzer:
             self.results_df.to_csv(filename)
             
 class AutomatedExperimenter:
-    def __init__(self, simulator: cirq.Simulator):
+    def __init__(self, simulator: cirq.Simulator, kernel: Optional[QuantumKernel] = None):
         self.simulator = simulator
+        self.kernel = kernel or QuantumKernel()
         self.experiments = []
         
     def run_batch_experiments(self, circuit: cirq.Circuit, 
                             params_list: List[Dict], 
-                            shots: int = 1000) -> List[Dict]:
-        """Run multiple experiments with different parameters."""
+                            shots: int = 1000,
+                            vectorized: bool = True) -> List[Dict]:
+        """Run multiple experiments with different parameters.
+
+        With ``vectorized`` set, noiseless circuits with terminal measurements
+        run as a single parameter sweep (see ``run_parameter_sweep``).
+        """
+        noisy = getattr(self.simulator, 'noise', cirq.NO_NOISE) != cirq.NO_NOISE
+        if vectorized and not noisy and self.kernel.sweep_engine.supports(circuit):
+            return self.run_parameter_sweep(circuit, params_list, shots)
+
         results = []
         
         for params in params_list:
             # Parameterize circuit
             param_circuit = self._apply_parameters(circuit, params)
             
-            # Run experiment
-            result = self.simulator.run(param_circuit, repetitions=shots)
+            # Run experiment (sampled from the final state when measurements are terminal)
+            result = self.kernel.sample(param_circuit, repetitions=shots, simulator=self.simulator)
             
             # Store results
             results.append({
@@ -67,6 +78,18 @@ class AutomatedExperimenter:
         self.experiments.extend(results)
         return results
     
+    def run_parameter_sweep(self, circuit: cirq.Circuit,
+                            params_list: List[Dict],
+                            shots: int = 1000) -> List[Dict]:
+        """Compile a parameterized circuit once and run all points as batched state tensors."""
+        sweep = self.kernel.sample_sweep(circuit, params_list, repetitions=shots)
+        results = [
+            {'parameters': params, 'counts': result.measurements, 'shots': shots}
+            for params, result in zip(params_list, sweep)
+        ]
+        self.experiments.extend(results)
+        return results
+
     def _apply_parameters(self, circuit: cirq.Circuit, 
                          params: Dict) -> cirq.Circuit:
         """Apply parameters to parameterized circuit."""
@@ -1,10 +1,12 @@
 import cirq
 import numpy as np
 import matplotlib.pyplot as plt
+from quantum_os.kernel.quantum_kernel import QuantumKernel
 
 class QuantumSystemDemo:
     def __init__(self):
         self.simulator = cirq.Simulator()
+        self.kernel = QuantumKernel()
         
     def run_demo(self):
         print("=== Quantum Operating System Demo ===\n")
@@ -58,7 +60,7 @@ class QuantumSystemDemo:
         measurement_circuit = circuit.copy()
         measurement_circuit.append(cirq.measure(q0, q1, q2, key='result'))
         
-        results = self.simulator.run(measurement_circuit, repetitions=n_measurements)
+        results = self.kernel.sample(measurement_circuit, repetitions=n_measurements)
         counts = results.histogram(key='result')
         
         print(f"\nMeasurement Results ({n_measurements} shots):")
@@ -0,0 +1,73 @@
+import cirq
+import numpy as np
+import pytest
+from quantum_os.kernel.expectation import pauli_expectations
+from quantum_os.kernel.quantum_kernel import QuantumKernel
+
+QUBITS = cirq.LineQubit.range(4)
+
+
+def random_circuit(seed: int, num_ops: int = 30) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.S, cirq.T, cirq.rz(0.3), cirq.ry(1.1)]
+    double = [cirq.CNOT, cirq.CZ, cirq.ISWAP ** 0.5]
+    ops = []
+    for _ in range(num_ops):
+        if rng.random() < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(4)]))
+        else:
+            a, b = rng.choice(4, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+    return cirq.Circuit(ops)
+
+
+def random_paulis(seed: int, count: int):
+    rng = np.random.default_rng(seed)
+    paulis = [cirq.I, cirq.X, cirq.Y, cirq.Z]
+    return [cirq.PauliString({q: paulis[rng.integers(4)] for q in QUBITS},
+                             coefficient=rng.normal())
+            for _ in range(count)]
+
+
+def reference(circuit: cirq.Circuit, observables) -> np.ndarray:
+    simulator = cirq.Simulator(dtype=np.complex128)
+    state = simulator.simulate(circuit, qubit_order=QUBITS).final_state_vector
+    index = {q: i for i, q in enumerate(QUBITS)}
+    return np.array([p.expectation_from_state_vector(state, index) for p in observables])
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('count', [3, 40])  # 40 terms take the Walsh-Hadamard path
+def test_matches_cirq_simulator(seed, count):
+    circuit = random_circuit(seed)
+    observables = random_paulis(seed, count)
+    state = cirq.Simulator(dtype=np.complex128).simulate(
+        circuit, qubit_order=QUBITS).final_state_vector
+    np.testing.assert_allclose(pauli_expectations(state, observables, QUBITS),
+                               reference(circuit, observables), atol=1e-8)
+
+
+@pytest.mark.parametrize('engine', ['auto', 'numpy', 'cirq'])
+def test_kernel_expectation_values(engine):
+    circuit = random_circuit(0)
+    observables = random_paulis(1, 8)
+    kernel = QuantumKernel(engine=engine)
+    np.testing.assert_allclose(kernel.expectation_values(circuit, observables),
+                               reference(circuit, observables), atol=1e-6)
+    hamiltonian = sum(observables, cirq.PauliSum())
+    assert kernel.expectation(circuit, hamiltonian) == pytest.approx(
+        reference(circuit, observables).sum(), abs=1e-6)
+
+
+def test_clifford_circuit_uses_tableau_values():
+    a, b = QUBITS[:2]
+    circuit = cirq.Circuit(cirq.H(a), cirq.CNOT(a, b), cirq.S(b))
+    observables = [cirq.X(a) * cirq.Y(b), cirq.Z(a) * cirq.Z(b), cirq.X(a)]
+    values = QuantumKernel().expectation_values(circuit, observables)
+    np.testing.assert_allclose(values, reference(circuit, observables), atol=1e-6)
+    np.testing.assert_array_equal(values, [1, 1, 0])
+
+
+def test_state_size_must_match_qubits():
+    with pytest.raises(ValueError):
+        pauli_expectations(np.ones(8) / np.sqrt(8), [cirq.Z(QUBITS[0])], QUBITS)
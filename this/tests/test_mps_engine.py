@@ -0,0 +1,67 @@
+import itertools
+import cirq
+import numpy as np
+import pytest
+from quantum_os.kernel.mps_engine import MPSEngine
+
+QUBITS = cirq.LineQubit.range(5)
+BITSTRINGS = np.array(list(itertools.product([0, 1], repeat=len(QUBITS))))
+
+
+def random_circuit(seed: int, num_ops: int = 40) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.Y, cirq.S, cirq.T, cirq.rz(0.3), cirq.ry(1.1)]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.ISWAP ** 0.5, cirq.CZ ** 0.25]
+    ops = []
+    for _ in range(num_ops):
+        kind = rng.random()
+        if kind < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(5)]))
+        elif kind < 0.95:
+            # Distant pairs exercise the SWAP network between non-neighbours.
+            a, b = rng.choice(5, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+        else:
+            a, b, c = rng.choice(5, size=3, replace=False)
+            ops.append(cirq.CCZ(QUBITS[a], QUBITS[b], QUBITS[c]))
+    return cirq.Circuit(ops)
+
+
+def final_state(circuit: cirq.Circuit) -> np.ndarray:
+    simulator = cirq.Simulator(dtype=np.complex128)
+    return simulator.simulate(circuit, qubit_order=QUBITS).final_state_vector
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_amplitudes_match_cirq_simulator(seed):
+    circuit = random_circuit(seed)
+    state = MPSEngine(max_bond=64).simulate(circuit, QUBITS)
+    np.testing.assert_allclose(state.amplitudes(BITSTRINGS), final_state(circuit), atol=1e-8)
+    assert state.truncation_error == pytest.approx(0, abs=1e-10)
+
+
+def test_bond_cap_truncates_and_reports_error():
+    circuit = random_circuit(0, num_ops=120)
+    state = MPSEngine(max_bond=2).simulate(circuit, QUBITS)
+    assert max(state.bond_dimensions) <= 2
+    assert state.truncation_error > 0
+    assert state.fidelity_estimate < 1
+
+
+def test_ghz_chain_stays_at_bond_two():
+    qubits = cirq.LineQubit.range(60)
+    circuit = cirq.Circuit(cirq.H(qubits[0]),
+                           (cirq.CNOT(a, b) for a, b in zip(qubits, qubits[1:])))
+    state = MPSEngine().simulate(circuit)
+    assert max(state.bond_dimensions) == 2
+    assert state.amplitude([1] * 60) == pytest.approx(2 ** -0.5)
+    samples = state.sample(200, np.random.default_rng(0))
+    assert np.all(samples == samples[:, :1])
+
+
+def test_samples_follow_cirq_probabilities():
+    circuit = random_circuit(1)
+    samples = MPSEngine().simulate(circuit, QUBITS).sample(20000, np.random.default_rng(0))
+    weights = 1 << np.arange(len(QUBITS) - 1, -1, -1)
+    counts = np.bincount(samples @ weights, minlength=2 ** len(QUBITS)) / len(samples)
+    np.testing.assert_allclose(counts, np.abs(final_state(circuit)) ** 2, atol=0.02)
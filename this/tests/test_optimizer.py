@@ -0,0 +1,105 @@
+import cirq
+import numpy as np
+import pytest
+from quantum_os.instruction_manager.optimizer import (CancelInversesPass, CommutationChecker,
+                                                      CompactMomentsPass, MergePowersPass,
+                                                      PassManager, _PeepholePass, pack_moments)
+
+QUBITS = cirq.LineQubit.range(3)
+
+
+def assert_same_unitary(original: cirq.Circuit, optimized: cirq.Circuit):
+    qubits = sorted(original.all_qubits())
+    np.testing.assert_allclose(optimized.unitary(qubit_order=qubits),
+                               original.unitary(qubit_order=qubits), atol=1e-8)
+
+
+def random_circuit(seed: int, num_ops: int = 40) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.Z, cirq.S, cirq.T, cirq.T ** -1, cirq.X ** 0.5,
+              cirq.rz(0.3), cirq.PhasedXPowGate(phase_exponent=0.2, exponent=0.5)]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.ISWAP ** 0.5,
+              cirq.PhasedISwapPowGate(phase_exponent=0.25, exponent=0.3),
+              cirq.PhasedISwapPowGate(phase_exponent=0.1, exponent=0.4)]
+    ops = []
+    for _ in range(num_ops):
+        if rng.random() < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(3)]))
+        else:
+            a, b = rng.choice(3, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+    return cirq.Circuit(ops)
+
+
+def test_peephole_pass_is_abstract():
+    with pytest.raises(TypeError):
+        _PeepholePass()
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_pass_manager_preserves_unitary(seed):
+    circuit = random_circuit(seed)
+    optimized, reports = PassManager(cache_size=0).run(circuit)
+    assert_same_unitary(circuit, optimized)
+    assert reports[0].gates_before == len(list(circuit.all_operations()))
+    assert reports[-1].gates_after == len(list(optimized.all_operations()))
+
+
+@pytest.mark.parametrize('optimization', [CancelInversesPass(), MergePowersPass(),
+                                          CompactMomentsPass()])
+def test_each_pass_preserves_unitary(optimization):
+    for seed in range(10):
+        circuit = random_circuit(seed)
+        assert_same_unitary(circuit, optimization.run(circuit))
+
+
+def test_cancel_inverses_across_commuting_gate():
+    a, b = QUBITS[:2]
+    circuit = cirq.Circuit(cirq.CNOT(a, b), cirq.Z(a), cirq.CNOT(a, b))
+    assert list(CancelInversesPass().run(circuit).all_operations()) == [cirq.Z(a)]
+
+
+def test_cancel_inverses_blocked_by_non_commuting_gate():
+    a, b = QUBITS[:2]
+    circuit = cirq.Circuit(cirq.CNOT(a, b), cirq.X(a), cirq.CNOT(a, b))
+    assert len(list(CancelInversesPass().run(circuit).all_operations())) == 3
+
+
+def test_merge_powers():
+    a = QUBITS[0]
+    merged = MergePowersPass().run(cirq.Circuit(cirq.T(a), cirq.T(a)))
+    assert list(merged.all_operations()) == [cirq.S(a)]
+    assert not list(MergePowersPass().run(cirq.Circuit(cirq.S(a), cirq.S(a) ** -1)).all_operations())
+
+
+def test_merge_powers_keeps_gates_with_different_parameters():
+    a, b = QUBITS[:2]
+    circuit = cirq.Circuit(cirq.PhasedISwapPowGate(phase_exponent=0.25, exponent=0.3)(a, b),
+                           cirq.PhasedISwapPowGate(phase_exponent=0.1, exponent=0.4)(a, b))
+    optimized = MergePowersPass().run(circuit)
+    assert len(list(optimized.all_operations())) == 2
+    assert_same_unitary(circuit, optimized)
+
+
+def test_commutation_checker():
+    a, b = QUBITS[:2]
+    commutes = CommutationChecker()
+    assert commutes(cirq.Z(a), cirq.CNOT(a, b))
+    assert not commutes(cirq.X(a), cirq.CNOT(a, b))
+    assert commutes(cirq.X(a), cirq.Z(b))
+
+
+def test_pack_moments_is_earliest():
+    a, b, c = QUBITS
+    circuit = pack_moments([cirq.H(a), cirq.H(b), cirq.CNOT(a, b), cirq.H(c)])
+    assert len(circuit) == 2
+    assert cirq.H(c) in circuit[0]
+
+
+def test_pass_manager_cache_returns_copies():
+    manager = PassManager()
+    circuit = random_circuit(0)
+    first, _ = manager.run(circuit)
+    first.append(cirq.X(QUBITS[0]))
+    second, _ = manager.run(circuit)
+    assert_same_unitary(circuit, second)
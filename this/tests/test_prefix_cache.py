@@ -0,0 +1,66 @@
+import itertools
+import cirq
+import numpy as np
+import pytest
+import sympy
+from quantum_os.kernel.prefix_cache import PrefixStateCache, split_parameter_free_prefix
+from quantum_os.kernel.quantum_kernel import QuantumKernel
+
+QUBITS = cirq.LineQubit.range(4)
+BITSTRINGS = list(itertools.product([0, 1], repeat=len(QUBITS)))
+
+
+def random_circuit(seed: int, num_ops: int = 30) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.S, cirq.T, cirq.rz(0.3), cirq.ry(1.1)]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.ISWAP ** 0.5]
+    ops = []
+    for _ in range(num_ops):
+        if rng.random() < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(4)]))
+        else:
+            a, b = rng.choice(4, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+    return cirq.Circuit(ops)
+
+
+def final_state(circuit: cirq.Circuit) -> np.ndarray:
+    simulator = cirq.Simulator(dtype=np.complex128)
+    return simulator.simulate(circuit, qubit_order=QUBITS).final_state_vector
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_resumed_states_match_cirq_simulator(seed):
+    kernel = QuantumKernel(engine='numpy')
+    base = random_circuit(seed)
+    extended = base + random_circuit(seed + 100, num_ops=10)
+    for circuit in (base, extended, base):
+        np.testing.assert_allclose(kernel.amplitudes(circuit, BITSTRINGS, QUBITS),
+                                   final_state(circuit), atol=1e-8)
+    assert kernel.prefix_cache.stats()['hits'] >= 2
+
+
+def test_longest_prefix_lookup():
+    cache = PrefixStateCache()
+    operations = list(random_circuit(0).all_operations())
+    state = final_state(cirq.Circuit(operations[:10]))
+    cache.put(operations[:10], QUBITS, state)
+    length, cached = cache.longest(operations, QUBITS)
+    assert length == 10
+    np.testing.assert_array_equal(cached, state)
+    # A different qubit order or a diverging first operation shares nothing.
+    assert cache.longest(operations, QUBITS[::-1]) == (0, None)
+    assert cache.longest([cirq.X(QUBITS[0])] + operations, QUBITS) == (0, None)
+
+
+def test_split_parameter_free_prefix():
+    a, b, c = QUBITS[:3]
+    theta = sympy.Symbol('theta')
+    circuit = cirq.Circuit(cirq.H(a), cirq.rx(theta)(a), cirq.CNOT(a, b), cirq.H(c), cirq.T(b))
+    prefix, tail = split_parameter_free_prefix(circuit)
+    assert list(prefix.all_operations()) == [cirq.H(a), cirq.H(c)]
+    assert list(tail.all_operations()) == [cirq.rx(theta)(a), cirq.CNOT(a, b), cirq.T(b)]
+    resolver = {'theta': 0.4}
+    np.testing.assert_allclose(
+        final_state(cirq.resolve_parameters(prefix + tail, resolver)),
+        final_state(cirq.resolve_parameters(circuit, resolver)), atol=1e-8)
@@ -0,0 +1,72 @@
+import cirq
+import numpy as np
+import pytest
+from quantum_os.kernel.stabilizer_engine import StabilizerEngine
+
+QUBITS = cirq.LineQubit.range(5)
+
+
+def random_clifford_circuit(seed: int, num_ops: int = 40) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.Y, cirq.Z, cirq.S, cirq.S ** -1, cirq.X ** 0.5, cirq.Y ** -0.5]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.ISWAP]
+    ops = []
+    for _ in range(num_ops):
+        if rng.random() < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(5)]))
+        else:
+            a, b = rng.choice(5, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+    return cirq.Circuit(ops)
+
+
+def random_pauli(rng: np.random.Generator) -> cirq.PauliString:
+    paulis = [cirq.I, cirq.X, cirq.Y, cirq.Z]
+    return cirq.PauliString({q: paulis[rng.integers(4)] for q in QUBITS})
+
+
+def final_state(circuit: cirq.Circuit) -> np.ndarray:
+    simulator = cirq.Simulator(dtype=np.complex128)
+    return simulator.simulate(circuit, qubit_order=QUBITS).final_state_vector
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_expectations_match_cirq_simulator(seed):
+    circuit = random_clifford_circuit(seed)
+    engine = StabilizerEngine()
+    tableau = engine.simulate(circuit, QUBITS)
+    state = final_state(circuit)
+    rng = np.random.default_rng(seed)
+    for _ in range(10):
+        pauli = random_pauli(rng)
+        expected = pauli.expectation_from_state_vector(state, {q: i for i, q in enumerate(QUBITS)})
+        assert engine.expectation(tableau, pauli, QUBITS) == pytest.approx(expected, abs=1e-8)
+
+
+@pytest.mark.parametrize('seed', range(15))
+def test_support_matches_cirq_simulator(seed):
+    circuit = random_clifford_circuit(seed)
+    engine = StabilizerEngine()
+    x0, basis = engine.support(engine.simulate(circuit, QUBITS))
+    probabilities = np.abs(final_state(circuit)) ** 2
+    nonzero = np.flatnonzero(probabilities > 1e-9)
+    assert len(nonzero) == 2 ** len(basis)
+    np.testing.assert_allclose(probabilities[nonzero], 1 / len(nonzero), atol=1e-8)
+    weights = 1 << np.arange(len(QUBITS) - 1, -1, -1)
+    assert probabilities[x0 @ weights] > 1e-9
+
+
+def test_samples_lie_in_support():
+    circuit = random_clifford_circuit(0) + cirq.Circuit(cirq.measure(*QUBITS, key='m'))
+    result = StabilizerEngine().sample(circuit, repetitions=500, rng=np.random.default_rng(0))
+    probabilities = np.abs(final_state(circuit[:-1])) ** 2
+    weights = 1 << np.arange(len(QUBITS) - 1, -1, -1)
+    assert np.all(probabilities[result.measurements['m'] @ weights] > 1e-9)
+
+
+def test_supports_only_clifford_circuits():
+    engine = StabilizerEngine()
+    a, b = QUBITS[:2]
+    assert engine.supports(cirq.Circuit(cirq.H(a), cirq.CNOT(a, b), cirq.measure(a, b)))
+    assert not engine.supports(cirq.Circuit(cirq.T(a)))
+    assert not engine.supports(cirq.Circuit(cirq.measure(a), cirq.H(a)))
@@ -0,0 +1,73 @@
+import cirq
+import numpy as np
+import pytest
+from quantum_os.kernel.statevector_engine import NumpyStateVectorEngine, StateBuffer
+
+QUBITS = cirq.LineQubit.range(4)
+
+
+def random_circuit(seed: int, num_ops: int = 40) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.Y, cirq.Z, cirq.S, cirq.T, cirq.X ** 0.5, cirq.rz(0.3),
+              cirq.ry(1.1), cirq.PhasedXPowGate(phase_exponent=0.2, exponent=0.5)]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.ISWAP ** 0.5, cirq.CZ ** 0.25]
+    ops = []
+    for _ in range(num_ops):
+        kind = rng.random()
+        if kind < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(4)]))
+        elif kind < 0.9:
+            a, b = rng.choice(4, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+        else:
+            a, b, c = rng.choice(4, size=3, replace=False)
+            ops.append(cirq.CCX(QUBITS[a], QUBITS[b], QUBITS[c]))
+    return cirq.Circuit(ops)
+
+
+def reference(circuit: cirq.Circuit, qubits, dtype=np.complex128) -> np.ndarray:
+    return cirq.Simulator(dtype=dtype).simulate(circuit, qubit_order=qubits).final_state_vector
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_cirq_simulator(seed):
+    circuit = random_circuit(seed)
+    state = NumpyStateVectorEngine().simulate(circuit, QUBITS)
+    np.testing.assert_allclose(state, reference(circuit, QUBITS), atol=1e-8)
+
+
+def test_single_precision():
+    circuit = random_circuit(0)
+    state = NumpyStateVectorEngine(dtype=np.complex64).simulate(circuit, QUBITS)
+    assert state.dtype == np.complex64
+    np.testing.assert_allclose(state, reference(circuit, QUBITS), atol=1e-5)
+
+
+def test_qubit_order_and_idle_qubits():
+    a, b, c = QUBITS[:3]
+    circuit = cirq.Circuit(cirq.H(a), cirq.CNOT(a, c), cirq.SWAP(c, b))
+    order = [c, a, b, QUBITS[3]]
+    np.testing.assert_allclose(NumpyStateVectorEngine().simulate(circuit, order),
+                               reference(circuit, order), atol=1e-8)
+
+
+def test_long_hadamard_chain_stays_normalized():
+    circuit = cirq.Circuit([cirq.H.on_each(*QUBITS)] * 301 + [cirq.H(QUBITS[0])] * 1000)
+    state = NumpyStateVectorEngine().simulate(circuit, QUBITS)
+    np.testing.assert_allclose(state, reference(circuit, QUBITS), atol=1e-8)
+
+
+def test_compiled_program_runs_on_buffer():
+    engine = NumpyStateVectorEngine()
+    circuit = random_circuit(1)
+    buf = StateBuffer(len(QUBITS))
+    engine.run(engine.compile(circuit, QUBITS), buf)
+    np.testing.assert_allclose(buf.state[0], reference(circuit, QUBITS), atol=1e-8)
+
+
+def test_checkpoint_can_abandon_simulation():
+    def checkpoint():
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        NumpyStateVectorEngine().simulate(random_circuit(2), QUBITS, checkpoint=checkpoint)
@@ -0,0 +1,81 @@
+import cirq
+import numpy as np
+import pytest
+import sympy
+from quantum_os.kernel.sweep import SweepEngine
+
+QUBITS = cirq.LineQubit.range(3)
+THETA, PHI = sympy.Symbol('theta'), sympy.Symbol('phi')
+SWEEP = cirq.Linspace('theta', -1.0, 1.5, 5) * cirq.Linspace('phi', 0.0, 0.75, 3)
+
+
+def random_parameterized_circuit(seed: int, num_ops: int = 30) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.Z, cirq.S, cirq.T, cirq.rx(THETA), cirq.rz(PHI),
+              cirq.XPowGate(exponent=THETA), cirq.PhasedXPowGate(phase_exponent=PHI, exponent=0.5)]
+    double = [cirq.CNOT, cirq.CZ, cirq.SWAP, cirq.CZPowGate(exponent=THETA),
+              cirq.ISwapPowGate(exponent=PHI)]
+    ops = []
+    for _ in range(num_ops):
+        if rng.random() < 0.5:
+            ops.append(single[rng.integers(len(single))](QUBITS[rng.integers(3)]))
+        else:
+            a, b = rng.choice(3, size=2, replace=False)
+            ops.append(double[rng.integers(len(double))](QUBITS[a], QUBITS[b]))
+    return cirq.Circuit(ops)
+
+
+def reference_states(circuit: cirq.Circuit, params) -> list:
+    simulator = cirq.Simulator(dtype=np.complex128)
+    return [result.final_state_vector
+            for result in simulator.simulate_sweep(circuit, params, qubit_order=QUBITS)]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_cirq_simulator(seed):
+    circuit = random_parameterized_circuit(seed)
+    expected = reference_states(circuit, SWEEP)
+    states = []
+    for _, chunk in SweepEngine().simulate(circuit, SWEEP, QUBITS):
+        states.extend(chunk.copy())
+    assert len(states) == len(expected)
+    np.testing.assert_allclose(states, expected, atol=1e-8)
+
+
+def test_small_chunks_cover_every_point():
+    circuit = random_parameterized_circuit(0)
+    engine = SweepEngine()
+    row_bytes = 3 * np.dtype(np.complex128).itemsize * 2 ** len(QUBITS)
+    chunks = [(points, chunk.copy()) for points, chunk in
+              engine.simulate(circuit, SWEEP, QUBITS, chunk_bytes=4 * row_bytes)]
+    assert [len(points) for points, _ in chunks] == [4, 4, 4, 3]
+    states = np.concatenate([chunk for _, chunk in chunks])
+    np.testing.assert_allclose(states, reference_states(circuit, SWEEP), atol=1e-8)
+
+
+def test_parameter_free_prefix_is_simulated_once():
+    a, b = QUBITS[:2]
+    circuit = cirq.Circuit(cirq.H(a), cirq.CNOT(a, b), cirq.T(b), cirq.rx(THETA)(a), cirq.CZ(a, b))
+    calls = []
+
+    def prefix_simulator(prefix, qubits):
+        calls.append(prefix)
+        simulator = cirq.Simulator(dtype=np.complex128)
+        return simulator.simulate(prefix, qubit_order=qubits).final_state_vector
+
+    params = cirq.Linspace('theta', 0, 1, 4)
+    program = SweepEngine().compile(circuit, QUBITS[:2], prefix_simulator)
+    assert len(calls) == 1 and len(list(calls[0].all_operations())) == 3
+    states = np.concatenate([chunk.copy() for _, chunk in SweepEngine().chunks(program, params)])
+    simulator = cirq.Simulator(dtype=np.complex128)
+    expected = [r.final_state_vector for r in
+                simulator.simulate_sweep(circuit, params, qubit_order=QUBITS[:2])]
+    np.testing.assert_allclose(states, expected, atol=1e-8)
+
+
+def test_supports_resolvable_unitaries_only():
+    engine = SweepEngine()
+    a = QUBITS[0]
+    assert engine.supports(cirq.Circuit(cirq.rx(THETA)(a), cirq.measure(a)))
+    assert not engine.supports(cirq.Circuit(cirq.measure(a), cirq.rx(THETA)(a)))
+    assert not engine.supports(cirq.Circuit(cirq.amplitude_damp(0.1)(a)))
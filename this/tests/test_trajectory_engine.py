@@ -0,0 +1,79 @@
+import cirq
+import numpy as np
+import pytest
+from quantum_os.kernel.trajectory_engine import NoiseParameters, TrajectoryEngine
+
+QUBITS = cirq.LineQubit.range(3)
+NOISE = {'T1': 0.2, 'T2': 0.15, 'dephasing': 0.02, 'gate_error': 0.03}
+
+
+def random_circuit(seed: int, depth: int = 8) -> cirq.Circuit:
+    rng = np.random.default_rng(seed)
+    single = [cirq.H, cirq.X, cirq.S, cirq.T, cirq.ry(0.7), cirq.X ** 0.5]
+    double = [cirq.CNOT, cirq.CZ, cirq.ISWAP ** 0.5]
+    moments = []
+    for _ in range(depth):
+        if rng.random() < 0.5:
+            a, b = rng.choice(3, size=2, replace=False)
+            moments.append(cirq.Moment(double[rng.integers(len(double))](QUBITS[a], QUBITS[b])))
+        else:
+            q = QUBITS[rng.integers(3)]
+            moments.append(cirq.Moment(single[rng.integers(len(single))](q)))
+    return cirq.Circuit(moments)
+
+
+def density_matrix_probabilities(circuit: cirq.Circuit, noise_model, qubits=QUBITS) -> np.ndarray:
+    # The engine's model: after every moment, the gate channel on touched
+    # qubits and the idle channel on the rest.
+    noise = NoiseParameters.from_noise_model(noise_model)
+    idle, gate = noise.idle_kraus(), noise.gate_kraus()
+    noisy = cirq.Circuit()
+    for moment in circuit:
+        noisy.append(moment)
+        touched = moment.qubits
+        noisy.append(cirq.Moment(cirq.KrausChannel(gate if q in touched else idle).on(q)
+                                 for q in qubits))
+    rho = cirq.DensityMatrixSimulator().simulate(noisy, qubit_order=qubits).final_density_matrix
+    return np.real(np.diag(rho))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_noiseless_matches_cirq_simulator(seed):
+    circuit = random_circuit(seed)
+    result = TrajectoryEngine().simulate(circuit, None, num_trajectories=4, qubit_order=QUBITS)
+    simulator = cirq.Simulator(dtype=np.complex128)
+    state = simulator.simulate(circuit, qubit_order=QUBITS).final_state_vector
+    np.testing.assert_allclose(result.probabilities, np.abs(state) ** 2, atol=1e-8)
+    np.testing.assert_allclose(result.std_error, 0, atol=1e-8)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_noisy_probabilities_match_density_matrix(seed):
+    circuit = random_circuit(seed)
+    result = TrajectoryEngine(batch_size=500).simulate(circuit, NOISE, num_trajectories=4000,
+                                                       qubit_order=QUBITS, seed=seed)
+    expected = density_matrix_probabilities(circuit, NOISE)
+    assert np.all(np.abs(result.probabilities - expected) <= 5 * result.std_error + 1e-3)
+
+
+def test_amplitude_damping_decays_excited_state():
+    q = QUBITS[0]
+    circuit = cirq.Circuit(cirq.X(q), *[cirq.Moment(cirq.I(q))] * 20)
+    result = TrajectoryEngine().simulate(circuit, {'T1': 0.2}, num_trajectories=2000, seed=0)
+    expected = density_matrix_probabilities(circuit, {'T1': 0.2}, [q])
+    assert expected[0] > 0.8
+    assert np.all(np.abs(result.probabilities - expected) <= 5 * result.std_error + 1e-3)
+
+
+def test_measurements_are_sampled_from_trajectories():
+    circuit = random_circuit(0) + cirq.Circuit(cirq.measure(*QUBITS, key='m'))
+    result = TrajectoryEngine().simulate(circuit, NOISE, num_trajectories=200, repetitions=1000,
+                                         seed=1)
+    assert result.measurements.measurements['m'].shape == (1000, 3)
+
+
+def test_seed_makes_runs_reproducible():
+    engine = TrajectoryEngine(num_workers=2, batch_size=16)
+    first = engine.simulate(random_circuit(3), NOISE, num_trajectories=100, seed=7)
+    second = engine.simulate(random_circuit(3), NOISE, num_trajectories=100, seed=7)
+    np.testing.assert_array_equal(first.probabilities, second.probabilities)